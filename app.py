@@ -1,9 +1,12 @@
 # app.py
 import streamlit as st
 import datetime
-import calendar
+import pytz
 from solar_terms import find_bazi_year_month
 from bazi_core import create_four_pillars_with_solar_terms, civil_to_apparent_solar, validate_input
+from bazi_timezone import resolve_utc_offset, standard_utc_offset
+from gazetteer import place_label, search_places
+from lunar_calendar import lunar_to_solar
 from day_master_data import DAY_MASTER_DATA
 
 # Page configuration (no decorative icons)
@@ -115,6 +118,9 @@ def parse_gmt_offset(label):
 
 tz_offsets = [i * 0.5 for i in range(-24, 29)]  # -12.0 .. +14.0 step 0.5
 tz_options = [format_tz_label(o) for o in tz_offsets]
+zone_options = list(pytz.common_timezones)
+ambiguous_options = {"Ask me (show an error)": None, "First occurrence": "earlier", "Second occurrence": "later"}
+eot_options = {"NOAA approximation": "noaa", "High precision (ephemeris table)": "ephemeris"}
 
 # ----------------------
 # UI - contemplative aesthetic with Noto Serif
@@ -125,15 +131,30 @@ st.caption("A quiet voice in the scrollstorm — discover your elemental nature
 # Sidebar: longitude toggle outside form for immediate show/hide
 with st.sidebar:
     st.header("Birth Information")
-    use_longitude = st.checkbox("Enable longitude correction for maximum precision", value=False)
+    # Birth place search (offline gazetteer) fills in longitude and time zone
+    place = None
+    place_query = st.text_input("Birth place (optional)", placeholder="e.g. Beijing, 香港, New York")
+    if place_query:
+        places = search_places(place_query)
+        if places:
+            place = st.selectbox("Matching places", places, format_func=place_label)
+            st.caption(f"Longitude {place['longitude']:.4f}°, time zone {place['timezone']}")
+        else:
+            st.caption("No matching place found. Enter the longitude and time zone below.")
+    use_longitude = st.checkbox("Enable longitude correction for maximum precision", value=place is not None)
     if use_longitude:
         st.markdown("Enter your longitude in decimal degrees (e.g., Hong Kong = 114.1694° E, London = -0.1276° W) for the most accurate solar time conversion.")
+    use_named_zone = st.checkbox("Use a named time zone (applies historical daylight saving time)", value=place is not None)
+    use_lunar = st.checkbox("Birth date is a lunar (农历) date")
+    if place is not None and place["timezone"] not in zone_options:
+        zone_options.append(place["timezone"])
 
     with st.form("birth_form"):
         current_year = datetime.datetime.now().year
         b_year = st.number_input("Birth Year", min_value=1900, max_value=current_year, value=1990)
         b_month = st.number_input("Birth Month", min_value=1, max_value=12, value=1)
-        b_day = st.number_input("Birth Day", min_value=1, max_value=31, value=1)
+        b_day = st.number_input("Birth Day", min_value=1, max_value=31 if not use_lunar else 30, value=1)
+        b_leap = use_lunar and st.checkbox("Leap month (闰月)")
 
         col1, col2 = st.columns(2)
         with col1:
@@ -141,7 +162,13 @@ with st.sidebar:
         with col2:
             b_minute = st.number_input("Minute (0-59)", min_value=0, max_value=59, value=0)
 
-        selected_tz = st.selectbox("Time Zone", tz_options, index=tz_options.index("GMT+8"))
+        if use_named_zone:
+            default_zone = place["timezone"] if place is not None else "Asia/Shanghai"
+            selected_tz = st.selectbox("Time Zone", zone_options, index=zone_options.index(default_zone))
+            ambiguous_choice = st.selectbox("If the clock time occurred twice (clocks turned back)",
+                                            list(ambiguous_options))
+        else:
+            selected_tz = st.selectbox("Time Zone", tz_options, index=tz_options.index("GMT+8"))
 
         longitude_input = None
         if use_longitude:
@@ -149,10 +176,14 @@ with st.sidebar:
                 "Longitude (decimal degrees)",
                 min_value=-180.0,
                 max_value=180.0,
-                value=114.1694,
+                value=round(place["longitude"], 4) if place is not None else 114.1694,
                 help="Enter longitude only (decimal degrees). Example: Hong Kong = 114.1694; London = -0.1276"
             )
 
+        eot_choice = st.selectbox("Equation of Time model", list(eot_options),
+                                  help="The high-precision table follows each year's actual orbit (about 1 second); "
+                                       "the NOAA approximation is off by 30 seconds on average and up to 2 minutes")
+
         submit_button = st.form_submit_button("Calculate Day Master")
 
     st.markdown("---")
@@ -160,20 +191,47 @@ with st.sidebar:
 
 # Main content
 if submit_button:
-    # Use selected timezone offset
-    tz_offset = parse_gmt_offset(selected_tz)
+    # Use selected timezone offset (named zones resolve DST for the birth date)
+    validation_error = None
+    if use_lunar:
+        try:
+            solar_date = lunar_to_solar(b_year, b_month, b_day, b_leap)
+            b_year, b_month, b_day = solar_date.year, solar_date.month, solar_date.day
+            st.caption(f"Lunar date converted to {solar_date.isoformat()} (Gregorian)")
+        except ValueError as e:
+            validation_error = str(e)
+    if validation_error:
+        pass  # the lunar date does not exist; reported below
+    elif use_named_zone:
+        try:
+            tz_offset = resolve_utc_offset(selected_tz, b_year, b_month, b_day, b_hour, b_minute,
+                                           ambiguous_options[ambiguous_choice])
+            meridian_offset = standard_utc_offset(selected_tz, b_year, b_month, b_day, b_hour, b_minute)
+        except pytz.exceptions.AmbiguousTimeError:
+            validation_error = ("This clock time occurred twice in " + selected_tz + " (clocks were turned back). "
+                                "Choose the first or second occurrence in the sidebar.")
+        except pytz.exceptions.NonExistentTimeError:
+            validation_error = ("This clock time never occurred in " + selected_tz + " (clocks were turned forward). "
+                                "Please check the birth time.")
+        except ValueError as e:
+            validation_error = str(e)
+    else:
+        tz_offset = parse_gmt_offset(selected_tz)
+        meridian_offset = tz_offset
 
-    # If user didn't enable longitude, approximate using timezone meridian
-    longitude_used = longitude_input if use_longitude else tz_offset * 15.0
+    # If user didn't enable longitude, approximate using the (standard time) timezone meridian
+    if not validation_error:
+        longitude_used = longitude_input if use_longitude else meridian_offset * 15.0
 
-    # Validate
-    validation_error = validate_input(b_year, b_month, b_day, b_hour, b_minute, longitude_used)
+        # Validate
+        validation_error = validate_input(b_year, b_month, b_day, b_hour, b_minute, longitude_used)
     if validation_error:
         st.error(validation_error)
     else:
         try:
             civil_dt = datetime.datetime(b_year, b_month, b_day, b_hour, b_minute, 0)
-            solar_dt, long_corr, eot = civil_to_apparent_solar(civil_dt, longitude_used, tz_offset)
+            solar_dt, long_corr, eot = civil_to_apparent_solar(civil_dt, longitude_used, tz_offset,
+                                                                   eot_options[eot_choice])
             pillars = create_four_pillars_with_solar_terms(solar_dt)
             day_master_key = pillars["day_master"]
             day_master_info = DAY_MASTER_DATA.get(day_master_key)
@@ -234,7 +292,8 @@ if submit_button:
             with st.expander("Birth Details & Technical Information"):
                 st.write("**Input (civil clock time):**")
                 st.write(f"- Date: {civil_dt.strftime('%B %d, %Y')}")
-                st.write(f"- Time: {civil_dt.strftime('%H:%M')} ({selected_tz})")
+                st.write(f"- Time: {civil_dt.strftime('%H:%M')} ({selected_tz}"
+                         + (f", {format_tz_label(tz_offset)})" if use_named_zone else ")"))
                 st.write(f"**Longitude used for correction:** {longitude_used:+.4f}° (decimal degrees)")
                 st.write("")
                 st.write("**Converted to Apparent Solar Time:**")
@@ -242,7 +301,7 @@ if submit_button:
                 st.write("")
                 st.write("**Solar Time Corrections Applied:**")
                 st.write(f"- Longitude correction: {long_corr:+.2f} minutes")
-                st.write(f"- Equation of Time: {eot:+.2f} minutes")
+                st.write(f"- Equation of Time: {eot:+.2f} minutes ({eot_choice})")
                 st.write(f"- Total correction: {(long_corr + eot):+.2f} minutes")
                 
                 # Solar term boundaries applied
@@ -280,7 +339,7 @@ if submit_button:
 else:
     # Home / instructions view
     st.markdown("## How to Use")
-    st.write("Enter your exact birth date and time in the sidebar, select the GMT offset for your birth location, optionally enable precise longitude for improved accuracy, then click 'Calculate Day Master'.")
+    st.write("Enter your exact birth date and time in the sidebar, select the GMT offset (or the named time zone, which applies historical daylight saving time) for your birth location, optionally enable precise longitude for improved accuracy, then click 'Calculate Day Master'.")
     st.write("")
     st.markdown("**What You'll Discover:**")
     st.markdown(
@@ -0,0 +1,320 @@
+# bazi_batch.py
+import datetime
+
+import numpy as np
+
+import bazi_metrics
+from bazi_core import (
+    HEAVENLY_STEMS, EARTHLY_BRANCHES, EOT_MODELS, EQUATION_OF_TIME_BY_DOY, US_PER_DAY, US_PER_MINUTE,
+    validate_input,
+)
+from solar_terms import get_month_boundary_index
+
+# Solar instants are carried as int64 microseconds since 1970-01-01 (the same
+# encoding as bazi_core's integer fast path) so that the batch path reproduces
+# datetime + timedelta arithmetic exactly.
+
+# Equation of Time for every possible day of year (index 0 is unused).
+# Built from bazi_core.equation_of_time so the batch values are bit-identical.
+EOT_TABLE = np.array(EQUATION_OF_TIME_BY_DOY)
+
+# ----------------------
+# Calendar helpers
+# ----------------------
+def civil_to_days(year, month, day):
+    """
+    Convert Gregorian date arrays to days since 1970-01-01.
+
+    Args:
+        year, month, day (array-like of int): Date components
+
+    Returns:
+        ndarray: int64 day numbers
+    """
+    year = np.asarray(year, dtype=np.int64)
+    month = np.asarray(month, dtype=np.int64)
+    day = np.asarray(day, dtype=np.int64)
+    months = (year - 1970) * 12 + (month - 1)
+    dates = months.astype("datetime64[M]").astype("datetime64[D]") + (day - 1)
+    return dates.astype(np.int64)
+
+def days_to_civil(days):
+    """
+    Convert days since 1970-01-01 back to Gregorian date arrays.
+
+    Args:
+        days (array-like of int): Day numbers
+
+    Returns:
+        tuple: (year, month, day) int64 arrays
+    """
+    dates = np.asarray(days, dtype=np.int64).astype("datetime64[D]")
+    months = dates.astype("datetime64[M]")
+    year = months.astype("datetime64[Y]").astype(np.int64) + 1970
+    month = months.astype(np.int64) % 12 + 1
+    day = (dates - months.astype("datetime64[D]")).astype(np.int64) + 1
+    return year, month, day
+
+def day_of_year_batch(year, month, day):
+    """Calculate day of year (1-366) for date arrays"""
+    days = civil_to_days(year, month, day)
+    jan1 = civil_to_days(year, 1, 1)
+    return days - jan1 + 1
+
+# ----------------------
+# Input Validation
+# ----------------------
+_DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+def validate_input_batch(year, month, day, hour, minute, longitude=None):
+    """
+    Vectorized counterpart of bazi_core.validate_input.
+
+    The checks run on whole arrays; messages are produced by validate_input
+    itself for the (usually few) rows that fail, so they read identically.
+
+    Args:
+        year, month, day, hour, minute (array-like of int): Birth date/time components
+        longitude (array-like of float, optional): Longitude in decimal degrees
+
+    Returns:
+        tuple: (valid, errors) where valid is a bool array and errors maps
+            row position -> error message
+    """
+    year, month, day, hour, minute = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.int64) for a in (year, month, day, hour, minute))
+    )
+    current_year = datetime.datetime.now().year
+    valid = (year >= 1900) & (year <= current_year) & (month >= 1) & (month <= 12)
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    max_day = _DAYS_IN_MONTH[np.clip(month, 0, 12)] + (leap & (month == 2))
+    valid &= (day >= 1) & (day <= max_day)
+    valid &= (hour >= 0) & (hour <= 23) & (minute >= 0) & (minute <= 59)
+    if longitude is not None:
+        longitude = np.broadcast_to(np.asarray(longitude, dtype=np.float64), year.shape)
+        valid &= (longitude >= -180.0) & (longitude <= 180.0)
+
+    errors = {}
+    for i in np.flatnonzero(~valid):
+        errors[int(i)] = validate_input(int(year[i]), int(month[i]), int(day[i]), int(hour[i]), int(minute[i]),
+                                        None if longitude is None else float(longitude[i]))
+    return valid, errors
+
+# ----------------------
+# Solar Time Calculation
+# ----------------------
+def civil_to_apparent_solar_batch(year, month, day, hour, minute, timezone_offset, longitude, eot_model="noaa"):
+    """
+    Vectorized counterpart of bazi_core.civil_to_apparent_solar.
+
+    Args:
+        year, month, day, hour, minute (array-like of int): Civil time components
+        timezone_offset (array-like of float): Timezone offset from GMT in hours
+        longitude (array-like of float): Longitude in decimal degrees
+        eot_model (str): Equation of time model, one of bazi_core.EOT_MODELS
+
+    Returns:
+        tuple: (solar_us, longitude_correction_minutes, equation_of_time_minutes)
+            where solar_us is int64 microseconds since 1970-01-01
+    """
+    start = bazi_metrics.ENABLED and bazi_metrics.clock()
+    year, month, day, hour, minute = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.int64) for a in (year, month, day, hour, minute))
+    )
+    timezone_offset = np.asarray(timezone_offset, dtype=np.float64)
+    longitude = np.asarray(longitude, dtype=np.float64)
+
+    days = civil_to_days(year, month, day)
+    if eot_model == "noaa":
+        eot = EOT_TABLE[days - civil_to_days(year, 1, 1) + 1]
+    elif eot_model == "ephemeris":
+        from equation_of_time_table import get_equation_of_time_table
+        ut_minutes = days * 1440 + hour * 60 + minute - timezone_offset * 60.0
+        eot = get_equation_of_time_table().lookup_array(ut_minutes)
+    else:
+        raise ValueError(f"Unknown equation of time model: {eot_model!r} (expected one of {', '.join(EOT_MODELS)})")
+
+    # Same operation order as bazi_core.longitude_correction
+    tz_meridian = timezone_offset * 15.0
+    long_corr = (longitude - tz_meridian) / 15.0 * 60.0
+    total_correction = long_corr + eot
+
+    # datetime.timedelta(minutes=x) keeps the whole minutes exactly and rounds
+    # the fractional part to the nearest microsecond (half to even).
+    frac, whole = np.modf(total_correction)
+    offset_us = whole.astype(np.int64) * US_PER_MINUTE + np.rint(frac * US_PER_MINUTE).astype(np.int64)
+
+    civil_us = days * US_PER_DAY + (hour * 60 + minute) * US_PER_MINUTE
+    if start:
+        bazi_metrics.observe("solar_correction", start, civil_us.size, "batch")
+    return civil_us + offset_us, long_corr, eot
+
+# ----------------------
+# Solar Term Lookup
+# ----------------------
+def find_bazi_year_month_batch(solar_us):
+    """
+    Vectorized counterpart of solar_terms.find_bazi_year_month.
+
+    Args:
+        solar_us (array-like of int): Solar instants in microseconds since 1970-01-01
+
+    Returns:
+        tuple: (bazi_year, bazi_month, year_start, month_start) where the start
+            arrays are epoch minutes with NO_TERM (NaT) where no term data is available
+    """
+    start = bazi_metrics.ENABLED and bazi_metrics.clock()
+    minutes = np.asarray(solar_us, dtype=np.int64) // US_PER_MINUTE
+    result = get_month_boundary_index().lookup_array(minutes)
+    if start:
+        bazi_metrics.observe("term_lookup", start, minutes.size, "batch")
+    return result
+
+# ----------------------
+# Batch Four Pillars Calculation
+# ----------------------
+def gregorian_to_julian_date_batch(year, month, day, hour, minute, second):
+    """
+    Vectorized counterpart of bazi_core.gregorian_to_julian_date.
+
+    Args:
+        year, month, day, hour, minute, second (ndarray of int): Date/time components
+
+    Returns:
+        ndarray: float64 Julian Dates
+    """
+    day_fraction = (hour + minute / 60.0 + second / 3600.0) / 24.0
+    early = month <= 2
+    Y = np.where(early, year - 1, year)
+    M = np.where(early, month + 12, month)
+    D = day + day_fraction
+    A = Y // 100
+    B = 2 - A + (A // 4)
+    # Keep the scalar evaluation order so results are bit-identical
+    jd = (np.floor(365.25 * (Y + 4716)).astype(np.int64)
+          + np.floor(30.6001 * (M + 1)).astype(np.int64)) + D + B - 1524.5
+    return jd
+
+def create_four_pillars_batch(solar_us, dedupe=False):
+    """
+    Calculate integer-coded Four Pillars for an array of solar instants.
+
+    Args:
+        solar_us (array-like of int): Solar instants in microseconds since 1970-01-01
+        dedupe (bool): Calculate each distinct solar minute once and fan the
+            results back out. Pays off when many rows share a solar minute.
+
+    Returns:
+        dict: Arrays keyed like the scalar result. Each pillar is stored as
+            `<pillar>_stem` (0-9) and `<pillar>_branch` (0-11) uint8 indices into
+            HEAVENLY_STEMS / EARTHLY_BRANCHES.
+    """
+    solar_us = np.atleast_1d(np.asarray(solar_us, dtype=np.int64))
+    if dedupe:
+        return _create_four_pillars_deduped(solar_us)
+    bazi_year, bazi_month, year_start, month_start = find_bazi_year_month_batch(solar_us)
+
+    start = bazi_metrics.ENABLED and bazi_metrics.clock()
+    days = solar_us // US_PER_DAY
+    us_of_day = solar_us - days * US_PER_DAY
+    year, month, day = days_to_civil(days)
+    hour = us_of_day // 3_600_000_000
+    minute = us_of_day // US_PER_MINUTE % 60
+    second = us_of_day // 1_000_000 % 60
+
+    # Year and month pillars (calculate_year_pillar / calculate_month_pillar)
+    sexagenary_year_index = (bazi_year - 3) % 60
+    year_stem = sexagenary_year_index % 10
+    year_branch = sexagenary_year_index % 12
+    month_stem = (year_stem + 2 + (bazi_month - 1)) % 10
+    month_branch = (bazi_month - 1) % 12
+
+    # Day pillar (calculate_day_master_from_solar)
+    jd = gregorian_to_julian_date_batch(year, month, day, hour, minute, second)
+    jd_noon = np.floor(jd + 0.5).astype(np.int64)
+    day_stem = (jd_noon - 1) % 10
+    day_branch = (jd_noon + 1) % 12
+
+    # Hour pillar (calculate_hour_pillar)
+    hour_slot = (hour + 1) // 2
+    hour_stem = (day_stem + hour_slot) % 10
+    hour_branch = hour_slot % 12
+
+    result = {
+        "year_stem": year_stem.astype(np.uint8),
+        "year_branch": year_branch.astype(np.uint8),
+        "month_stem": month_stem.astype(np.uint8),
+        "month_branch": month_branch.astype(np.uint8),
+        "day_stem": day_stem.astype(np.uint8),
+        "day_branch": day_branch.astype(np.uint8),
+        "hour_stem": hour_stem.astype(np.uint8),
+        "hour_branch": hour_branch.astype(np.uint8),
+        "jd": jd,
+        "jd_noon": jd_noon,
+        "bazi_year": bazi_year,
+        "bazi_month": bazi_month,
+        "bazi_year_start": year_start.astype("datetime64[m]"),
+        "bazi_month_start": month_start.astype("datetime64[m]"),
+    }
+    if start:
+        bazi_metrics.observe("day_pillar", start, solar_us.size, "batch")
+    return result
+
+def _create_four_pillars_deduped(solar_us):
+    """create_four_pillars_batch over unique solar minutes, with exact per-row jd"""
+    minutes = solar_us // US_PER_MINUTE
+    unique_minutes, inverse = np.unique(minutes, return_inverse=True)
+    unique = create_four_pillars_batch(unique_minutes * US_PER_MINUTE)
+    result = {name: values[inverse] for name, values in unique.items()}
+
+    # Only the fractional Julian Date depends on the seconds within the minute
+    days = solar_us // US_PER_DAY
+    us_of_day = solar_us - days * US_PER_DAY
+    year, month, day = days_to_civil(days)
+    result["jd"] = gregorian_to_julian_date_batch(year, month, day, us_of_day // 3_600_000_000,
+                                                  us_of_day // US_PER_MINUTE % 60,
+                                                  us_of_day // 1_000_000 % 60)
+    return result
+
+def calculate_four_pillars_batch(year, month, day, hour, minute, timezone_offset, longitude, dedupe=False,
+                                 eot_model="noaa"):
+    """
+    Run the full civil time -> Four Pillars pipeline for arrays of births.
+
+    Args:
+        year, month, day, hour, minute (array-like of int): Civil time components
+        timezone_offset (array-like of float): Timezone offset from GMT in hours
+        longitude (array-like of float): Longitude in decimal degrees
+        dedupe (bool): See create_four_pillars_batch
+        eot_model (str): Equation of time model, one of bazi_core.EOT_MODELS
+
+    Returns:
+        dict: create_four_pillars_batch output plus `solar` (datetime64[us]),
+            `longitude_correction` and `equation_of_time` (minutes)
+    """
+    solar_us, long_corr, eot = civil_to_apparent_solar_batch(
+        year, month, day, hour, minute, timezone_offset, longitude, eot_model
+    )
+    solar_us = np.atleast_1d(solar_us)
+    result = create_four_pillars_batch(solar_us, dedupe)
+    result["solar"] = solar_us.astype("datetime64[us]")
+    result["longitude_correction"] = np.broadcast_to(long_corr, solar_us.shape).copy()
+    result["equation_of_time"] = np.broadcast_to(eot, solar_us.shape).copy()
+    return result
+
+def format_pillars(stems, branches):
+    """
+    Decode stem/branch index arrays into Chinese pillar strings (e.g. 甲子).
+
+    Args:
+        stems, branches (array-like of int): Indices into HEAVENLY_STEMS / EARTHLY_BRANCHES
+
+    Returns:
+        ndarray: Unicode pillar strings
+    """
+    start = bazi_metrics.ENABLED and bazi_metrics.clock()
+    pillars = np.char.add(np.array(HEAVENLY_STEMS)[np.asarray(stems)],
+                          np.array(EARTHLY_BRANCHES)[np.asarray(branches)])
+    if start:
+        bazi_metrics.observe("result_building", start, pillars.size, "batch")
+    return pillars
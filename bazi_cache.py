@@ -0,0 +1,127 @@
+# bazi_cache.py
+import collections
+
+from bazi_core import (
+    US_PER_MINUTE, FourPillars, civil_from_days, civil_to_apparent_solar_us,
+    create_four_pillars, gregorian_to_julian_date,
+)
+from solar_terms import datetime_to_epoch_minutes
+
+class ChartCache:
+    """
+    Bounded LRU cache of FourPillars keyed by apparent solar minute.
+
+    Every pillar, the BaZi year/month and the term boundaries are constant
+    within a solar minute; only the fractional Julian Date moves with the
+    seconds. Hits for a different second get a copy with the exact jd, so
+    results are identical to create_four_pillars.
+    """
+
+    def __init__(self, maxsize=500_000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()  # minute -> (second, FourPillars)
+
+    def _lookup(self, minute):
+        entry = self._entries.get(minute)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(minute)
+        return entry
+
+    def _store(self, minute, second, chart):
+        self._entries[minute] = (second, chart)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def four_pillars(self, dt_solar):
+        """
+        Cached create_four_pillars.
+
+        Args:
+            dt_solar (datetime): Solar time
+
+        Returns:
+            FourPillars: Pillars for the instant
+        """
+        minute = datetime_to_epoch_minutes(dt_solar)
+        entry = self._lookup(minute)
+        if entry is None:
+            chart = create_four_pillars(dt_solar)
+            self._store(minute, dt_solar.second, chart)
+            return chart
+        second, chart = entry
+        if second == dt_solar.second:
+            return chart
+        return chart.with_jd(gregorian_to_julian_date(dt_solar.year, dt_solar.month, dt_solar.day,
+                                                      dt_solar.hour, dt_solar.minute, dt_solar.second))
+
+    def four_pillars_with_solar_terms(self, dt_solar):
+        """Cached create_four_pillars_with_solar_terms (a fresh dict per call)"""
+        return self.four_pillars(dt_solar).to_dict()
+
+    def four_pillars_from_solar_us(self, solar_us):
+        """
+        Cached FourPillars.from_solar_us.
+
+        Args:
+            solar_us (int): Solar time in microseconds since 1970-01-01
+
+        Returns:
+            FourPillars: Pillars for the instant
+        """
+        minute, us_of_minute = divmod(solar_us, US_PER_MINUTE)
+        second = us_of_minute // 1_000_000
+        entry = self._lookup(minute)
+        if entry is None:
+            chart = FourPillars.from_solar_us(solar_us)
+            self._store(minute, second, chart)
+            return chart
+        cached_second, chart = entry
+        if cached_second == second:
+            return chart
+        days, minute_of_day = divmod(minute, 1440)
+        year, month, day = civil_from_days(days)
+        return chart.with_jd(gregorian_to_julian_date(year, month, day, minute_of_day // 60,
+                                                      minute_of_day % 60, second))
+
+    def chart(self, year, month, day, hour, minute, longitude, timezone_offset, eot_model="noaa"):
+        """
+        Civil time to cached FourPillars via the integer fast path.
+
+        The cache is keyed by solar minute, so charts from either equation of
+        time model (bazi_core.EOT_MODELS) share it.
+
+        Returns:
+            tuple: (FourPillars, solar_us, longitude_correction_minutes, equation_of_time_minutes)
+        """
+        solar_us, long_corr, eot = civil_to_apparent_solar_us(year, month, day, hour, minute,
+                                                              longitude, timezone_offset, eot_model)
+        return self.four_pillars_from_solar_us(solar_us), solar_us, long_corr, eot
+
+    def stats(self):
+        """
+        Cache counters.
+
+        Returns:
+            dict: hits, misses, evictions, size, maxsize and hit_rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
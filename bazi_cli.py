@@ -0,0 +1,284 @@
+# bazi_cli.py
+# Streaming batch runner: birth records in (CSV or Parquet), Four Pillars out.
+#
+# Usage:
+#     python bazi_cli.py births.csv charts.parquet --chunk-size 200000 --workers 8
+#
+# Input columns: year, month, day, hour, minute, and optionally tz_offset,
+# timezone (IANA name, resolved with historical DST; takes precedence over
+# tz_offset) and longitude. Missing offsets use --tz-offset; missing longitude
+# falls back to the timezone meridian, as in the Streamlit app.
+# --eot-model ephemeris uses the precomputed high-precision equation of time.
+# --lunar reads year, month and day as a lunar (农历) date, with an optional
+# leap_month column (1 for dates in the leap month).
+# --metrics writes per-stage timings (see bazi_metrics.py) in Prometheus text
+# format when the run finishes, e.g. for the node_exporter textfile collector.
+import argparse
+import collections
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytz
+
+import bazi_metrics
+from bazi_batch import calculate_four_pillars_batch, validate_input_batch
+from bazi_core import EOT_MODELS
+from bazi_timezone import LOCAL_OK, localize_batch, local_status_message
+from chart_table import ChartTable, PILLARS
+
+BIRTH_COLUMNS = ("year", "month", "day", "hour", "minute")
+OPTIONAL_COLUMNS = ("tz_offset", "timezone", "longitude", "leap_month")
+TEXT_COLUMNS = ("timezone",)
+
+# ----------------------
+# Chunk processing (runs in worker processes)
+# ----------------------
+def process_chunk(chunk, first_row, default_tz_offset=8.0, dedupe=False, eot_model="noaa", lunar=False):
+    """
+    Validate and calculate one chunk of birth records.
+
+    Args:
+        chunk (dict): Column name -> NumPy array
+        first_row (int): Row number of the chunk's first record in the input
+        default_tz_offset (float): Offset used when the input has no tz_offset column
+        dedupe (bool): Calculate each distinct solar minute once
+        eot_model (str): Equation of time model, one of bazi_core.EOT_MODELS
+        lunar (bool): year, month and day are a lunar date (leap_month column optional)
+
+    Returns:
+        tuple: (ChartTable for the valid rows, list of (row, message) errors)
+    """
+    n = len(chunk["year"])
+    rows = np.arange(first_row, first_row + n, dtype=np.int64)
+    values = {name: np.asarray(chunk[name], dtype=np.float64) for name in BIRTH_COLUMNS}
+    tz_offset = np.array(chunk.get("tz_offset", np.full(n, default_tz_offset)), dtype=np.float64)
+
+    errors = []
+    present = np.all([~np.isnan(v) for v in values.values()], axis=0)
+    # Reject fractional (or infinite) fields rather than truncating them to integers
+    fractional = present & ~np.all([np.isfinite(v) & (v == np.floor(v)) for v in values.values()], axis=0)
+    for i in np.flatnonzero(fractional):
+        errors.append((int(rows[i]), "Invalid date/time: year, month, day, hour and minute must be whole numbers"))
+    present &= ~fractional
+    ints = [np.where(present, values[name], 0).astype(np.int64) for name in BIRTH_COLUMNS]
+    lunar_ok = np.ones(n, dtype=bool)
+    if lunar:
+        from lunar_calendar import lunar_to_civil_batch
+        leap = np.nan_to_num(np.asarray(chunk.get("leap_month", np.zeros(n)), dtype=np.float64)) != 0
+        ints[0], ints[1], ints[2], lunar_ok = lunar_to_civil_batch(*ints[:3], leap)
+        for i in np.flatnonzero(present & ~lunar_ok):
+            errors.append((int(rows[i]), "Invalid lunar date or outside 1900-2100"))
+    zone_ok = np.ones(n, dtype=bool)
+    # Meridian for rows without a longitude: the standard offset, without DST
+    meridian_offset = tz_offset.copy()
+    if "timezone" in chunk:
+        zones = np.asarray(chunk["timezone"], dtype=object)
+        named = present & lunar_ok & np.array([isinstance(z, str) and z != "" for z in zones], dtype=bool)
+        unknown = named & ~np.isin(zones, list(pytz.all_timezones_set))
+        for i in np.flatnonzero(unknown):
+            errors.append((int(rows[i]), f"Unknown time zone: {zones[i]}"))
+        named &= ~unknown
+        status = np.full(n, LOCAL_OK, dtype=np.int8)
+        tz_offset[named], status[named], meridian_offset[named] = localize_batch(zones[named],
+                                                                                 *(v[named] for v in ints))
+        zone_ok = ~unknown & (status == LOCAL_OK)
+        for i in np.flatnonzero(status != LOCAL_OK):
+            errors.append((int(rows[i]), local_status_message(status[i], zones[i])))
+    for i in np.flatnonzero((~present | (zone_ok & np.isnan(tz_offset))) & ~fractional):
+        errors.append((int(rows[i]), "Missing birth date, time or timezone"))
+    present &= zone_ok & ~np.isnan(tz_offset) & lunar_ok
+
+    longitude = np.asarray(chunk["longitude"], dtype=np.float64) if "longitude" in chunk else np.full(n, np.nan)
+    longitude = np.where(np.isnan(longitude), meridian_offset * 15.0, longitude)
+    valid, messages = validate_input_batch(*ints, longitude)
+    for i, message in messages.items():
+        if present[i]:
+            errors.append((int(rows[i]), message))
+    errors.sort()
+
+    keep = present & valid
+    result = calculate_four_pillars_batch(*(v[keep] for v in ints), tz_offset[keep], longitude[keep], dedupe,
+                                          eot_model)
+    table = ChartTable.from_batch(result, extra={
+        "row": rows[keep],
+        "solar": result["solar"],
+        "longitude_correction": result["longitude_correction"],
+        "equation_of_time": result["equation_of_time"],
+    })
+    return table, errors
+
+def _process_chunk_measured(*args):
+    """process_chunk in a worker process, also returning that chunk's stage metrics"""
+    bazi_metrics.enable()
+    bazi_metrics.reset()
+    table, errors = process_chunk(*args)
+    return table, errors, bazi_metrics.export_state()
+
+# ----------------------
+# Readers and writers
+# ----------------------
+def iter_chunks(path, chunk_size, extra_columns=()):
+    """
+    Stream an input file as dicts of NumPy arrays.
+
+    Args:
+        path (str): .csv or .parquet file
+        chunk_size (int): Rows per chunk
+        extra_columns (tuple): Further columns to pass through (read as text from CSV)
+
+    Yields:
+        dict: Column name -> NumPy array
+    """
+    wanted = set(BIRTH_COLUMNS + OPTIONAL_COLUMNS + tuple(extra_columns))
+    text_columns = TEXT_COLUMNS + tuple(extra_columns)
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        columns = [c for c in parquet_file.schema_arrow.names if c in wanted]
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield {name: batch.column(name).to_numpy(zero_copy_only=False) for name in columns}
+    else:
+        import pandas as pd
+        reader = pd.read_csv(path, chunksize=chunk_size, usecols=lambda c: c in wanted,
+                             dtype={name: object for name in text_columns})
+        for frame in reader:
+            yield {name: frame[name].to_numpy(dtype=object if name in text_columns else np.float64)
+                   for name in frame.columns}
+
+class ChunkWriter:
+    """Incremental CSV or Parquet writer for ChartTable chunks"""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self._writer = None
+        self.rows = 0
+
+    def write(self, table):
+        if self.parquet:
+            import pyarrow.parquet as pq
+            arrow_table = table.to_arrow()
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, arrow_table.schema, use_dictionary=list(PILLARS),
+                                                compression="zstd")
+            self._writer.write_table(arrow_table)
+        else:
+            import pandas as pd
+            frame = pd.DataFrame({name: table.decode(name) if name in PILLARS else values
+                                  for name, values in table.columns.items()})
+            frame.to_csv(self.path, mode="a" if self.rows else "w", header=not self.rows, index=False)
+        self.rows += len(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+# ----------------------
+# Driver
+# ----------------------
+def run(input_path, output_path, errors_path=None, chunk_size=100_000, workers=None, default_tz_offset=8.0,
+        dedupe=False, eot_model="noaa", lunar=False, metrics_path=None):
+    """
+    Stream input records through the batch pipeline into the output file.
+
+    Chunks are processed in a process pool with a bounded number in flight and
+    written in input order, so memory stays constant regardless of file size.
+
+    Args:
+        input_path (str): .csv or .parquet birth records
+        output_path (str): .csv or .parquet results
+        errors_path (str, optional): CSV of rejected rows (row, message)
+        chunk_size (int): Rows per chunk
+        workers (int, optional): Worker processes (default: CPU count; 1 runs inline)
+        default_tz_offset (float): Offset for inputs without a tz_offset column
+        dedupe (bool): Calculate each distinct solar minute of a chunk once
+        eot_model (str): Equation of time model, one of bazi_core.EOT_MODELS
+        lunar (bool): Input dates are lunar (see process_chunk)
+        metrics_path (str, optional): Record stage timings (in the workers too)
+            and write them here in Prometheus text format
+
+    Returns:
+        dict: Counts of written and rejected rows
+    """
+    workers = workers or os.cpu_count() or 1
+    writer = ChunkWriter(output_path)
+    error_handle = open(errors_path, "w", newline="") if errors_path else None
+    error_writer = csv.writer(error_handle) if error_handle else None
+    if error_writer:
+        error_writer.writerow(("row", "message"))
+    rejected = 0
+    metrics_were_enabled = bazi_metrics.ENABLED
+    if metrics_path:
+        bazi_metrics.enable()
+
+    def consume(table, errors, metrics_state=None):
+        nonlocal rejected
+        if metrics_state:
+            bazi_metrics.merge_state(metrics_state)
+        if len(table):
+            writer.write(table)
+        rejected += len(errors)
+        if error_writer:
+            error_writer.writerows(errors)
+
+    try:
+        first_row = 0
+        if workers == 1:
+            for chunk in iter_chunks(input_path, chunk_size):
+                consume(*process_chunk(chunk, first_row, default_tz_offset, dedupe, eot_model, lunar))
+                first_row += len(chunk["year"])
+        else:
+            pending = collections.deque()
+            task = _process_chunk_measured if metrics_path else process_chunk
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for chunk in iter_chunks(input_path, chunk_size):
+                    pending.append(pool.submit(task, chunk, first_row, default_tz_offset, dedupe,
+                                               eot_model, lunar))
+                    first_row += len(chunk["year"])
+                    if len(pending) >= 2 * workers:
+                        consume(*pending.popleft().result())
+                while pending:
+                    consume(*pending.popleft().result())
+        if metrics_path:
+            bazi_metrics.write_prometheus_file(metrics_path)
+    finally:
+        writer.close()
+        if error_handle:
+            error_handle.close()
+        if not metrics_were_enabled:
+            bazi_metrics.disable()
+    return {"written": writer.rows, "rejected": rejected}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calculate Four Pillars for a file of birth records.")
+    parser.add_argument("input", help="Input .csv or .parquet file")
+    parser.add_argument("output", help="Output .csv or .parquet file")
+    parser.add_argument("--errors", help="Write rejected rows to this CSV file")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows per chunk (default: 100000)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--tz-offset", type=float, default=8.0,
+                        help="GMT offset in hours when the input has no tz_offset column (default: 8)")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="Calculate each distinct solar minute once per chunk (fast on repetitive data)")
+    parser.add_argument("--eot-model", choices=EOT_MODELS, default="noaa",
+                        help="Equation of time: 'noaa' approximation or the precomputed 'ephemeris' table "
+                             "(default: noaa)")
+    parser.add_argument("--lunar", action="store_true",
+                        help="year/month/day are lunar (农历) dates; optional leap_month column marks leap months")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="Write per-stage timings to this file in Prometheus text format")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    counts = run(args.input, args.output, args.errors, args.chunk_size, args.workers, args.tz_offset,
+                 args.dedupe, args.eot_model, args.lunar, args.metrics)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {counts['written']} charts ({counts['rejected']} rejected) in {elapsed:.1f}s", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,9 @@
 # bazi_core.py
 import datetime
-import calendar
 import math
-from solar_terms import find_bazi_year_month, get_solar_term_datetime
+
+import bazi_metrics
+from solar_terms import find_bazi_year_month, get_solar_term_datetime, get_month_boundary_index
 
 # Heavenly Stems and Earthly Branches
 HEAVENLY_STEMS = ["甲","乙","丙","丁","戊","己","庚","辛","壬","癸"]
@@ -55,6 +56,31 @@ def equation_of_time(doy):
     eot = 9.87 * math.sin(2 * B) - 7.53 * math.cos(B) - 1.5 * math.sin(B)
     return eot
 
+# Equation of time models: "noaa" is the 3-term approximation above (30 s off
+# on average, up to 2 minutes); "ephemeris" interpolates the per-day table
+# precomputed from the VSOP87 sun model (equation_of_time_table.py).
+EOT_MODELS = ("noaa", "ephemeris")
+
+def equation_of_time_for_civil(year, month, day, hour, minute, timezone_offset, eot_model="noaa"):
+    """
+    Equation of time for a civil time under the selected model.
+
+    Args:
+        year, month, day, hour, minute (int): Civil time components
+        timezone_offset (float): Timezone offset from GMT in hours
+        eot_model (str): One of EOT_MODELS
+
+    Returns:
+        float: Equation of time in minutes
+    """
+    if eot_model == "noaa":
+        return EQUATION_OF_TIME_BY_DOY[day_of_year_fast(year, month, day)]
+    if eot_model == "ephemeris":
+        from equation_of_time_table import get_equation_of_time_table
+        ut_minutes = days_from_civil(year, month, day) * 1440 + hour * 60 + minute - timezone_offset * 60.0
+        return get_equation_of_time_table().lookup(ut_minutes)
+    raise ValueError(f"Unknown equation of time model: {eot_model!r} (expected one of {', '.join(EOT_MODELS)})")
+
 def longitude_correction(longitude, timezone_offset):
     """
     Calculate longitude correction for solar time.
@@ -70,28 +96,47 @@ def longitude_correction(longitude, timezone_offset):
     correction_minutes = (longitude - tz_meridian) / 15.0 * 60.0
     return correction_minutes
 
-def civil_to_apparent_solar(dt_civil, longitude, timezone_offset):
+def civil_to_apparent_solar(dt_civil, longitude, timezone_offset, eot_model="noaa"):
     """
     Convert civil (clock) time to apparent solar time.
     
     Args:
         dt_civil (datetime): Civil time
         longitude (float): Longitude in decimal degrees  
-        timezone_offset (float): Timezone offset from GMT in hours
+        timezone_offset (float or str): Timezone offset from GMT in hours, or an
+            IANA zone name (e.g. "Asia/Shanghai") resolved with historical DST;
+            see bazi_timezone.resolve_utc_offset for ambiguous/non-existent times
+        eot_model (str): Equation of time model, one of EOT_MODELS
         
     Returns:
         tuple: (solar_datetime, longitude_correction_minutes, equation_of_time_minutes)
     """
-    doy = day_of_year(dt_civil.year, dt_civil.month, dt_civil.day)
-    eot = equation_of_time(doy)
+    start = bazi_metrics.ENABLED and bazi_metrics.clock()
+    if isinstance(timezone_offset, str):
+        from bazi_timezone import resolve_utc_offset
+        timezone_offset = resolve_utc_offset(timezone_offset, dt_civil.year, dt_civil.month, dt_civil.day,
+                                             dt_civil.hour, dt_civil.minute)
+    if eot_model == "noaa":
+        eot = equation_of_time(day_of_year(dt_civil.year, dt_civil.month, dt_civil.day))
+    else:
+        eot = equation_of_time_for_civil(dt_civil.year, dt_civil.month, dt_civil.day,
+                                         dt_civil.hour, dt_civil.minute, timezone_offset, eot_model)
     long_corr = longitude_correction(longitude, timezone_offset)
     total_correction = long_corr + eot
     dt_solar = dt_civil + datetime.timedelta(minutes=total_correction)
+    if start:
+        bazi_metrics.observe("solar_correction", start)
     return dt_solar, long_corr, eot
 
 # ----------------------
 # Input Validation
 # ----------------------
+# Month lengths and names inline rather than from the calendar module, whose
+# locale and enum imports would dominate the cold import of this module
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+MONTH_NAMES = ("", "January", "February", "March", "April", "May", "June", "July", "August", "September",
+               "October", "November", "December")
+
 def validate_input(year, month, day, hour, minute, longitude=None):
     """
     Validate birth information input.
@@ -108,12 +153,10 @@ def validate_input(year, month, day, hour, minute, longitude=None):
         return f"Year must be between 1900 and {current_year}"
     if not (1 <= month <= 12):
         return "Month must be between 1 and 12"
-    try:
-        max_day = calendar.monthrange(year, month)[1]
-        if not (1 <= day <= max_day):
-            return f"Day must be between 1 and {max_day} for {calendar.month_name[month]}"
-    except:
-        return "Invalid month/year combination"
+    leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    max_day = _DAYS_IN_MONTH[month] + (month == 2 and leap)
+    if not (1 <= day <= max_day):
+        return f"Day must be between 1 and {max_day} for {MONTH_NAMES[month]}"
     if not (0 <= hour <= 23):
         return "Hour must be between 0 and 23"
     if not (0 <= minute <= 59):
@@ -221,6 +264,172 @@ def calculate_hour_pillar(day_stem, solar_hour):
     hour_stem = HEAVENLY_STEMS[(HEAVENLY_STEMS.index(day_stem) + hour_slot) % 10]
     return hour_stem, hour_branch
 
+def pillar_indices(bazi_year, bazi_month, jd_noon, solar_hour):
+    """
+    Calculate stem/branch indices for all four pillars.
+    
+    Same arithmetic as calculate_year_pillar, calculate_month_pillar,
+    calculate_day_master_from_solar and calculate_hour_pillar, on indices.
+    
+    Args:
+        bazi_year (int): BaZi year
+        bazi_month (int): BaZi month (1-12)
+        jd_noon (int): Julian Day Number at noon of the solar date
+        solar_hour (int): Hour in solar time (0-23)
+        
+    Returns:
+        tuple: (year_stem, year_branch, month_stem, month_branch,
+                day_stem, day_branch, hour_stem, hour_branch) indices into
+                HEAVENLY_STEMS / EARTHLY_BRANCHES
+    """
+    sexagenary_year_index = (bazi_year - 3) % 60
+    year_stem = sexagenary_year_index % 10
+    day_stem = (jd_noon - 1) % 10
+    hour_slot = (solar_hour + 1) // 2
+    return (year_stem, sexagenary_year_index % 12,
+            (year_stem + 2 + (bazi_month - 1)) % 10, (bazi_month - 1) % 12,
+            day_stem, (jd_noon + 1) % 12,
+            (day_stem + hour_slot) % 10, hour_slot % 12)
+
+def _translations(stem, branch):
+    return {
+        "pinyin": f"{HEAVENLY_STEMS_EN[stem]} {EARTHLY_BRANCHES_EN[branch]}",
+        "meaning": f"{STEMS_ELEMENTS[stem]} {BRANCHES_ANIMALS[branch]}"
+    }
+
+class FourPillars:
+    """
+    Compact Four Pillars result.
+    
+    Stores the stem/branch indices, Julian Date and solar term boundaries.
+    Pillar strings, translations and formatted boundaries are built on access;
+    to_dict() gives the dict returned by create_four_pillars_with_solar_terms.
+    """
+    __slots__ = ("indices", "jd", "jd_noon", "bazi_year", "bazi_month", "year_start", "month_start")
+
+    def __init__(self, bazi_year, bazi_month, jd, jd_noon, solar_hour, year_start=None, month_start=None):
+        self.indices = pillar_indices(bazi_year, bazi_month, jd_noon, solar_hour)
+        self.jd = jd
+        self.jd_noon = jd_noon
+        self.bazi_year = bazi_year
+        self.bazi_month = bazi_month
+        self.year_start = year_start
+        self.month_start = month_start
+
+    @classmethod
+    def from_solar_us(cls, solar_us):
+        """Build from a solar instant in microseconds since 1970-01-01 (see the integer fast path)"""
+        start = bazi_metrics.ENABLED and bazi_metrics.clock()
+        bazi_year, bazi_month, year_start, month_start = get_month_boundary_index().lookup(solar_us // US_PER_MINUTE)
+        if start:
+            start = bazi_metrics.observe("term_lookup", start)
+        days, us_of_day = divmod(solar_us, US_PER_DAY)
+        year, month, day = civil_from_days(days)
+        hour = us_of_day // 3_600_000_000
+        jd = gregorian_to_julian_date(year, month, day, hour,
+                                      us_of_day // US_PER_MINUTE % 60, us_of_day // 1_000_000 % 60)
+        chart = cls(bazi_year, bazi_month, jd, julian_day_number_at_noon(jd), hour, year_start, month_start)
+        if start:
+            bazi_metrics.observe("day_pillar", start)
+        return chart
+
+    def with_jd(self, jd):
+        """Copy of this result for another instant in the same solar minute (only jd differs)"""
+        other = object.__new__(FourPillars)
+        other.indices = self.indices
+        other.jd = jd
+        other.jd_noon = self.jd_noon
+        other.bazi_year = self.bazi_year
+        other.bazi_month = self.bazi_month
+        other.year_start = self.year_start
+        other.month_start = self.month_start
+        return other
+
+    def _pillar(self, i):
+        return HEAVENLY_STEMS[self.indices[i]] + EARTHLY_BRANCHES[self.indices[i + 1]]
+
+    def _pillar_translations(self, i):
+        return _translations(HEAVENLY_STEMS[self.indices[i]], EARTHLY_BRANCHES[self.indices[i + 1]])
+
+    year = property(lambda self: self._pillar(0))
+    month = property(lambda self: self._pillar(2))
+    day = property(lambda self: self._pillar(4))
+    hour = property(lambda self: self._pillar(6))
+    year_translations = property(lambda self: self._pillar_translations(0))
+    month_translations = property(lambda self: self._pillar_translations(2))
+    day_translations = property(lambda self: self._pillar_translations(4))
+    hour_translations = property(lambda self: self._pillar_translations(6))
+
+    @property
+    def day_master(self):
+        return HEAVENLY_STEMS[self.indices[4]]
+
+    @property
+    def bazi_year_start(self):
+        return self.year_start.strftime("%B %d, %Y at %H:%M") if self.year_start else None
+
+    @property
+    def bazi_month_start(self):
+        return self.month_start.strftime("%B %d, %Y at %H:%M") if self.month_start else None
+
+    def to_dict(self):
+        """
+        Expand into the full result dictionary.
+        
+        Returns:
+            dict: Complete pillar information including metadata and translations
+        """
+        start = bazi_metrics.ENABLED and bazi_metrics.clock()
+        result = {
+            "year": self.year,
+            "month": self.month,
+            "day": self.day,
+            "hour": self.hour,
+            "day_master": self.day_master,
+            "year_translations": self.year_translations,
+            "month_translations": self.month_translations,
+            "day_translations": self.day_translations,
+            "hour_translations": self.hour_translations,
+            "jd": self.jd,
+            "jd_noon": self.jd_noon,
+            "bazi_year": self.bazi_year,
+            "bazi_month": self.bazi_month
+        }
+        
+        # Add solar term boundary information if available
+        if self.year_start:
+            result["bazi_year_start"] = self.bazi_year_start
+        if self.month_start:
+            result["bazi_month_start"] = self.bazi_month_start
+        
+        if start:
+            bazi_metrics.observe("result_building", start)
+        return result
+
+    def __repr__(self):
+        return f"FourPillars({self.year} {self.month} {self.day} {self.hour})"
+
+def create_four_pillars(dt_solar):
+    """
+    Create a compact FourPillars result using solar time and solar term boundaries.
+    
+    Args:
+        dt_solar (datetime): Solar time
+        
+    Returns:
+        FourPillars: Pillar indices and metadata; translations are computed on access
+    """
+    # Find correct BaZi year and month using solar terms
+    bazi_year, bazi_month, year_start, month_start = find_bazi_year_month(dt_solar)
+    start = bazi_metrics.ENABLED and bazi_metrics.clock()
+    jd = gregorian_to_julian_date(dt_solar.year, dt_solar.month, dt_solar.day,
+                                  dt_solar.hour, dt_solar.minute, dt_solar.second)
+    chart = FourPillars(bazi_year, bazi_month, jd, julian_day_number_at_noon(jd),
+                        dt_solar.hour, year_start, month_start)
+    if start:
+        bazi_metrics.observe("day_pillar", start)
+    return chart
+
 def create_four_pillars_with_solar_terms(dt_solar):
     """
     Create complete Four Pillars using solar time and solar term boundaries.
@@ -231,57 +440,136 @@ def create_four_pillars_with_solar_terms(dt_solar):
     Returns:
         dict: Complete pillar information including metadata and translations
     """
-    # Find correct BaZi year and month using solar terms
-    bazi_year, bazi_month, year_start, month_start = find_bazi_year_month(dt_solar)
+    return create_four_pillars(dt_solar).to_dict()
+
+# ----------------------
+# Integer fast path (no datetime objects)
+# ----------------------
+US_PER_MINUTE = 60_000_000
+US_PER_DAY = 86_400_000_000
+JDN_EPOCH = 2440588  # Julian Day Number of 1970-01-01, so jd_noon = solar day number + JDN_EPOCH
+_DAYS_BEFORE_MONTH = (0, 0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+# equation_of_time for every day of year (index 0 unused), so the fast path skips the trig
+EQUATION_OF_TIME_BY_DOY = (0.0,) + tuple(equation_of_time(doy) for doy in range(1, 367))
+
+def days_from_civil(year, month, day):
+    """
+    Convert a Gregorian date to days since 1970-01-01 using integer arithmetic.
+    
+    Args:
+        year, month, day (int): Date components
+        
+    Returns:
+        int: Day number
+    """
+    y = year - (month <= 2)
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+def civil_from_days(days):
+    """
+    Convert days since 1970-01-01 back to a Gregorian date.
     
-    # Calculate each pillar
-    year_stem, year_branch = calculate_year_pillar(bazi_year)
-    month_stem, month_branch = calculate_month_pillar(bazi_year, bazi_month)
-    day_stem, day_branch, jd, jd_noon = calculate_day_master_from_solar(dt_solar)
-    hour_stem, hour_branch = calculate_hour_pillar(day_stem, dt_solar.hour)
+    Args:
+        days (int): Day number
+        
+    Returns:
+        tuple: (year, month, day)
+    """
+    z = days + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = mp + 3 if mp < 10 else mp - 9
+    return yoe + era * 400 + (month <= 2), month, day
+
+def day_of_year_fast(year, month, day):
+    """Calculate day of year (1-366) without building a date object"""
+    leap = month > 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    return _DAYS_BEFORE_MONTH[month] + day + leap
+
+def civil_to_apparent_solar_us(year, month, day, hour, minute, longitude, timezone_offset, eot_model="noaa"):
+    """
+    Integer counterpart of civil_to_apparent_solar.
     
-    # Format pillar strings
-    year_pillar = f"{year_stem}{year_branch}"
-    month_pillar = f"{month_stem}{month_branch}"
-    day_pillar = f"{day_stem}{day_branch}"
-    hour_pillar = f"{hour_stem}{hour_branch}"
+    Args:
+        year, month, day, hour, minute (int): Civil time components
+        longitude (float): Longitude in decimal degrees
+        timezone_offset (float or str): Timezone offset from GMT in hours, or an IANA zone name
+        eot_model (str): Equation of time model, one of EOT_MODELS
+        
+    Returns:
+        tuple: (solar_us, longitude_correction_minutes, equation_of_time_minutes)
+            where solar_us is microseconds since 1970-01-01
+    """
+    start = bazi_metrics.ENABLED and bazi_metrics.clock()
+    if isinstance(timezone_offset, str):
+        from bazi_timezone import resolve_utc_offset
+        timezone_offset = resolve_utc_offset(timezone_offset, year, month, day, hour, minute)
+    eot = equation_of_time_for_civil(year, month, day, hour, minute, timezone_offset, eot_model)
+    long_corr = longitude_correction(longitude, timezone_offset)
+    # Round like datetime.timedelta(minutes=...): whole minutes are exact and
+    # the fractional part goes to the nearest microsecond, half to even
+    frac, whole = math.modf(long_corr + eot)
+    offset_us = int(whole) * US_PER_MINUTE + round(frac * US_PER_MINUTE)
+    civil_us = days_from_civil(year, month, day) * US_PER_DAY + (hour * 60 + minute) * US_PER_MINUTE
+    if start:
+        bazi_metrics.observe("solar_correction", start)
+    return civil_us + offset_us, long_corr, eot
+
+def four_pillar_indices_from_solar_us(solar_us):
+    """
+    Calculate Four Pillars stem/branch indices from a solar instant.
     
-    # Prepare result dictionary with translations
-    result = {
-        "year": year_pillar,
-        "month": month_pillar,
-        "day": day_pillar,
-        "hour": hour_pillar,
-        "day_master": day_stem,
-        "year_translations": {
-            "pinyin": f"{HEAVENLY_STEMS_EN[year_stem]} {EARTHLY_BRANCHES_EN[year_branch]}",
-            "meaning": f"{STEMS_ELEMENTS[year_stem]} {BRANCHES_ANIMALS[year_branch]}"
-        },
-        "month_translations": {
-            "pinyin": f"{HEAVENLY_STEMS_EN[month_stem]} {EARTHLY_BRANCHES_EN[month_branch]}",
-            "meaning": f"{STEMS_ELEMENTS[month_stem]} {BRANCHES_ANIMALS[month_branch]}"
-        },
-        "day_translations": {
-            "pinyin": f"{HEAVENLY_STEMS_EN[day_stem]} {EARTHLY_BRANCHES_EN[day_branch]}",
-            "meaning": f"{STEMS_ELEMENTS[day_stem]} {BRANCHES_ANIMALS[day_branch]}"
-        },
-        "hour_translations": {
-            "pinyin": f"{HEAVENLY_STEMS_EN[hour_stem]} {EARTHLY_BRANCHES_EN[hour_branch]}",
-            "meaning": f"{STEMS_ELEMENTS[hour_stem]} {BRANCHES_ANIMALS[hour_branch]}"
-        },
-        "jd": jd,
-        "jd_noon": jd_noon,
-        "bazi_year": bazi_year,
-        "bazi_month": bazi_month
-    }
+    Args:
+        solar_us (int): Solar time in microseconds since 1970-01-01
+        
+    Returns:
+        tuple: (year_stem, year_branch, month_stem, month_branch,
+                day_stem, day_branch, hour_stem, hour_branch) indices into
+                HEAVENLY_STEMS / EARTHLY_BRANCHES
+    """
+    start = bazi_metrics.ENABLED and bazi_metrics.clock()
+    bazi_year, bazi_month, _, _ = get_month_boundary_index().lookup(solar_us // US_PER_MINUTE)
+    if start:
+        start = bazi_metrics.observe("term_lookup", start)
+    days, us_of_day = divmod(solar_us, US_PER_DAY)
+    year, month, day = civil_from_days(days)
+    hour = us_of_day // 3_600_000_000
+    minute = us_of_day // US_PER_MINUTE % 60
+    second = us_of_day // 1_000_000 % 60
+    jd_noon = julian_day_number_at_noon(gregorian_to_julian_date(year, month, day, hour, minute, second))
+    indices = pillar_indices(bazi_year, bazi_month, jd_noon, hour)
+    if start:
+        bazi_metrics.observe("day_pillar", start)
+    return indices
+
+def create_four_pillars_fast(year, month, day, hour, minute, longitude, timezone_offset, eot_model="noaa"):
+    """
+    Civil time to Four Pillars indices on plain integers and floats.
     
-    # Add solar term boundary information if available
-    if year_start:
-        result["bazi_year_start"] = year_start.strftime("%B %d, %Y at %H:%M")
-    if month_start:
-        result["bazi_month_start"] = month_start.strftime("%B %d, %Y at %H:%M")
+    Gives the same pillars as civil_to_apparent_solar followed by
+    create_four_pillars_with_solar_terms, without allocating datetimes,
+    translation dicts or strings.
     
-    return result
+    Args:
+        year, month, day, hour, minute (int): Civil time components
+        longitude (float): Longitude in decimal degrees
+        timezone_offset (float): Timezone offset from GMT in hours
+        eot_model (str): Equation of time model, one of EOT_MODELS
+        
+    Returns:
+        tuple: Stem/branch indices as returned by four_pillar_indices_from_solar_us
+    """
+    solar_us, _, _ = civil_to_apparent_solar_us(year, month, day, hour, minute, longitude, timezone_offset,
+                                                eot_model)
+    return four_pillar_indices_from_solar_us(solar_us)
 
 # ----------------------
 # Legacy compatibility function (for transition from old single-file version)
@@ -0,0 +1,356 @@
+# bazi_server.py
+# Local HTTP/JSON service for Four Pillars calculations (standard library asyncio, no framework).
+#
+# Usage:
+#     python bazi_server.py --host 127.0.0.1 --port 8765
+#
+# Endpoints:
+#     GET  /health  -> {"status": "ok"}
+#     GET  /stats   -> single-chart cache counters
+#     GET  /metrics -> stage timings and cache hit rates in Prometheus text format
+#                      (stage timings are recorded when started with --metrics)
+#     POST /chart   {"year", "month", "day", "hour", "minute", "tz_offset" or "timezone", "longitude"?}
+#     POST /charts  {"births": [{...}, ...]} or columnar {"year": [...], "month": [...], ...};
+#                   add "dedupe": true to calculate each distinct solar minute once
+# Both chart endpoints accept "eot_model": "noaa" (default) or "ephemeris".
+import argparse
+import asyncio
+import datetime
+import http.client
+import json
+import traceback
+
+import numpy as np
+import pytz
+
+import bazi_metrics
+from bazi_batch import calculate_four_pillars_batch, validate_input_batch
+from bazi_cache import ChartCache
+from bazi_core import EOT_MODELS, validate_input
+from bazi_timezone import (
+    LOCAL_OK, localize_batch, local_status_message, resolve_utc_offset, standard_utc_offset,
+)
+from chart_table import PILLARS, pillar_code, pillar_labels
+
+BIRTH_FIELDS = ("year", "month", "day", "hour", "minute")
+OPTIONAL_FIELDS = ("tz_offset", "timezone", "longitude")
+MAX_BODY_BYTES = 64 * 1024 * 1024
+SOLAR_EPOCH = datetime.datetime(1970, 1, 1)
+CHART_CACHE = ChartCache()
+bazi_metrics.register_cache("chart_cache", CHART_CACHE.stats)
+
+class RequestError(Exception):
+    """Client error reported back as HTTP 4xx"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+# ----------------------
+# Chart handlers
+# ----------------------
+def _birth_fields(birth):
+    try:
+        values = [int(birth[name]) for name in BIRTH_FIELDS]
+        if birth.get("timezone"):
+            tz_offset = resolve_utc_offset(str(birth["timezone"]), *values)
+            # The meridian is the zone's standard offset: DST moves the clock, not the zone
+            meridian_offset = standard_utc_offset(str(birth["timezone"]), *values)
+        else:
+            tz_offset = meridian_offset = float(birth["tz_offset"])
+        longitude = birth.get("longitude")
+        longitude = meridian_offset * 15.0 if longitude is None else float(longitude)
+    except pytz.UnknownTimeZoneError as e:
+        raise RequestError(f"Unknown time zone: {e.args[0]}", status=422)
+    except KeyError as e:
+        raise RequestError(f"Missing field: {e.args[0]}")
+    except pytz.InvalidTimeError as e:
+        raise RequestError(str(e), status=422)
+    except (TypeError, ValueError) as e:
+        raise RequestError(f"Invalid field value: {e}")
+    return values, tz_offset, longitude
+
+def _eot_model(payload):
+    eot_model = payload.get("eot_model", "noaa")
+    if eot_model not in EOT_MODELS:
+        raise RequestError(f"eot_model must be one of: {', '.join(EOT_MODELS)}")
+    return eot_model
+
+def chart_response(birth):
+    """
+    Calculate a single chart.
+
+    Args:
+        birth (dict): year, month, day, hour, minute, tz_offset or IANA timezone, and optional
+            longitude and eot_model
+
+    Returns:
+        dict: Pillars (create_four_pillars_with_solar_terms shape), solar time and corrections
+    """
+    (year, month, day, hour, minute), tz_offset, longitude = _birth_fields(birth)
+    error = validate_input(year, month, day, hour, minute, longitude)
+    if error:
+        raise RequestError(error, status=422)
+    chart, solar_us, long_corr, eot = CHART_CACHE.chart(year, month, day, hour, minute, longitude, tz_offset,
+                                                        _eot_model(birth))
+    return {
+        "pillars": chart.to_dict(),
+        "solar_time": (SOLAR_EPOCH + datetime.timedelta(microseconds=solar_us)).isoformat(),
+        "longitude_correction": long_corr,
+        "equation_of_time": eot,
+        "total_correction": long_corr + eot,
+    }
+
+def _batch_columns(payload):
+    if "births" in payload:
+        births = payload["births"]
+        if not isinstance(births, list):
+            raise RequestError("births must be a list")
+        if not all(isinstance(b, dict) for b in births):
+            raise RequestError("Each entry of births must be an object")
+        columns = {name: [b.get(name) for b in births] for name in BIRTH_FIELDS + OPTIONAL_FIELDS}
+    else:
+        columns = {name: payload.get(name) for name in BIRTH_FIELDS + OPTIONAL_FIELDS}
+    if not isinstance(columns["year"], list):
+        raise RequestError("Column year must be a list")
+    n = len(columns["year"])
+    arrays = {}
+    for name, values in columns.items():
+        if values is None and name in OPTIONAL_FIELDS:
+            values = [None] * n
+        if not isinstance(values, list) or len(values) != n:
+            raise RequestError(f"Column {name} must be a list of {n} values")
+        if name == "timezone":
+            arrays[name] = np.array([v if isinstance(v, str) else "" for v in values], dtype=object)
+            continue
+        try:
+            arrays[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        except (TypeError, ValueError):
+            raise RequestError(f"Column {name} must be numeric")
+    return n, arrays
+
+def charts_response(payload):
+    """
+    Calculate a batch of charts in one vectorized pass.
+
+    Args:
+        payload (dict): {"births": [...]} or columnar lists
+
+    Returns:
+        dict: Columnar lists (null for rejected rows) and an errors map of row -> message
+    """
+    n, arrays = _batch_columns(payload)
+    eot_model = _eot_model(payload)
+    tz_offset = arrays["tz_offset"]
+    present = ~np.any([np.isnan(arrays[name]) for name in BIRTH_FIELDS], axis=0)
+    ints = [np.where(present, arrays[name], 0).astype(np.int64) for name in BIRTH_FIELDS]
+    errors = {}
+
+    zones = arrays["timezone"]
+    named = present & (zones != "")
+    unknown = named & ~np.isin(zones, list(pytz.all_timezones_set))
+    errors.update((str(i), f"Unknown time zone: {zones[i]}") for i in np.flatnonzero(unknown))
+    named &= ~unknown
+    status = np.full(n, LOCAL_OK, dtype=np.int8)
+    meridian_offset = tz_offset.copy()
+    tz_offset[named], status[named], meridian_offset[named] = localize_batch(zones[named],
+                                                                             *(v[named] for v in ints))
+    errors.update((str(i), local_status_message(status[i], zones[i])) for i in np.flatnonzero(status != LOCAL_OK))
+    zone_ok = ~unknown & (status == LOCAL_OK)
+    errors.update((str(i), "Missing birth date, time or timezone")
+                  for i in np.flatnonzero(~present | (zone_ok & np.isnan(tz_offset))))
+    present &= zone_ok & ~np.isnan(tz_offset)
+
+    longitude = np.where(np.isnan(arrays["longitude"]), meridian_offset * 15.0, arrays["longitude"])
+    valid, messages = validate_input_batch(*ints, longitude)
+    errors.update((str(i), m) for i, m in messages.items() if present[i])
+
+    keep = present & valid
+    rows = np.flatnonzero(keep)
+    result = calculate_four_pillars_batch(*(v[keep] for v in ints), tz_offset[keep], longitude[keep],
+                                          dedupe=bool(payload.get("dedupe", False)), eot_model=eot_model)
+
+    def scatter(values):
+        column = [None] * n
+        for row, value in zip(rows.tolist(), values):
+            column[row] = value
+        return column
+
+    response = {"count": n}
+    labels = np.array(pillar_labels())
+    for pillar in PILLARS:
+        codes = pillar_code(result[f"{pillar}_stem"], result[f"{pillar}_branch"])
+        response[pillar] = scatter(labels[codes].tolist())
+    response["day_master"] = [p[0] if p else None for p in response["day"]]
+    for name in ("jd", "jd_noon", "bazi_year", "bazi_month", "longitude_correction", "equation_of_time"):
+        response[name] = scatter(result[name].tolist())
+    for name in ("bazi_year_start", "bazi_month_start"):
+        response[name] = scatter([None if np.isnat(t) else str(t) for t in result[name]])
+    response["solar_time"] = scatter(np.datetime_as_string(result["solar"]).tolist())
+    response["errors"] = errors
+    return response
+
+ROUTES = {
+    ("GET", "/health"): lambda payload: {"status": "ok"},
+    ("GET", "/stats"): lambda payload: {"chart_cache": CHART_CACHE.stats()},
+    ("GET", "/metrics"): lambda payload: bazi_metrics.prometheus_text(),
+    ("POST", "/chart"): chart_response,
+    ("POST", "/charts"): charts_response,
+}
+# Batches are large enough to be worth moving off the event loop
+OFFLOADED = {("POST", "/charts")}
+
+# ----------------------
+# HTTP/1.1 server
+# ----------------------
+async def _read_request(reader):
+    """
+    Read one request.
+
+    Raises:
+        RequestError: Malformed or oversized request; the connection cannot
+            be reused after it
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.LimitOverrunError:
+        raise RequestError("Request head too large", status=431)
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, path, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise RequestError("Malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            key, value = line.split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise RequestError("Invalid Content-Length")
+    if length < 0:
+        raise RequestError("Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise RequestError("Request body too large", status=413)
+    body = await reader.readexactly(length) if length else b""
+    return method, path.split("?", 1)[0], headers, body
+
+def _response_bytes(status, payload, keep_alive):
+    if isinstance(payload, str):
+        body = payload.encode("utf-8")
+        content_type = "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        content_type = "application/json; charset=utf-8"
+    head = (f"HTTP/1.1 {status} {http.client.responses.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+async def handle_connection(reader, writer):
+    """Serve requests on one keep-alive connection"""
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            try:
+                method, path, headers, body = await _read_request(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            except RequestError as e:
+                # The rest of the stream cannot be framed, so answer and close
+                writer.write(_response_bytes(e.status, {"error": str(e)}, keep_alive=False))
+                await writer.drain()
+                break
+            keep_alive = headers.get("connection", "").lower() != "close"
+            route = ROUTES.get((method, path))
+            try:
+                if route is None:
+                    raise RequestError(f"No route for {method} {path}", status=404)
+                payload = json.loads(body) if body else {}
+                if not isinstance(payload, dict):
+                    raise RequestError("Request body must be a JSON object")
+                if (method, path) in OFFLOADED:
+                    result = await loop.run_in_executor(None, route, payload)
+                else:
+                    result = route(payload)
+                status = 200
+            except RequestError as e:
+                status, result = e.status, {"error": str(e)}
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                status, result = 400, {"error": f"Invalid JSON: {e}"}
+            except Exception:
+                traceback.print_exc()
+                status, result = 500, {"error": "Internal server error"}
+            writer.write(_response_bytes(status, result, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+async def serve(host="127.0.0.1", port=8765):
+    """Run the service until cancelled"""
+    server = await asyncio.start_server(handle_connection, host, port)
+    async with server:
+        await server.serve_forever()
+
+# ----------------------
+# Local client
+# ----------------------
+class BaziClient:
+    """Minimal keep-alive JSON client for the service"""
+
+    def __init__(self, host="127.0.0.1", port=8765, timeout=30):
+        self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _request(self, method, path, payload=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        self.connection.request(method, path, body=body, headers={"Content-Type": "application/json"})
+        response = self.connection.getresponse()
+        data = json.loads(response.read())
+        if response.status != 200:
+            raise RequestError(data.get("error", response.reason), status=response.status)
+        return data
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def stats(self):
+        return self._request("GET", "/stats")
+
+    def metrics(self):
+        """Prometheus exposition text from /metrics"""
+        self.connection.request("GET", "/metrics")
+        response = self.connection.getresponse()
+        return response.read().decode("utf-8")
+
+    def chart(self, **birth):
+        """Calculate one chart: chart(year=1990, month=5, day=5, hour=12, minute=0, tz_offset=8)"""
+        return self._request("POST", "/chart", birth)
+
+    def charts(self, births):
+        """Calculate a list of birth dicts (or a dict of columns) in one round trip"""
+        payload = {"births": births} if isinstance(births, list) else births
+        return self._request("POST", "/charts", payload)
+
+    def close(self):
+        self.connection.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Four Pillars calculations over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--metrics", action="store_true",
+                        help="Record per-stage timings for GET /metrics (cache hit rates are always reported)")
+    args = parser.parse_args(argv)
+    if args.metrics:
+        bazi_metrics.enable()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
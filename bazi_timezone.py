@@ -0,0 +1,225 @@
+# bazi_timezone.py
+import bisect
+import datetime
+import functools
+
+import pytz
+from pytz.exceptions import AmbiguousTimeError, NonExistentTimeError
+
+import bazi_metrics
+from bazi_core import days_from_civil
+
+# IANA zone support. Each zone's pytz transition list is flattened once into
+# integer tables (UTC start second and UTC offset second of every interval)
+# and cached, so resolving an offset is a binary search in local time:
+# interval i covers local times [utc_start[i] + offset[i], utc_start[i + 1] + offset[i]).
+# A local time inside two intervals is ambiguous (clocks turned back); one
+# inside none is non-existent (clocks turned forward).
+LOCAL_OK = 0
+LOCAL_AMBIGUOUS = 1
+LOCAL_NONEXISTENT = 2
+LOCAL_STATUS_MESSAGES = {
+    LOCAL_AMBIGUOUS: "Ambiguous local time (clocks were turned back in {zone})",
+    LOCAL_NONEXISTENT: "Non-existent local time (clocks were turned forward in {zone})",
+}
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+class ZoneTransitions:
+    """
+    Integer transition table for one IANA zone.
+
+    Attributes:
+        utc_starts (list): UTC second at which each interval starts (the first is -inf)
+        offsets (list): UTC offset of each interval in seconds
+        dst (list): DST part of each offset in seconds
+    """
+    __slots__ = ("zone", "utc_starts", "offsets", "dst", "local_starts", "_arrays")
+
+    def __init__(self, zone):
+        self.zone = zone
+        tz = pytz.timezone(zone)
+        transitions = getattr(tz, "_utc_transition_times", None)
+        if transitions:
+            self.utc_starts = [int((t - _EPOCH).total_seconds()) for t in transitions]
+            self.utc_starts[0] = -(2 ** 62)
+            self.offsets = [int(info[0].total_seconds()) for info in tz._transition_info]
+            self.dst = [int(info[1].total_seconds()) for info in tz._transition_info]
+        else:
+            # UTC and fixed-offset zones
+            self.utc_starts = [-(2 ** 62)]
+            self.offsets = [int(tz.utcoffset(_EPOCH).total_seconds())]
+            self.dst = [0]
+        self.local_starts = [start + offset for start, offset in zip(self.utc_starts, self.offsets)]
+        self.local_starts[0] = -(2 ** 62)
+        self._arrays = None
+
+    def resolve(self, local_seconds):
+        """
+        Resolve a local wall-clock time.
+
+        Args:
+            local_seconds (int): Local time as seconds since 1970-01-01
+
+        Returns:
+            tuple: (status, offsets) where offsets lists the valid UTC offsets
+                in seconds, earliest instant first (two when ambiguous, none
+                when non-existent)
+        """
+        i = bisect.bisect_right(self.local_starts, local_seconds) - 1
+        valid = []
+        if i > 0 and local_seconds < self.utc_starts[i] + self.offsets[i - 1]:
+            valid.append(self.offsets[i - 1])
+        if i + 1 >= len(self.utc_starts) or local_seconds < self.utc_starts[i + 1] + self.offsets[i]:
+            valid.append(self.offsets[i])
+        if len(valid) == 2:
+            return LOCAL_AMBIGUOUS, valid
+        return (LOCAL_OK, valid) if valid else (LOCAL_NONEXISTENT, valid)
+
+    def arrays(self):
+        """int64 NumPy copies of the tables, built on first use"""
+        if self._arrays is None:
+            import numpy as np
+            self._arrays = {name: np.array(getattr(self, name), dtype=np.int64)
+                            for name in ("utc_starts", "offsets", "dst", "local_starts")}
+        return self._arrays
+
+    def resolve_array(self, local_seconds):
+        """
+        Vectorized resolve.
+
+        Args:
+            local_seconds (array-like of int): Local times as seconds since 1970-01-01
+
+        Returns:
+            tuple: (status, earlier, later) int arrays; earlier/later are the
+                UTC offsets in seconds of the first and second occurrence
+                (equal unless ambiguous, meaningless when non-existent)
+        """
+        import numpy as np
+
+        arrays = self.arrays()
+        local_seconds = np.asarray(local_seconds, dtype=np.int64)
+        i = np.searchsorted(arrays["local_starts"], local_seconds, side="right") - 1
+        offsets = arrays["offsets"]
+        following = np.concatenate([arrays["utc_starts"][1:], [2 ** 62]])
+        in_current = local_seconds < following[i] + offsets[i]
+        previous = np.maximum(i - 1, 0)
+        in_previous = (i > 0) & (local_seconds < arrays["utc_starts"][i] + offsets[previous])
+        status = np.where(in_current & in_previous, LOCAL_AMBIGUOUS,
+                          np.where(in_current | in_previous, LOCAL_OK, LOCAL_NONEXISTENT)).astype(np.int8)
+        earlier = np.where(in_previous, offsets[previous], offsets[i])
+        later = np.where(in_current, offsets[i], offsets[previous])
+        return status, earlier, later
+
+@functools.lru_cache(maxsize=None)
+def get_zone_transitions(zone):
+    """Cached ZoneTransitions for an IANA zone name (raises pytz.UnknownTimeZoneError)"""
+    return ZoneTransitions(zone)
+
+bazi_metrics.register_cache("zone_transitions", bazi_metrics.lru_cache_stats(get_zone_transitions))
+
+# ----------------------
+# Scalar resolution
+# ----------------------
+def resolve_utc_offset(zone, year, month, day, hour, minute, ambiguous=None):
+    """
+    UTC offset in effect for a local clock time in an IANA zone.
+
+    Args:
+        zone (str): IANA zone name, e.g. "Asia/Shanghai"
+        year, month, day, hour, minute (int): Local clock time
+        ambiguous (str, optional): "earlier" or "later" to pick an occurrence
+            of an ambiguous time; by default ambiguous times raise
+
+    Returns:
+        float: Offset from GMT in hours (including DST)
+
+    Raises:
+        pytz.exceptions.AmbiguousTimeError: Time occurs twice and `ambiguous` is not set
+        pytz.exceptions.NonExistentTimeError: Time was skipped by a clock change
+    """
+    local_seconds = (days_from_civil(year, month, day) * 1440 + hour * 60 + minute) * 60
+    status, offsets = get_zone_transitions(zone).resolve(local_seconds)
+    local = datetime.datetime(year, month, day, hour, minute)
+    if status == LOCAL_NONEXISTENT:
+        raise NonExistentTimeError(f"{local} does not exist in {zone}")
+    if status == LOCAL_AMBIGUOUS:
+        if ambiguous == "earlier":
+            return offsets[0] / 3600.0
+        if ambiguous == "later":
+            return offsets[1] / 3600.0
+        raise AmbiguousTimeError(f"{local} occurs twice in {zone}")
+    return offsets[0] / 3600.0
+
+def standard_utc_offset(zone, year, month, day, hour=12, minute=0):
+    """
+    Standard (non-DST) UTC offset of a zone at a local time, in hours.
+
+    Useful as the timezone meridian when no longitude is known. Ambiguous
+    and non-existent times use the offset in effect just before them.
+    """
+    transitions = get_zone_transitions(zone)
+    local_seconds = (days_from_civil(year, month, day) * 1440 + hour * 60 + minute) * 60
+    i = max(bisect.bisect_right(transitions.local_starts, local_seconds) - 1, 0)
+    return (transitions.offsets[i] - transitions.dst[i]) / 3600.0
+
+# ----------------------
+# Vectorized localizer
+# ----------------------
+def localize_batch(zone, year, month, day, hour, minute, ambiguous="earlier"):
+    """
+    Resolve UTC offsets for arrays of local clock times.
+
+    Args:
+        zone (str or array-like of str): IANA zone name, or one per row
+        year, month, day, hour, minute (array-like of int): Local clock times
+        ambiguous (str, optional): "earlier" or "later" occurrence for
+            ambiguous rows; None leaves them NaN
+
+    Returns:
+        tuple: (offset_hours, status, standard_hours) where offset_hours is
+            float64 (NaN for non-existent rows and unresolved ambiguous rows),
+            status holds LOCAL_OK / LOCAL_AMBIGUOUS / LOCAL_NONEXISTENT per row
+            and standard_hours is the standard (non-DST) offset as returned by
+            standard_utc_offset, the timezone meridian when no longitude is known
+
+    Raises:
+        pytz.UnknownTimeZoneError: A zone name is not in the IANA database
+    """
+    import numpy as np
+    from bazi_batch import civil_to_days
+
+    year, month, day, hour, minute = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.int64) for a in (year, month, day, hour, minute))
+    )
+    local_seconds = ((civil_to_days(year, month, day) * 1440 + hour * 60 + minute) * 60).ravel()
+    offset_hours = np.full(local_seconds.shape, np.nan)
+    standard_hours = np.full(local_seconds.shape, np.nan)
+    status = np.zeros(local_seconds.shape, dtype=np.int8)
+
+    zones = np.asarray(zone, dtype=object)
+    if zones.ndim == 0:
+        groups = [(str(zones), slice(None))]
+    else:
+        names, inverse, counts = np.unique(zones.ravel().astype(str), return_inverse=True, return_counts=True)
+        order = np.argsort(inverse, kind="stable")
+        groups = zip(names, np.split(order, np.cumsum(counts)[:-1]))
+    for name, rows in groups:
+        transitions = get_zone_transitions(name)
+        row_status, earlier, later = transitions.resolve_array(local_seconds[rows])
+        arrays = transitions.arrays()
+        interval = np.maximum(np.searchsorted(arrays["local_starts"], local_seconds[rows], side="right") - 1, 0)
+        standard_hours[rows] = (arrays["offsets"][interval] - arrays["dst"][interval]) / 3600.0
+        chosen = later if ambiguous == "later" else earlier
+        hours = chosen / 3600.0
+        hours[row_status == LOCAL_NONEXISTENT] = np.nan
+        if ambiguous not in ("earlier", "later"):
+            hours[row_status == LOCAL_AMBIGUOUS] = np.nan
+        offset_hours[rows] = hours
+        status[rows] = row_status
+    return offset_hours.reshape(year.shape), status.reshape(year.shape), standard_hours.reshape(year.shape)
+
+def local_status_message(status, zone):
+    """Error message for a LOCAL_AMBIGUOUS / LOCAL_NONEXISTENT status (None when OK)"""
+    message = LOCAL_STATUS_MESSAGES.get(int(status))
+    return message.format(zone=zone) if message else None
@@ -0,0 +1,409 @@
+# benchmark.py
+# Microbenchmarks for the scalar hot paths and end-to-end throughput runs, with
+# a stored baseline and a comparison mode for catching latency regressions.
+#
+# Usage:
+#     python benchmark.py                            # run and print
+#     python benchmark.py --save                     # run and store benchmark_baseline.json
+#     python benchmark.py --compare --threshold 25   # exit 1 if anything got > 25% slower
+#     python benchmark.py --quick -k pillars         # skip the 1M chart run, filter by name
+#     python benchmark.py --startup                  # cold import times; exit 1 over budget
+#
+# Every benchmark times a fixed, seeded set of inputs (so caches see the same
+# mix each run) and reports the fastest of several repeats per item: the
+# minimum is the least noisy estimate on a shared machine. Baselines are only
+# comparable on the machine that recorded them; regenerate with --save there.
+# Single-call benchmarks (charts_1) sit at tens of microseconds per item, where
+# scheduler and cache noise alone moves the best time by 30-60% between runs:
+# they measure for longer and carry their own, wider --compare threshold.
+import argparse
+import compileall
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(ROOT, "benchmark_baseline.json")
+DEFAULT_THRESHOLD = 20.0  # percent
+DEFAULT_MIN_TIME = 0.2    # seconds per repeat
+DEFAULT_REPEAT = 5
+SEED = 1234
+
+BENCHMARKS = {}
+
+def benchmark(name, items, slow=False, min_time=None, repeat=None, threshold=None):
+    """
+    Register a benchmark.
+
+    The decorated function prepares its inputs and returns a zero-argument
+    callable that processes `items` of them.
+
+    Args:
+        name (str): Benchmark name
+        items (int): Items processed per call (results are per item)
+        slow (bool): Skipped by --quick
+        min_time (float, optional): Lower bound on the seconds per repeat
+        repeat (int, optional): Lower bound on the repeats
+        threshold (float, optional): Lower bound on the allowed slowdown in
+            percent for --compare, for benchmarks too noisy for the default
+    """
+    def register(setup):
+        BENCHMARKS[name] = {"setup": setup, "items": items, "slow": slow, "min_time": min_time,
+                            "repeat": repeat, "threshold": threshold}
+        return setup
+    return register
+
+def birth_records(n, seed=SEED):
+    """Seeded civil birth records within the validated ranges"""
+    rng = np.random.default_rng(seed)
+    tz_offset = rng.integers(-12, 15, n).astype(np.float64)
+    return {
+        "year": rng.integers(1901, 2100, n),
+        "month": rng.integers(1, 13, n),
+        "day": rng.integers(1, 29, n),
+        "hour": rng.integers(0, 24, n),
+        "minute": rng.integers(0, 60, n),
+        "tz_offset": tz_offset,
+        "longitude": np.clip(tz_offset * 15.0 + rng.uniform(-7.5, 7.5, n), -180.0, 180.0),
+    }
+
+def _scalar_records(n):
+    records = birth_records(n)
+    return [tuple(records[name][i].item() for name in ("year", "month", "day", "hour", "minute", "tz_offset",
+                                                       "longitude"))
+            for i in range(n)]
+
+# ----------------------
+# Microbenchmarks (scalar)
+# ----------------------
+@benchmark("equation_of_time", items=366)
+def bench_equation_of_time():
+    from bazi_core import equation_of_time
+    days = list(range(1, 367))
+    return lambda: [equation_of_time(doy) for doy in days]
+
+@benchmark("gregorian_to_julian_date", items=1000)
+def bench_gregorian_to_julian_date():
+    from bazi_core import gregorian_to_julian_date
+    records = _scalar_records(1000)
+    return lambda: [gregorian_to_julian_date(y, m, d, h, mi, 0) for y, m, d, h, mi, _, _ in records]
+
+@benchmark("validate_input", items=1000)
+def bench_validate_input():
+    from bazi_core import validate_input
+    records = _scalar_records(1000)
+    return lambda: [validate_input(y, m, d, h, mi, lon) for y, m, d, h, mi, _, lon in records]
+
+@benchmark("find_bazi_year_month", items=1000)
+def bench_find_bazi_year_month():
+    from solar_terms import find_bazi_year_month
+    moments = [datetime.datetime(y, m, d, h, mi) for y, m, d, h, mi, _, _ in _scalar_records(1000)]
+    return lambda: [find_bazi_year_month(dt) for dt in moments]
+
+@benchmark("civil_to_apparent_solar", items=1000)
+def bench_civil_to_apparent_solar():
+    from bazi_core import civil_to_apparent_solar
+    records = [(datetime.datetime(y, m, d, h, mi), lon, tz) for y, m, d, h, mi, tz, lon in _scalar_records(1000)]
+    return lambda: [civil_to_apparent_solar(dt, lon, tz) for dt, lon, tz in records]
+
+@benchmark("create_four_pillars_with_solar_terms", items=1000)
+def bench_create_four_pillars_with_solar_terms():
+    from bazi_core import create_four_pillars_with_solar_terms
+    moments = [datetime.datetime(y, m, d, h, mi) for y, m, d, h, mi, _, _ in _scalar_records(1000)]
+    return lambda: [create_four_pillars_with_solar_terms(dt) for dt in moments]
+
+@benchmark("create_four_pillars_fast", items=1000)
+def bench_create_four_pillars_fast():
+    from bazi_core import create_four_pillars_fast
+    records = _scalar_records(1000)
+    return lambda: [create_four_pillars_fast(y, m, d, h, mi, lon, tz) for y, m, d, h, mi, tz, lon in records]
+
+# ----------------------
+# End-to-end throughput (civil time -> Four Pillars)
+# ----------------------
+@benchmark("charts_1", items=1, min_time=1.0, repeat=15, threshold=75.0)
+def bench_charts_1():
+    from bazi_core import civil_to_apparent_solar, create_four_pillars_with_solar_terms
+    y, m, d, h, mi, tz, lon = _scalar_records(1)[0]
+    civil = datetime.datetime(y, m, d, h, mi)
+    return lambda: create_four_pillars_with_solar_terms(civil_to_apparent_solar(civil, lon, tz)[0])
+
+def _batch_charts(n):
+    from bazi_batch import calculate_four_pillars_batch
+    r = birth_records(n)
+    return lambda: calculate_four_pillars_batch(r["year"], r["month"], r["day"], r["hour"], r["minute"],
+                                                r["tz_offset"], r["longitude"])
+
+@benchmark("charts_1k_batch", items=1_000)
+def bench_charts_1k_batch():
+    return _batch_charts(1_000)
+
+@benchmark("charts_1M_batch", items=1_000_000, slow=True)
+def bench_charts_1m_batch():
+    return _batch_charts(1_000_000)
+
+@benchmark("pillar_timeline_lookup_1M", items=1_000_000, slow=True)
+def bench_pillar_timeline_lookup():
+    from bazi_batch import civil_to_apparent_solar_batch
+    from pillar_timeline import get_pillar_timeline
+    r = birth_records(1_000_000)
+    solar_us, _, _ = civil_to_apparent_solar_batch(r["year"], r["month"], r["day"], r["hour"], r["minute"],
+                                                   r["tz_offset"], r["longitude"])
+    timeline = get_pillar_timeline()
+    return lambda: timeline.lookup_array(solar_us)
+
+# ----------------------
+# Startup (cold import in a fresh interpreter)
+# ----------------------
+# The calculation core must stay cheap to import for CLI tools and short-lived
+# workers: stdlib only, with the term, lunar and Day Master tables loaded on
+# first use. Budgets are in seconds and are checked by --startup.
+IMPORT_BUDGETS = {
+    "bazi_core": 0.020,
+    "bazi_cache": 0.020,
+    "bazi_metrics": 0.005,
+    "lunar_calendar": 0.020,
+    "day_master_data": 0.005,
+}
+# Must not be imported by any module in IMPORT_BUDGETS
+HEAVY_MODULES = ("streamlit", "pandas", "numpy", "pyarrow", "pytz")
+DEFAULT_STARTUP_REPEAT = 15
+_IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, *[name for name in {heavy!r} if name in sys.modules])
+"""
+
+def import_time(module, repeat=DEFAULT_STARTUP_REPEAT):
+    """
+    Time a module's import in fresh interpreters, with bytecode already compiled.
+
+    Args:
+        module (str): Module name
+        repeat (int): Interpreters to start
+
+    Returns:
+        dict: `best` and `median` seconds, and `heavy`, the HEAVY_MODULES the
+            import pulled in
+    """
+    compileall.compile_dir(ROOT, maxlevels=0, quiet=1)
+    probe = _IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)
+    timings, heavy = [], []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.split()
+        timings.append(float(output[0]))
+        heavy = output[1:]
+    return {"best": min(timings), "median": statistics.median(timings), "heavy": heavy}
+
+def check_startup(budgets=IMPORT_BUDGETS, repeat=DEFAULT_STARTUP_REPEAT, report=None):
+    """
+    Measure cold imports against their budgets.
+
+    Args:
+        budgets (dict): Module name -> budget in seconds
+        repeat (int): Interpreters to start per module
+        report (callable, optional): Called with (module, result) as each finishes
+
+    Returns:
+        dict: module -> import_time() result plus `budget` and `ok` (median
+            within budget and no heavy modules imported)
+    """
+    results = {}
+    for module, budget in budgets.items():
+        result = import_time(module, repeat)
+        result["budget"] = budget
+        result["ok"] = result["median"] <= budget and not result["heavy"]
+        results[module] = result
+        if report:
+            report(module, result)
+    return results
+
+# ----------------------
+# Timing and baselines
+# ----------------------
+def measure(fn, items, min_time=DEFAULT_MIN_TIME, repeat=DEFAULT_REPEAT):
+    """
+    Time a callable like timeit: calibrated loops, several repeats, GC off.
+
+    Returns:
+        dict: `best` and `median` seconds per item, `loops` per repeat
+    """
+    fn()  # warm up caches and lazy tables
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        fn()
+        once = time.perf_counter() - start
+        loops = max(1, int(min_time / max(once, 1e-9)))
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            timings.append((time.perf_counter() - start) / loops / items)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {"best": min(timings), "median": statistics.median(timings), "loops": loops}
+
+def environment():
+    """Interpreter and machine description stored with a baseline"""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "processor": platform.processor(),
+    }
+
+def run(names=None, quick=False, min_time=DEFAULT_MIN_TIME, repeat=DEFAULT_REPEAT, report=None):
+    """
+    Run benchmarks.
+
+    Args:
+        names (list, optional): Substrings selecting benchmarks by name
+        quick (bool): Skip slow benchmarks
+        min_time (float): Minimum seconds per repeat (raised to a benchmark's own min_time)
+        repeat (int): Repeats per benchmark (raised to a benchmark's own repeat)
+        report (callable, optional): Called with (name, result) as each finishes
+
+    Returns:
+        dict: name -> measure() result plus `items`
+    """
+    results = {}
+    for name, spec in BENCHMARKS.items():
+        if quick and spec["slow"]:
+            continue
+        if names and not any(pattern in name for pattern in names):
+            continue
+        result = measure(spec["setup"](), spec["items"], max(min_time, spec["min_time"] or 0.0),
+                         max(repeat, spec["repeat"] or 0))
+        result["items"] = spec["items"]
+        results[name] = result
+        if report:
+            report(name, result)
+    return results
+
+def save_baseline(results, path=BASELINE_PATH):
+    """Merge results into the baseline file (benchmarks not run keep their old entry)"""
+    baseline = load_baseline(path) or {"benchmarks": {}}
+    baseline["environment"] = environment()
+    baseline["recorded"] = datetime.datetime.now().isoformat(timespec="seconds")
+    baseline["benchmarks"].update(results)
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def load_baseline(path=BASELINE_PATH):
+    """Stored baseline, or None when there is none"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def benchmark_threshold(name, threshold=DEFAULT_THRESHOLD):
+    """Allowed slowdown in percent for a benchmark: threshold, or its own if wider"""
+    spec = BENCHMARKS.get(name)
+    return max(threshold, spec["threshold"] or 0.0) if spec else threshold
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare results with a baseline.
+
+    Args:
+        results (dict): run() results
+        baseline (dict): load_baseline() contents
+        threshold (float): Allowed slowdown in percent (see benchmark_threshold)
+
+    Returns:
+        dict: name -> change in percent of the best time (None for benchmarks
+            without a baseline); the names over threshold are under `regressions`
+    """
+    changes, regressions = {}, []
+    for name, result in results.items():
+        old = baseline["benchmarks"].get(name)
+        if old is None:
+            changes[name] = None
+            continue
+        changes[name] = (result["best"] / old["best"] - 1.0) * 100.0
+        if changes[name] > benchmark_threshold(name, threshold):
+            regressions.append(name)
+    return {"changes": changes, "regressions": regressions}
+
+def format_seconds(seconds):
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the chart calculation hot paths.")
+    parser.add_argument("-k", dest="names", action="append", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="Skip the slow (1M item) benchmarks")
+    parser.add_argument("--save", action="store_true", help="Store the results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="Compare with the baseline; exit 1 on regressions")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file (default: benchmark_baseline.json)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed slowdown in percent for --compare (default: {DEFAULT_THRESHOLD:g}; "
+                             "benchmarks with a wider threshold of their own keep it)")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME,
+                        help=f"Minimum seconds per repeat (default: {DEFAULT_MIN_TIME:g})")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help=f"Repeats per benchmark (default: {DEFAULT_REPEAT})")
+    parser.add_argument("--startup", action="store_true",
+                        help="Check cold import times of the core modules against their budgets instead")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        def report_startup(module, result):
+            heavy = f"  imports {', '.join(result['heavy'])}" if result["heavy"] else ""
+            print(f"{module:<40} {format_seconds(result['median']):>10} median  "
+                  f"{format_seconds(result['best']):>10} best  budget {format_seconds(result['budget'])}"
+                  f"{'' if result['ok'] else '  OVER'}{heavy}", flush=True)
+
+        results = check_startup(report=report_startup)
+        return 0 if all(result["ok"] for result in results.values()) else 1
+
+    baseline = load_baseline(args.baseline) if args.compare else None
+    if args.compare and baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save first", file=sys.stderr)
+        return 2
+    if baseline and baseline.get("environment") != environment():
+        print("Warning: the baseline was recorded on a different interpreter or machine", file=sys.stderr)
+
+    def report(name, result):
+        line = (f"{name:<40} {format_seconds(result['best']):>10}/item  "
+                f"{1.0 / result['best']:>14,.0f} items/s")
+        old = baseline and baseline["benchmarks"].get(name)
+        if old:
+            line += f"  {(result['best'] / old['best'] - 1.0) * 100.0:+7.1f}%"
+        print(line, flush=True)
+
+    results = run(args.names, args.quick, args.min_time, args.repeat, report)
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"Saved {len(results)} results to {args.baseline}")
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)["regressions"]
+        if regressions:
+            print("Regressions: " + ", ".join(f"{name} (over {benchmark_threshold(name, args.threshold):g}%)"
+                                              for name in regressions), file=sys.stderr)
+            return 1
+        print(f"No regressions over {args.threshold:g}% (or a benchmark's own wider threshold)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
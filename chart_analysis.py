@@ -0,0 +1,136 @@
+# chart_analysis.py
+import numpy as np
+
+from bazi_core import HEAVENLY_STEMS, EARTHLY_BRANCHES, STEMS_ELEMENTS
+from chart_table import PILLARS
+
+# Ten Gods (十神), hidden stems (藏干) and five-element balance as integer
+# lookup tables, so a million charts are a handful of NumPy gathers:
+#   TEN_GOD_TABLE[day_stem, stem]           10 x 10  Ten God of any stem
+#   BRANCH_TEN_GOD_TABLE[day_stem, branch]  10 x 12  Ten God of a branch's main hidden stem
+#   HIDDEN_STEM_TABLE[branch]               12 x 3   hidden stems, -1 padded
+#   STEM_ELEMENT_SCORES / BRANCH_ELEMENT_SCORES      element points per stem / branch
+# Element points are integers in tenths: a stem counts 10 for its element and
+# a branch shares 10 between its hidden stems (10, 7+3 or 6+3+1).
+ELEMENTS = ("Wood", "Fire", "Earth", "Metal", "Water")  # generating order
+TEN_GODS = ["比肩", "劫财", "食神", "伤官", "偏财", "正财", "七杀", "正官", "偏印", "正印"]
+TEN_GODS_EN = {
+    "比肩": "Friend", "劫财": "Rob Wealth", "食神": "Eating God", "伤官": "Hurting Officer",
+    "偏财": "Indirect Wealth", "正财": "Direct Wealth", "七杀": "Seven Killings",
+    "正官": "Direct Officer", "偏印": "Indirect Resource", "正印": "Direct Resource",
+}
+HIDDEN_STEMS = {
+    "子": "癸", "丑": "己癸辛", "寅": "甲丙戊", "卯": "乙", "辰": "戊乙癸", "巳": "丙庚戊",
+    "午": "丁己", "未": "己丁乙", "申": "庚壬戊", "酉": "辛", "戌": "戊辛丁", "亥": "壬甲",
+}
+HIDDEN_STEM_POINTS = {1: (10,), 2: (7, 3), 3: (6, 3, 1)}
+
+STEM_ELEMENT = tuple(ELEMENTS.index(STEMS_ELEMENTS[stem]) for stem in HEAVENLY_STEMS)
+
+def ten_god_index(day_stem, stem):
+    """
+    Ten God of a stem relative to the Day Master.
+
+    The element relation (same, produced by, controlled by, controlling,
+    producing the Day Master) picks the pair and polarity picks within it:
+    same polarity gives 比肩 / 食神 / 偏财 / 七杀 / 偏印.
+
+    Args:
+        day_stem, stem (int): Indices into HEAVENLY_STEMS
+
+    Returns:
+        int: Index into TEN_GODS
+    """
+    relation = (STEM_ELEMENT[stem] - STEM_ELEMENT[day_stem]) % 5
+    return 2 * relation + (stem % 2 != day_stem % 2)
+
+def _build_tables():
+    hidden = np.full((12, 3), -1, dtype=np.int8)
+    branch_scores = np.zeros((12, 5), dtype=np.int16)
+    for b, branch in enumerate(EARTHLY_BRANCHES):
+        stems = [HEAVENLY_STEMS.index(s) for s in HIDDEN_STEMS[branch]]
+        hidden[b, :len(stems)] = stems
+        for stem, points in zip(stems, HIDDEN_STEM_POINTS[len(stems)]):
+            branch_scores[b, STEM_ELEMENT[stem]] += points
+    stem_scores = np.zeros((10, 5), dtype=np.int16)
+    stem_scores[np.arange(10), STEM_ELEMENT] = 10
+    ten_gods = np.array([[ten_god_index(d, s) for s in range(10)] for d in range(10)], dtype=np.uint8)
+    branch_gods = ten_gods[:, hidden[:, 0]]
+    return ten_gods, branch_gods, hidden, stem_scores, branch_scores
+
+TEN_GOD_TABLE, BRANCH_TEN_GOD_TABLE, HIDDEN_STEM_TABLE, STEM_ELEMENT_SCORES, BRANCH_ELEMENT_SCORES = _build_tables()
+
+# ----------------------
+# Vectorized analysis
+# ----------------------
+def analyze_batch(codes):
+    """
+    Ten Gods, hidden stems and element balance for arrays of charts.
+
+    Args:
+        codes (dict): `year`, `month`, `day`, `hour` pillar code arrays
+            (chart_table.ChartTable columns or PillarTimeline.lookup_array output)
+
+    Returns:
+        dict: uint8 (N, 4) `stem_gods` and `branch_gods` (Ten God indices of
+            each pillar's stem and main hidden stem, PILLARS order; the day
+            stem is the Day Master itself and reads 比肩), int8 (N, 4, 3)
+            `hidden_stems` and `hidden_gods` (-1 padded), int16 (N, 5)
+            `elements` points in ELEMENTS order and float64 `support`, the
+            share of points that are the Day Master's element or produce it
+    """
+    code = np.stack([np.asarray(codes[pillar], dtype=np.uint8) for pillar in PILLARS], axis=1)
+    stems, branches = code // 12, code % 12
+    day_stem = stems[:, 2:3]
+
+    hidden = HIDDEN_STEM_TABLE[branches]
+    hidden_gods = TEN_GOD_TABLE[day_stem[:, :, None], np.maximum(hidden, 0)].astype(np.int8)
+    hidden_gods[hidden < 0] = -1
+    elements = STEM_ELEMENT_SCORES[stems].sum(axis=1) + BRANCH_ELEMENT_SCORES[branches].sum(axis=1)
+
+    day_element = np.asarray(STEM_ELEMENT, dtype=np.int64)[day_stem[:, 0]]
+    rows = np.arange(len(code))
+    support = elements[rows, day_element] + elements[rows, (day_element - 1) % 5]
+    return {
+        "stem_gods": TEN_GOD_TABLE[day_stem, stems],
+        "branch_gods": BRANCH_TEN_GOD_TABLE[day_stem, branches],
+        "hidden_stems": hidden,
+        "hidden_gods": hidden_gods,
+        "elements": elements,
+        "support": support / elements.sum(axis=1),
+    }
+
+# ----------------------
+# Single chart
+# ----------------------
+def analyze_chart(indices):
+    """
+    Readable analysis of one chart.
+
+    Args:
+        indices (tuple): Stem/branch indices as returned by
+            bazi_core.four_pillar_indices_from_solar_us (or FourPillars.indices)
+
+    Returns:
+        dict: `day_master`, per-pillar `pillars` (stem Ten God, hidden stems
+            with their Ten Gods), `elements` (element name -> points in
+            tenths) and `support`
+    """
+    codes = {pillar: [indices[2 * i] * 12 + indices[2 * i + 1]] for i, pillar in enumerate(PILLARS)}
+    batch = analyze_batch(codes)
+    pillars = {}
+    for i, pillar in enumerate(PILLARS):
+        hidden = [s for s in batch["hidden_stems"][0, i].tolist() if s >= 0]
+        pillars[pillar] = {
+            "stem": HEAVENLY_STEMS[indices[2 * i]],
+            "branch": EARTHLY_BRANCHES[indices[2 * i + 1]],
+            "ten_god": None if pillar == "day" else TEN_GODS[batch["stem_gods"][0, i]],
+            "hidden_stems": [HEAVENLY_STEMS[s] for s in hidden],
+            "hidden_ten_gods": [TEN_GODS[g] for g in batch["hidden_gods"][0, i, :len(hidden)].tolist()],
+        }
+    return {
+        "day_master": HEAVENLY_STEMS[indices[4]],
+        "pillars": pillars,
+        "elements": dict(zip(ELEMENTS, batch["elements"][0].tolist())),
+        "support": float(batch["support"][0]),
+    }
@@ -0,0 +1,240 @@
+# chart_table.py
+import numpy as np
+
+from bazi_core import (
+    HEAVENLY_STEMS, EARTHLY_BRANCHES, HEAVENLY_STEMS_EN, EARTHLY_BRANCHES_EN,
+    STEMS_ELEMENTS, BRANCHES_ANIMALS,
+)
+
+# Each pillar is stored as one uint8 "pillar code" = stem_index * 12 + branch_index.
+# Codes 0-119 cover every stem/branch pair (the month and hour formulas can pair
+# stems and branches of different polarity, so the 60 sexagenary indices are not enough).
+PILLARS = ("year", "month", "day", "hour")
+N_PILLAR_CODES = len(HEAVENLY_STEMS) * len(EARTHLY_BRANCHES)
+
+# Column name -> dtype for the metadata columns carried next to the pillars
+METADATA_DTYPES = {
+    "jd_noon": np.int32,
+    "bazi_year": np.int16,
+    "bazi_month": np.uint8,
+}
+
+_DECODE_TABLES = {}
+
+def pillar_code(stem, branch):
+    """Combine stem (0-9) and branch (0-11) indices into a uint8 pillar code"""
+    return (np.asarray(stem, dtype=np.uint8) * 12 + np.asarray(branch, dtype=np.uint8)).astype(np.uint8)
+
+def split_pillar_code(code):
+    """
+    Split pillar codes back into stem and branch indices.
+
+    Returns:
+        tuple: (stem, branch) uint8 arrays
+    """
+    code = np.asarray(code, dtype=np.uint8)
+    return code // 12, code % 12
+
+def pillar_labels(style="hanzi"):
+    """
+    Labels for every pillar code, in code order.
+
+    Args:
+        style (str): "hanzi" (甲子), "pinyin" (Jia Zi) or "meaning" (Wood Rat; not
+            unique per code, so display only)
+
+    Returns:
+        list: N_PILLAR_CODES strings
+    """
+    if style not in _DECODE_TABLES:
+        labels = []
+        for stem in HEAVENLY_STEMS:
+            for branch in EARTHLY_BRANCHES:
+                if style == "hanzi":
+                    labels.append(f"{stem}{branch}")
+                elif style == "pinyin":
+                    labels.append(f"{HEAVENLY_STEMS_EN[stem]} {EARTHLY_BRANCHES_EN[branch]}")
+                elif style == "meaning":
+                    labels.append(f"{STEMS_ELEMENTS[stem]} {BRANCHES_ANIMALS[branch]}")
+                else:
+                    raise ValueError(f"Unknown label style: {style}")
+        _DECODE_TABLES[style] = labels
+    return _DECODE_TABLES[style]
+
+def _storage_labels(style):
+    """pillar_labels(style) for writing and reading files: each label must name exactly one code"""
+    labels = pillar_labels(style)
+    if len(set(labels)) != len(labels):
+        # "meaning" drops the stem's polarity (丙寅 and 丁寅 are both Fire Tiger)
+        raise ValueError(f"Label style {style!r} is ambiguous and can only be used for display; "
+                         f"store pillars as 'hanzi' or 'pinyin'")
+    return labels
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("Arrow/Parquet export requires pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+class ChartTable:
+    """
+    Columnar set of charts.
+
+    Pillars are uint8 pillar codes; strings are produced only by decode() or
+    at the Arrow/Parquet boundary, where the pillar columns are dictionary
+    encoded against the pillar labels. Any other equal-length NumPy columns
+    (ids, solar instants, ...) are carried along unchanged.
+    """
+    __slots__ = ("columns",)
+
+    def __init__(self, columns):
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All chart table columns must have the same length")
+        self.columns = columns
+
+    @classmethod
+    def from_batch(cls, batch, extra=None):
+        """
+        Build from the dict returned by bazi_batch.create_four_pillars_batch.
+
+        Args:
+            batch (dict): Batch result with `<pillar>_stem` / `<pillar>_branch` arrays
+            extra (dict, optional): Additional columns to carry
+
+        Returns:
+            ChartTable
+        """
+        columns = {p: pillar_code(batch[f"{p}_stem"], batch[f"{p}_branch"]) for p in PILLARS}
+        for name, dtype in METADATA_DTYPES.items():
+            columns[name] = np.asarray(batch[name]).astype(dtype)
+        columns.update(extra or {})
+        return cls(columns)
+
+    @classmethod
+    def from_four_pillars(cls, charts, extra=None):
+        """
+        Build from an iterable of bazi_core.FourPillars objects.
+
+        Args:
+            charts (iterable): FourPillars results
+            extra (dict, optional): Additional columns to carry
+
+        Returns:
+            ChartTable
+        """
+        charts = list(charts)
+        indices = np.array([c.indices for c in charts], dtype=np.uint8).reshape(-1, 8)
+        columns = {p: pillar_code(indices[:, 2 * i], indices[:, 2 * i + 1]) for i, p in enumerate(PILLARS)}
+        for name, dtype in METADATA_DTYPES.items():
+            columns[name] = np.array([getattr(c, name) for c in charts], dtype=dtype)
+        columns.update(extra or {})
+        return cls(columns)
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def stems_branches(self, pillar):
+        """Stem and branch index arrays for one pillar"""
+        return split_pillar_code(self.columns[pillar])
+
+    def decode(self, pillar, style="hanzi"):
+        """
+        Decode one pillar column to strings.
+
+        Args:
+            pillar (str): "year", "month", "day" or "hour"
+            style (str): "hanzi", "pinyin" or "meaning"
+
+        Returns:
+            ndarray: Unicode strings
+        """
+        return np.array(pillar_labels(style))[self.columns[pillar]]
+
+    def to_arrow(self, style="hanzi"):
+        """
+        Convert to a pyarrow.Table without copying the pillar codes.
+
+        Pillar columns become dictionary<uint8, string> arrays whose indices
+        are the pillar codes and whose dictionary is pillar_labels(style).
+
+        Returns:
+            pyarrow.Table
+
+        Raises:
+            ValueError: The style's labels are not unique ("meaning")
+        """
+        pa = _require_pyarrow()
+        dictionary = pa.array(_storage_labels(style))
+        arrays = {}
+        for name, values in self.columns.items():
+            if name in PILLARS:
+                arrays[name] = pa.DictionaryArray.from_arrays(pa.array(values, type=pa.uint8()), dictionary)
+            else:
+                arrays[name] = pa.array(values)
+        return pa.table(arrays)
+
+    @classmethod
+    def from_arrow(cls, table, style="hanzi"):
+        """
+        Build from a pyarrow.Table written by to_arrow (or read back from Parquet).
+
+        Args:
+            table (pyarrow.Table): Table with dictionary or string pillar columns
+            style (str): Label style the pillar columns were written with
+
+        Returns:
+            ChartTable
+
+        Raises:
+            ValueError: The style's labels are not unique ("meaning"), or a
+                pillar column holds labels of another style
+        """
+        pa = _require_pyarrow()
+        label_codes = {label: code for code, label in enumerate(_storage_labels(style))}
+        columns = {}
+        for name in table.column_names:
+            column = table.column(name).combine_chunks()
+            if name in PILLARS:
+                if not pa.types.is_dictionary(column.type):
+                    column = column.dictionary_encode()
+                # Readers may rebuild the dictionary, so remap it onto the pillar codes
+                labels = column.dictionary.to_pylist()
+                unknown = [label for label in labels if label not in label_codes]
+                if unknown:
+                    raise ValueError(f"Column {name!r} has labels that are not {style!r} pillars: {unknown[:3]}")
+                remap = np.array([label_codes[label] for label in labels], dtype=np.uint8)
+                columns[name] = remap[column.indices.to_numpy(zero_copy_only=False)]
+            else:
+                columns[name] = column.to_numpy(zero_copy_only=False)
+        return cls(columns)
+
+    def write_arrow(self, path, style="hanzi"):
+        """Write an Arrow IPC (Feather v2) file"""
+        _require_pyarrow()
+        import pyarrow.feather as feather
+        feather.write_feather(self.to_arrow(style), path)
+
+    def write_parquet(self, path, style="hanzi", compression="zstd"):
+        """Write a Parquet file with dictionary-encoded pillar columns"""
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(style), path, use_dictionary=list(PILLARS), compression=compression)
+
+    @classmethod
+    def read_parquet(cls, path, style="hanzi"):
+        """Read a Parquet file written by write_parquet"""
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        return cls.from_arrow(pq.read_table(path), style)
+
+    @classmethod
+    def read_arrow(cls, path, style="hanzi"):
+        """Read an Arrow IPC file written by write_arrow"""
+        _require_pyarrow()
+        import pyarrow.feather as feather
+        return cls.from_arrow(feather.read_table(path, memory_map=True), style)
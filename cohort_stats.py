@@ -0,0 +1,317 @@
+# cohort_stats.py
+# Streaming cohort distributions: birth records in, pillar histograms by group out.
+#
+# Usage:
+#     python cohort_stats.py births.csv day_masters.csv --group-by country decade --kind day_master
+#
+# Every chart adds one count per pillar to counts[group, pillar, pillar_code],
+# a (groups x 4 x 120) int64 array. Stem, branch, Day Master, zodiac and
+# element distributions are all sums over it, so it is the only state kept:
+# charts are never held past their chunk, and partial histograms from
+# separate chunks, processes or machines merge by adding counts.
+import argparse
+import collections
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from bazi_core import HEAVENLY_STEMS, EARTHLY_BRANCHES, BRANCHES_ANIMALS, EOT_MODELS
+from chart_analysis import ELEMENTS, STEM_ELEMENT, STEM_ELEMENT_SCORES, BRANCH_ELEMENT_SCORES
+from chart_table import PILLARS, N_PILLAR_CODES, pillar_labels
+
+# Group keys computed from the birth record rather than read from a column
+DERIVED_KEYS = {
+    "decade": lambda chunk: np.asarray(chunk["year"], dtype=np.float64) // 10 * 10,
+}
+KINDS = ("pillar", "stem", "branch", "day_master", "day_master_element", "zodiac", "element_points")
+
+_CODE = np.arange(N_PILLAR_CODES)
+# Pillar code -> category, for every kind that is a regrouping of codes
+_CODE_CATEGORIES = {
+    "pillar": _CODE,
+    "stem": _CODE // 12,
+    "branch": _CODE % 12,
+    "day_master": _CODE // 12,
+    "day_master_element": np.asarray(STEM_ELEMENT)[_CODE // 12],
+    "zodiac": _CODE % 12,
+}
+# Pillar each kind is read from (the others use the pillar argument)
+_KIND_PILLAR = {"day_master": "day", "day_master_element": "day", "zodiac": "year"}
+
+def kind_labels(kind):
+    """Category labels of a distribution kind, in category order"""
+    if kind == "pillar":
+        return pillar_labels()
+    if kind in ("stem", "day_master"):
+        return list(HEAVENLY_STEMS)
+    if kind == "branch":
+        return list(EARTHLY_BRANCHES)
+    if kind == "zodiac":
+        return [BRANCHES_ANIMALS[b] for b in EARTHLY_BRANCHES]
+    if kind in ("day_master_element", "element_points"):
+        return list(ELEMENTS)
+    raise ValueError(f"Unknown distribution kind: {kind!r} (expected one of {', '.join(KINDS)})")
+
+def _missing(value):
+    return value is None or value == "" or (isinstance(value, float) and np.isnan(value))
+
+def _key_value(value):
+    if np.isnan(value):
+        return None
+    return int(value) if value.is_integer() else value
+
+def _factorize(values):
+    """
+    Integer codes and distinct values of a key column.
+
+    Returns:
+        tuple: (int64 codes, list of distinct values with missing ones as None)
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in "iuf":
+        distinct, codes = np.unique(values, return_inverse=True)
+        return codes.reshape(-1).astype(np.int64), [_key_value(v) for v in distinct.astype(float)]
+    lookup = {}
+    codes = np.fromiter((lookup.setdefault(None if _missing(v) else v, len(lookup)) for v in values.tolist()),
+                        dtype=np.int64, count=len(values))
+    return codes, list(lookup)
+
+class CohortHistogram:
+    """
+    Mergeable pillar code histograms per group.
+
+    Groups are tuples of key values in group_by order and get rows in
+    order of first appearance; merging aligns them by key.
+    """
+
+    def __init__(self, group_by=()):
+        self.group_by = tuple(group_by)
+        self.groups = {}
+        self.counts = np.zeros((0, len(PILLARS), N_PILLAR_CODES), dtype=np.int64)
+
+    def __len__(self):
+        return len(self.groups)
+
+    @property
+    def total(self):
+        """Number of charts counted"""
+        return int(self.counts[:, 0].sum())
+
+    def _group_rows(self, keys):
+        """Histogram row of every record, adding rows for new groups"""
+        n = len(next(iter(keys.values()))) if keys else 0
+        composite = np.zeros(n, dtype=np.int64)
+        distinct = []
+        for name in self.group_by:
+            codes, values = _factorize(keys[name])
+            composite = composite * len(values) + codes
+            distinct.append(values)
+        combos, inverse = np.unique(composite, return_inverse=True)
+        rows = np.empty(len(combos), dtype=np.int64)
+        for i, combo in enumerate(combos.tolist()):
+            key = []
+            for values in reversed(distinct):
+                combo, code = divmod(combo, len(values))
+                key.append(values[code])
+            rows[i] = self.groups.setdefault(tuple(reversed(key)), len(self.groups))
+        self._grow()
+        return rows[inverse.reshape(-1)]
+
+    def _grow(self):
+        if len(self.groups) > len(self.counts):
+            extra = np.zeros((len(self.groups) - len(self.counts),) + self.counts.shape[1:], dtype=np.int64)
+            self.counts = np.concatenate([self.counts, extra])
+
+    def add_codes(self, codes, keys=None):
+        """
+        Count charts.
+
+        Args:
+            codes (dict): `year`, `month`, `day`, `hour` pillar code arrays
+            keys (dict, optional): Group key arrays by group_by name
+
+        Returns:
+            CohortHistogram: self
+        """
+        code = np.stack([np.asarray(codes[pillar], dtype=np.int64) for pillar in PILLARS], axis=1)
+        if self.group_by:
+            rows = self._group_rows(keys)
+        else:
+            self.groups.setdefault((), 0)
+            self._grow()
+            rows = np.zeros(len(code), dtype=np.int64)
+        flat = (rows[:, None] * len(PILLARS) + np.arange(len(PILLARS))) * N_PILLAR_CODES + code
+        self.counts += np.bincount(flat.reshape(-1), minlength=self.counts.size).reshape(self.counts.shape)
+        return self
+
+    def merge(self, other):
+        """
+        Add another histogram's counts (same group_by) into this one.
+
+        Returns:
+            CohortHistogram: self
+        """
+        if other.group_by != self.group_by:
+            raise ValueError(f"Cannot merge histograms grouped by {other.group_by} into {self.group_by}")
+        rows = [self.groups.setdefault(key, len(self.groups)) for key in other.groups]
+        self._grow()
+        np.add.at(self.counts, np.asarray(rows, dtype=np.int64), other.counts)
+        return self
+
+    def __add__(self, other):
+        merged = CohortHistogram(self.group_by).merge(self)
+        return merged.merge(other)
+
+    def distribution(self, kind, pillar="day"):
+        """
+        Distribution of one kind per group.
+
+        Args:
+            kind (str): One of KINDS; day_master / day_master_element read the
+                day pillar and zodiac the year pillar, the rest `pillar`
+            pillar (str): Pillar for pillar / stem / branch
+
+        Returns:
+            tuple: (groups, labels, counts) with groups a list of key tuples,
+                labels from kind_labels and counts int64 (groups, labels);
+                element_points counts are points in tenths summed over all
+                four pillars
+        """
+        labels = kind_labels(kind)
+        if kind == "element_points":
+            points = STEM_ELEMENT_SCORES[_CODE // 12] + BRANCH_ELEMENT_SCORES[_CODE % 12]
+            return list(self.groups), labels, self.counts.sum(axis=1) @ points.astype(np.int64)
+        p = PILLARS.index(_KIND_PILLAR.get(kind, pillar))
+        categories = _CODE_CATEGORIES[kind]
+        one_hot = (categories[:, None] == np.arange(len(labels))).astype(np.int64)
+        return list(self.groups), labels, self.counts[:, p] @ one_hot
+
+    def rows(self, kind, pillar="day"):
+        """
+        Long-format distribution rows for export.
+
+        Yields:
+            dict: Group keys, `category`, `count` and `share` within the group
+        """
+        groups, labels, counts = self.distribution(kind, pillar)
+        totals = counts.sum(axis=1)
+        for key, row, total in zip(groups, counts.tolist(), totals.tolist()):
+            for label, count in zip(labels, row):
+                if count:
+                    yield dict(zip(self.group_by, key), category=label, count=count, share=count / total)
+
+# ----------------------
+# Streaming from birth records
+# ----------------------
+def _key_columns(chunk, group_by, positions):
+    keys = {}
+    for name in group_by:
+        values = DERIVED_KEYS[name](chunk) if name in DERIVED_KEYS and name not in chunk else chunk[name]
+        keys[name] = np.asarray(values)[positions]
+    return keys
+
+def aggregate_chunk(chunk, first_row, group_by=(), default_tz_offset=8.0, eot_model="noaa"):
+    """
+    Histogram of one chunk of birth records (runs in worker processes).
+
+    Args:
+        chunk (dict): Column name -> NumPy array, as from bazi_cli.iter_chunks
+        first_row (int): Row number of the chunk's first record
+        group_by (tuple): Group key columns or DERIVED_KEYS names
+        default_tz_offset (float): Offset used when the input has no tz_offset column
+        eot_model (str): Equation of time model, one of bazi_core.EOT_MODELS
+
+    Returns:
+        tuple: (CohortHistogram, number of rejected rows)
+    """
+    from bazi_cli import process_chunk
+
+    table, errors = process_chunk(chunk, first_row, default_tz_offset, eot_model=eot_model)
+    positions = table.columns["row"] - first_row
+    histogram = CohortHistogram(group_by)
+    if len(table):
+        histogram.add_codes(table.columns, _key_columns(chunk, group_by, positions))
+    return histogram, len(errors)
+
+def aggregate_file(input_path, group_by=(), chunk_size=100_000, workers=None, default_tz_offset=8.0,
+                   eot_model="noaa"):
+    """
+    Stream a birth record file into one CohortHistogram.
+
+    Args:
+        input_path (str): .csv or .parquet birth records
+        group_by (tuple): Group key columns or DERIVED_KEYS names
+        chunk_size (int): Rows per chunk
+        workers (int, optional): Worker processes (default: CPU count; 1 runs inline)
+        default_tz_offset (float): Offset for inputs without a tz_offset column
+        eot_model (str): Equation of time model, one of bazi_core.EOT_MODELS
+
+    Returns:
+        tuple: (CohortHistogram, number of rejected rows)
+    """
+    from bazi_cli import iter_chunks
+
+    group_by = tuple(group_by)
+    columns = tuple(name for name in group_by if name not in DERIVED_KEYS)
+    workers = workers or os.cpu_count() or 1
+    histogram = CohortHistogram(group_by)
+    rejected = 0
+    first_row = 0
+    if workers == 1:
+        for chunk in iter_chunks(input_path, chunk_size, columns):
+            partial, errors = aggregate_chunk(chunk, first_row, group_by, default_tz_offset, eot_model)
+            histogram.merge(partial)
+            rejected += errors
+            first_row += len(chunk["year"])
+        return histogram, rejected
+
+    pending = collections.deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in iter_chunks(input_path, chunk_size, columns):
+            pending.append(pool.submit(aggregate_chunk, chunk, first_row, group_by, default_tz_offset, eot_model))
+            first_row += len(chunk["year"])
+            while len(pending) >= 2 * workers or (pending and pending[0].done()):
+                partial, errors = pending.popleft().result()
+                histogram.merge(partial)
+                rejected += errors
+        for future in pending:
+            partial, errors = future.result()
+            histogram.merge(partial)
+            rejected += errors
+    return histogram, rejected
+
+def write_rows(path, histogram, kind, pillar="day"):
+    """Write histogram.rows(kind, pillar) as CSV"""
+    with open(path, "w", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=list(histogram.group_by) + ["category", "count", "share"])
+        writer.writeheader()
+        writer.writerows(histogram.rows(kind, pillar))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pillar distributions of a birth record file by group.")
+    parser.add_argument("input", help="Input .csv or .parquet file")
+    parser.add_argument("output", help="Output .csv file (long format: group keys, category, count, share)")
+    parser.add_argument("--group-by", nargs="*", default=[],
+                        help=f"Group key columns (or derived: {', '.join(DERIVED_KEYS)})")
+    parser.add_argument("--kind", choices=KINDS, default="day_master", help="Distribution (default: day_master)")
+    parser.add_argument("--pillar", choices=PILLARS, default="day",
+                        help="Pillar for pillar/stem/branch distributions (default: day)")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows per chunk (default: 100000)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--tz-offset", type=float, default=8.0,
+                        help="GMT offset in hours when the input has no tz_offset column (default: 8)")
+    parser.add_argument("--eot-model", choices=EOT_MODELS, default="noaa",
+                        help="Equation of time model (default: noaa)")
+    args = parser.parse_args(argv)
+
+    histogram, rejected = aggregate_file(args.input, args.group_by, args.chunk_size, args.workers, args.tz_offset,
+                                         args.eot_model)
+    write_rows(args.output, histogram, args.kind, args.pillar)
+    print(f"Counted {histogram.total} charts in {len(histogram)} groups ({rejected} rejected)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+# compatibility.py
+import numpy as np
+
+from chart_analysis import STEM_ELEMENT
+
+# Pairwise chart compatibility from small integer relation tables:
+#   STEM_COMPATIBILITY[a, b]    10 x 10   Day Master relation (五合 combination,
+#                                         production, same element, control)
+#   BRANCH_COMPATIBILITY[a, b]  12 x 12   六合 harmony, 三合 trine, 六冲 clash, 六害 harm
+#   DAY_PILLAR_COMPATIBILITY    120 x 120 both of the above over day pillar codes
+# A pair's score is the day pillar score plus the year branch score, so it
+# depends only on each chart's "type" (day pillar code, year branch): 1,440
+# types. TYPE_COMPATIBILITY (1440 x 1440 int8, 2 MB) holds every type pair,
+# so an N x N block is a single gather and a top-k query ranks 1,440 types
+# instead of N charts.
+STEM_SCORES = {"combine": 3, "produce": 2, "same": 1, "control": -1}
+BRANCH_SCORES = {"harmony": 3, "trine": 2, "clash": -3, "harm": -2}
+N_CHART_TYPES = 120 * 12
+DEFAULT_BLOCK_SIZE = 2048
+
+def stem_relation(a, b):
+    """
+    Relation between two Day Master stems.
+
+    Returns:
+        str: "combine", "produce", "same" or "control"
+    """
+    if abs(a - b) == 5:
+        return "combine"
+    elements = (STEM_ELEMENT[b] - STEM_ELEMENT[a]) % 5
+    if elements in (1, 4):
+        return "produce"
+    if elements == 0:
+        return "same"
+    return "control"
+
+def branch_relation(a, b):
+    """
+    Relation between two branches.
+
+    Returns:
+        str: "harmony", "trine", "clash", "harm" or None
+    """
+    if (a + b) % 12 == 1:
+        return "harmony"
+    if (a - b) % 12 == 6:
+        return "clash"
+    if (a + b) % 12 == 7:
+        return "harm"
+    if a != b and a % 4 == b % 4:
+        return "trine"
+    return None
+
+def _build_tables():
+    stems = np.array([[STEM_SCORES.get(stem_relation(a, b), 0) for b in range(10)] for a in range(10)],
+                     dtype=np.int8)
+    branches = np.array([[BRANCH_SCORES.get(branch_relation(a, b), 0) for b in range(12)] for a in range(12)],
+                        dtype=np.int8)
+    code = np.arange(120)
+    day_pillars = (stems[code[:, None] // 12, code[None, :] // 12]
+                   + branches[code[:, None] % 12, code[None, :] % 12]).astype(np.int8)
+    return stems, branches, day_pillars
+
+STEM_COMPATIBILITY, BRANCH_COMPATIBILITY, DAY_PILLAR_COMPATIBILITY = _build_tables()
+_TYPE_COMPATIBILITY = None
+
+def type_compatibility():
+    """The 1440 x 1440 int8 score table over chart types, built on first use"""
+    global _TYPE_COMPATIBILITY
+    if _TYPE_COMPATIBILITY is None:
+        chart_type = np.arange(N_CHART_TYPES)
+        day, year_branch = chart_type // 12, chart_type % 12
+        _TYPE_COMPATIBILITY = (DAY_PILLAR_COMPATIBILITY[day[:, None], day[None, :]]
+                               + BRANCH_COMPATIBILITY[year_branch[:, None], year_branch[None, :]]).astype(np.int8)
+    return _TYPE_COMPATIBILITY
+
+def chart_types(codes):
+    """
+    Chart type of each chart: day pillar code * 12 + year branch.
+
+    Args:
+        codes (dict): `year` and `day` pillar code arrays (chart_table.ChartTable
+            columns or PillarTimeline.lookup_array output)
+
+    Returns:
+        ndarray: int16 chart types (0-1439)
+    """
+    day = np.asarray(codes["day"], dtype=np.int16)
+    year_branch = np.asarray(codes["year"], dtype=np.int16) % 12
+    return day * 12 + year_branch
+
+def compatibility_score(a, b):
+    """
+    Compatibility of two charts.
+
+    Args:
+        a, b (tuple): Stem/branch indices as returned by
+            bazi_core.four_pillar_indices_from_solar_us
+
+    Returns:
+        dict: `score` and the `day_master`, `day_branch` and `year_branch`
+            relations it is made of
+    """
+    relations = {
+        "day_master": stem_relation(a[4], b[4]),
+        "day_branch": branch_relation(a[5], b[5]),
+        "year_branch": branch_relation(a[1], b[1]),
+    }
+    score = (int(STEM_COMPATIBILITY[a[4], b[4]]) + int(BRANCH_COMPATIBILITY[a[5], b[5]])
+             + int(BRANCH_COMPATIBILITY[a[1], b[1]]))
+    return dict(relations, score=score)
+
+# ----------------------
+# Blocked N x N scores
+# ----------------------
+def compatibility_blocks(codes_a, codes_b=None, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Yield the compatibility matrix in square blocks.
+
+    Memory stays at block_size**2 bytes however large the pools are; reduce
+    or write out each block as it arrives. Blocks are independent, so they
+    can be split across worker processes by row range.
+
+    Args:
+        codes_a (dict): Pillar code arrays for the row charts (see chart_types)
+        codes_b (dict, optional): Column charts (default: codes_a)
+        block_size (int): Rows and columns per block
+
+    Yields:
+        tuple: (row_start, column_start, scores) with scores an int8 block
+    """
+    types_a = chart_types(codes_a)
+    types_b = types_a if codes_b is None else chart_types(codes_b)
+    table = type_compatibility()
+    for i in range(0, len(types_a), block_size):
+        rows = table[types_a[i:i + block_size]]
+        for j in range(0, len(types_b), block_size):
+            yield i, j, rows[:, types_b[j:j + block_size]]
+
+def compatibility_matrix(codes_a, codes_b=None, block_size=DEFAULT_BLOCK_SIZE):
+    """Full int8 compatibility matrix (for pools small enough to hold N x M bytes)"""
+    n = len(codes_a["day"])
+    m = n if codes_b is None else len(codes_b["day"])
+    matrix = np.empty((n, m), dtype=np.int8)
+    for i, j, block in compatibility_blocks(codes_a, codes_b, block_size):
+        matrix[i:i + block.shape[0], j:j + block.shape[1]] = block
+    return matrix
+
+# ----------------------
+# Top-k matches
+# ----------------------
+def _ranked_members(scores, type_starts, members, k):
+    """First k pool members by (score desc, pool index asc) for one query type"""
+    sizes = np.diff(type_starts)
+    order = np.argsort(-scores, kind="stable")
+    order = order[sizes[order] > 0]
+    enough = min(np.searchsorted(np.cumsum(sizes[order]), k), len(order) - 1)
+    # Every type scoring at least the k-th candidate, so ties are broken by index
+    chosen = order[scores[order] >= scores[order[enough]]]
+    candidates = np.concatenate([members[type_starts[t]:type_starts[t + 1]] for t in chosen])
+    candidate_scores = np.repeat(scores[chosen], sizes[chosen])
+    ranked = np.lexsort((candidates, -candidate_scores.astype(np.int16)))[:k]
+    return candidates[ranked], candidate_scores[ranked]
+
+def top_matches(pool_codes, query_codes=None, k=10):
+    """
+    Best matches in a pool, without building the N x N matrix.
+
+    Args:
+        pool_codes (dict): Pillar code arrays of the pool (see chart_types)
+        query_codes (dict, optional): Charts to find matches for (default: the
+            pool itself, each chart excluding itself)
+        k (int): Matches per query
+
+    Returns:
+        tuple: (indices, scores), (Q, k) int64 pool indices and int8 scores,
+            best first with ties broken by pool index; -1 / 0 pad short pools
+    """
+    pool_types = chart_types(pool_codes)
+    self_match = query_codes is None
+    query_types = pool_types if self_match else chart_types(query_codes)
+    members = np.argsort(pool_types, kind="stable")
+    type_starts = np.searchsorted(pool_types[members], np.arange(N_CHART_TYPES + 1))
+    table = type_compatibility()
+    wanted = k + 1 if self_match else k
+
+    indices = np.full((len(query_types), k), -1, dtype=np.int64)
+    scores = np.zeros((len(query_types), k), dtype=np.int8)
+    if len(pool_types) == 0:
+        return indices, scores
+    # Queries of the same type share one ranking
+    query_order = np.argsort(query_types, kind="stable")
+    query_starts = np.searchsorted(query_types[query_order], np.arange(N_CHART_TYPES + 1))
+    for query_type in np.flatnonzero(np.diff(query_starts)):
+        rows = query_order[query_starts[query_type]:query_starts[query_type + 1]]
+        ranked, ranked_scores = _ranked_members(table[query_type], type_starts, members, wanted)
+        if not self_match:
+            indices[rows, :len(ranked)] = ranked
+            scores[rows, :len(ranked)] = ranked_scores
+            continue
+        # Drop each query's own index, or the surplus last match when it is not ranked
+        keep = ranked[None, :] != rows[:, None]
+        if len(ranked) == wanted:
+            keep[keep.all(axis=1), -1] = False
+            indices[rows] = np.broadcast_to(ranked, keep.shape)[keep].reshape(len(rows), k)
+            scores[rows] = np.broadcast_to(ranked_scores, keep.shape)[keep].reshape(len(rows), k)
+        else:
+            for row, row_keep in zip(rows, keep):
+                found = ranked[row_keep]
+                indices[row, :len(found)] = found
+                scores[row, :len(found)] = ranked_scores[row_keep]
+    return indices, scores
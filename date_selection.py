@@ -0,0 +1,260 @@
+# date_selection.py
+import datetime
+
+import numpy as np
+
+from bazi_core import HEAVENLY_STEMS, EARTHLY_BRANCHES, JDN_EPOCH, days_from_civil
+from chart_analysis import TEN_GODS, TEN_GOD_TABLE
+from chart_table import PILLARS
+from compatibility import branch_relation, stem_relation, type_compatibility
+from pillar_search import hour_slot_minutes
+
+# Date selection (择日): every day of a range gets its day pillar from the
+# solar day number alone,
+#   jd_noon = day + JDN_EPOCH, stem = (jd_noon - 1) % 10, branch = (jd_noon + 1) % 12
+# (calculate_day_master_from_solar on a whole array). A rule or score only
+# depends on the client and the day pillar, so both are evaluated on a
+# (clients x 120 pillar codes) grid and spread over the days with one gather.
+#
+# Rules are plain functions rule(natal, stem, branch) -> bool array, where
+# natal maps pillar names to (C, 1) `stem` / `branch` arrays and stem/branch
+# are the candidate pillar's indices (shape (1, 120)); they compose with
+# all_of / any_of / none_of and apply to hour pillars as well as days:
+#   all_of(harmonizes_with("day"), none_of(clashes_with("year")))
+BRANCH_RELATIONS = ("harmony", "trine", "clash", "harm", "same")
+STEM_RELATIONS = ("combine", "produce", "same", "control")
+N_HOUR_SLOTS = 13  # slot 12 (23:00-24:00) is 子 again, with the stem two further on
+DEFAULT_CLIENT_BLOCK = 1024
+
+_CODE = np.arange(120)
+_CANDIDATE_STEM, _CANDIDATE_BRANCH = _CODE[None, :] // 12, _CODE[None, :] % 12
+
+def _relation_table(relation, size, names):
+    table = np.zeros((len(names), size, size), dtype=bool)
+    for a in range(size):
+        for b in range(size):
+            found = relation(a, b) or ("same" if a == b else None)
+            if found in names:
+                table[names.index(found), a, b] = True
+    return table
+
+BRANCH_RELATION_TABLE = _relation_table(branch_relation, 12, BRANCH_RELATIONS)
+STEM_RELATION_TABLE = _relation_table(stem_relation, 10, STEM_RELATIONS)
+
+# ----------------------
+# Rules
+# ----------------------
+def _relation_mask(table, names, relations):
+    if isinstance(relations, str):
+        relations = (relations,)
+    unknown = set(relations) - set(names)
+    if unknown:
+        raise ValueError(f"Unknown relation(s): {', '.join(sorted(unknown))} (expected {', '.join(names)})")
+    return table[[names.index(r) for r in relations]].any(axis=0)
+
+def branch_relation_to(pillar, relations):
+    """Rule: the candidate branch has one of `relations` (BRANCH_RELATIONS) to a natal pillar's branch"""
+    mask = _relation_mask(BRANCH_RELATION_TABLE, BRANCH_RELATIONS, relations)
+    return lambda natal, stem, branch: mask[natal[pillar]["branch"], branch]
+
+def stem_relation_to(pillar, relations):
+    """Rule: the candidate stem has one of `relations` (STEM_RELATIONS) to a natal pillar's stem"""
+    mask = _relation_mask(STEM_RELATION_TABLE, STEM_RELATIONS, relations)
+    return lambda natal, stem, branch: mask[natal[pillar]["stem"], stem]
+
+def harmonizes_with(pillar="day"):
+    """Rule: the candidate branch is in 六合 harmony or 三合 trine with a natal branch"""
+    return branch_relation_to(pillar, ("harmony", "trine"))
+
+def clashes_with(pillar="year"):
+    """Rule: the candidate branch clashes (六冲) with a natal branch"""
+    return branch_relation_to(pillar, "clash")
+
+def ten_god_in(gods):
+    """Rule: the candidate stem's Ten God relative to the natal Day Master is one of `gods` (TEN_GODS)"""
+    wanted = np.zeros(len(TEN_GODS), dtype=bool)
+    wanted[[TEN_GODS.index(g) for g in ([gods] if isinstance(gods, str) else gods)]] = True
+    return lambda natal, stem, branch: wanted[TEN_GOD_TABLE[natal["day"]["stem"], stem]]
+
+def all_of(*rules):
+    """Rule: every rule holds"""
+    return lambda natal, stem, branch: np.logical_and.reduce([r(natal, stem, branch) for r in rules])
+
+def any_of(*rules):
+    """Rule: at least one rule holds"""
+    return lambda natal, stem, branch: np.logical_or.reduce([r(natal, stem, branch) for r in rules])
+
+def none_of(*rules):
+    """Rule: no rule holds"""
+    return lambda natal, stem, branch: ~np.logical_or.reduce([r(natal, stem, branch) for r in rules])
+
+def _natal_parts(codes):
+    """Pillar code arrays -> {pillar: {"stem", "branch"}} of (C, 1) arrays"""
+    parts = {}
+    for pillar in PILLARS:
+        code = np.asarray(codes[pillar], dtype=np.int64)[:, None]
+        parts[pillar] = {"stem": code // 12, "branch": code % 12}
+    return parts
+
+def _candidate_grid(natal_codes, rule, stem=_CANDIDATE_STEM, branch=_CANDIDATE_BRANCH):
+    """Allowed mask and scores of candidate pillars for each client, shape (C, candidates)"""
+    natal = _natal_parts(natal_codes)
+    allowed = np.ones(np.broadcast_shapes(natal["day"]["stem"].shape, stem.shape), dtype=bool)
+    if rule is not None:
+        allowed &= rule(natal, stem, branch)
+    # Scored like a compatibility match against a chart whose day pillar is
+    # the candidate and whose year branch is the candidate branch
+    natal_type = (natal["day"]["stem"] * 12 + natal["day"]["branch"]) * 12 + natal["year"]["branch"]
+    scores = type_compatibility()[natal_type, (stem * 12 + branch) * 12 + branch]
+    return allowed, scores
+
+# ----------------------
+# Day ranges
+# ----------------------
+def day_pillars(start, end):
+    """
+    Day pillars for every date in a range.
+
+    Args:
+        start, end (datetime.date): Date range, end exclusive
+
+    Returns:
+        dict: int64 `day` (days since 1970-01-01) and `jd_noon`, uint8
+            `stem`, `branch` and pillar `code`
+    """
+    day = np.arange(days_from_civil(start.year, start.month, start.day),
+                    days_from_civil(end.year, end.month, end.day), dtype=np.int64)
+    jd_noon = day + JDN_EPOCH
+    stem = ((jd_noon - 1) % 10).astype(np.uint8)
+    branch = ((jd_noon + 1) % 12).astype(np.uint8)
+    return {"day": day, "jd_noon": jd_noon, "stem": stem, "branch": branch,
+            "code": (stem * 12 + branch).astype(np.uint8)}
+
+def select_days(natal_codes, start, end, rule=None, limit=None, block_size=DEFAULT_CLIENT_BLOCK):
+    """
+    Ranked days in a date range for many clients.
+
+    Args:
+        natal_codes (dict): `year`, `month`, `day`, `hour` pillar code arrays
+            of the clients (chart_table.ChartTable columns or
+            PillarTimeline.lookup_array output)
+        start, end (datetime.date): Date range, end exclusive
+        rule (callable, optional): Day rule (see the module comment); default allows every day
+        limit (int, optional): Keep only the best `limit` days per client
+        block_size (int): Clients ranked at a time (bounds memory at
+            block_size x days x 4 bytes)
+
+    Returns:
+        dict: Ragged result, client c's days at [offsets[c], offsets[c + 1]),
+            best first (score descending, then date): int64 `offsets`,
+            `client` and `day` (days since 1970-01-01), uint8 pillar `code`
+            and int8 `score`
+    """
+    days = day_pillars(start, end)
+    n_days = len(days["day"])
+    allowed, scores = _candidate_grid(natal_codes, rule)
+    # Sort key per (client, day): score level first, then the date
+    key_grid = (int(scores.max(initial=0)) - scores.astype(np.int32)) * n_days
+    day_index = np.arange(n_days, dtype=np.int32)
+    rejected = np.iinfo(np.int32).max
+
+    counts, found_days = [], []
+    for i in range(0, len(key_grid), block_size):
+        allowed_days = allowed[i:i + block_size][:, days["code"]]
+        keys = np.where(allowed_days, key_grid[i:i + block_size][:, days["code"]] + day_index, rejected)
+        n_allowed = allowed_days.sum(axis=1)
+        if limit is not None and limit < n_days:
+            keys = np.partition(keys, limit - 1, axis=1)[:, :limit]
+            n_allowed = np.minimum(n_allowed, limit)
+        keys = np.sort(keys, axis=1)
+        found_days.append(keys[np.arange(keys.shape[1]) < n_allowed[:, None]] % n_days)
+        counts.append(n_allowed)
+
+    counts = np.concatenate(counts) if counts else np.zeros(0, dtype=np.int64)
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    client = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+    day_index = np.concatenate(found_days) if found_days else np.zeros(0, dtype=np.int64)
+    code = days["code"][day_index]
+    return {
+        "offsets": offsets,
+        "client": client,
+        "day": days["day"][day_index],
+        "code": code,
+        "score": scores[client, code],
+    }
+
+def rank_hours(natal_codes, day_codes, rule=None):
+    """
+    Ranked hour slots of selected days.
+
+    Args:
+        natal_codes (dict): Natal pillar code arrays, one chart per selected
+            day (e.g. gathered with select_days(...)["client"])
+        day_codes (array-like): Day pillar codes of those days
+        rule (callable, optional): Hour rule, applied to the hour pillars
+
+    Returns:
+        dict: (M, N_HOUR_SLOTS) `slot` int8 (best first, -1 padded) and
+            `score` int8 (0 padded); slots are pillar_search.hour_slot_minutes slots
+    """
+    day_stem = np.asarray(day_codes, dtype=np.int64)[:, None] // 12
+    slot = np.arange(N_HOUR_SLOTS)[None, :]
+    allowed, scores = _candidate_grid(natal_codes, rule, (day_stem + slot) % 10, slot % 12)
+    order = np.lexsort((np.broadcast_to(slot, scores.shape), -scores.astype(np.int16), ~allowed), axis=1)
+    ranked_allowed = np.take_along_axis(allowed, order, axis=1)
+    return {
+        "slot": np.where(ranked_allowed, order, -1).astype(np.int8),
+        "score": np.where(ranked_allowed, np.take_along_axis(scores, order, axis=1), 0).astype(np.int8),
+    }
+
+# ----------------------
+# Single chart
+# ----------------------
+def auspicious_days(indices, start, end, rule=None, limit=None, hours=False, hour_rule=None):
+    """
+    Readable select_days for one chart.
+
+    Example: auspicious_days(chart, date(2026, 1, 1), date(2028, 1, 1),
+    all_of(harmonizes_with("day"), none_of(clashes_with("year"))), limit=20)
+
+    Args:
+        indices (tuple): Stem/branch indices as returned by
+            bazi_core.four_pillar_indices_from_solar_us
+        start, end (datetime.date): Date range, end exclusive
+        rule (callable, optional): Day rule
+        limit (int, optional): Number of days to return
+        hours (bool): Also rank each day's hours
+        hour_rule (callable, optional): Hour rule (implies hours)
+
+    Returns:
+        list: Dicts with `date`, `pillar`, `score` and, with hours, `hours`:
+            dicts with `pillar`, `start` and `end` (solar "HH:MM") and `score`
+    """
+    codes = {pillar: [indices[2 * i] * 12 + indices[2 * i + 1]] for i, pillar in enumerate(PILLARS)}
+    selected = select_days(codes, start, end, rule, limit)
+    epoch = datetime.date(1970, 1, 1)
+    results = []
+    for day, code, score in zip(selected["day"].tolist(), selected["code"].tolist(), selected["score"].tolist()):
+        results.append({
+            "date": epoch + datetime.timedelta(days=day),
+            "pillar": HEAVENLY_STEMS[code // 12] + EARTHLY_BRANCHES[code % 12],
+            "score": score,
+        })
+    if (hours or hour_rule is not None) and results:
+        natal = {pillar: np.repeat(codes[pillar], len(results)) for pillar in PILLARS}
+        ranked = rank_hours(natal, selected["code"], hour_rule)
+        for result, slots, scores, code in zip(results, ranked["slot"].tolist(), ranked["score"].tolist(),
+                                               selected["code"].tolist()):
+            result["hours"] = []
+            for slot, score in zip(slots, scores):
+                if slot < 0:
+                    break
+                first, last = hour_slot_minutes(slot)
+                result["hours"].append({
+                    "pillar": HEAVENLY_STEMS[(code // 12 + slot) % 10] + EARTHLY_BRANCHES[slot % 12],
+                    "start": f"{first // 60:02d}:{first % 60:02d}",
+                    "end": f"{last // 60:02d}:{last % 60:02d}",
+                    "score": score,
+                })
+    return results
@@ -0,0 +1,202 @@
+# flow_pillars.py
+import bisect
+
+from bazi_core import HEAVENLY_STEMS, EARTHLY_BRANCHES, US_PER_MINUTE, pillar_indices
+from solar_terms import epoch_minutes_to_datetime, get_month_boundary_index
+
+# Flow pillars (流年 / 流月) are the year and month pillars of the calendar
+# itself, period by period. Every period starts at a row of the month boundary
+# index where the BaZi year (or year and month) changes, so the whole
+# 1900-2100 timeline is one small table shared by every customer: a lifetime
+# forecast is a slice of it, and N customers x T periods is an index matrix.
+# Instants outside the table raise on the scalar path and are masked (with -1
+# indices) on the batch path.
+FLOW_KINDS = ("year", "month")
+# Natal pillar order for the relation bitmasks (bit i = NATAL_PILLARS[i])
+NATAL_PILLARS = ("year", "month", "day", "hour")
+CLASH_DISTANCE = 6  # branches opposite each other on the twelve-branch circle (六冲)
+
+_FLOW_TABLES = {}
+_FLOW_ARRAYS = {}
+
+def flow_table(kind="year"):
+    """
+    Every flow period covered by the month boundary index.
+
+    Args:
+        kind (str): "year" or "month"
+
+    Returns:
+        dict: Lists `starts` (epoch minutes, solar time; one more entry than
+            there are periods, closing the last one), `bazi_year`,
+            `bazi_month` (None for years), `stem` and `branch`. Periods
+            after the last tabulated term start on 1 January, like the
+            charts' civil-year fallback
+    """
+    if kind not in FLOW_KINDS:
+        raise ValueError(f"Unknown flow kind: {kind!r} (expected one of {', '.join(FLOW_KINDS)})")
+    if kind not in _FLOW_TABLES:
+        index = get_month_boundary_index()
+        key_length = 1 if kind == "year" else 2
+        table = {"starts": [], "bazi_year": [], "bazi_month": [], "stem": [], "branch": []}
+        # The first row starts where the table does, not at a boundary, so it is skipped
+        for i in range(1, len(index.starts) - 1):
+            previous, current = index.results[i - 1], index.results[i]
+            if previous[:key_length] == current[:key_length]:
+                continue
+            bazi_year, bazi_month = current[:2]
+            indices = pillar_indices(bazi_year, bazi_month, 0, 0)
+            table["starts"].append(index.starts[i])
+            table["bazi_year"].append(bazi_year)
+            table["bazi_month"].append(bazi_month if kind == "month" else None)
+            table["stem"].append(indices[0] if kind == "year" else indices[2])
+            table["branch"].append(indices[1] if kind == "year" else indices[3])
+        table["starts"].append(index.starts[-1])
+        _FLOW_TABLES[kind] = table
+    return _FLOW_TABLES[kind]
+
+def _relations(stem, branch, natal):
+    """Natal pillars repeated by (伏吟) and clashed by (冲) a flow pillar"""
+    repeats, clashes = [], []
+    for i, pillar in enumerate(NATAL_PILLARS):
+        natal_stem, natal_branch = natal[2 * i], natal[2 * i + 1]
+        if (natal_stem, natal_branch) == (stem, branch):
+            repeats.append(pillar)
+        if (branch - natal_branch) % 12 == CLASH_DISTANCE:
+            clashes.append(pillar)
+    return repeats, clashes
+
+def iter_flow_pillars(solar_us, periods=80, kind="year", natal=None):
+    """
+    Lazily yield flow pillars from the period containing an instant.
+
+    Example: iter_flow_pillars(birth_us, 80) for a lifetime of flow years,
+    iter_flow_pillars(birth_us, 960, "month") for its flow months.
+
+    Args:
+        solar_us (int): Solar time in microseconds since 1970-01-01 (usually the birth)
+        periods (int): Number of periods to yield (fewer at the end of the table)
+        kind (str): "year" or "month"
+        natal (tuple, optional): Natal stem/branch indices as returned by
+            bazi_core.four_pillar_indices_from_solar_us, to cross-reference
+
+    Yields:
+        dict: `pillar`, `stem`, `branch`, `bazi_year`, `bazi_month`, `start`
+            and `end` (solar datetimes at the solar terms), plus `repeats`
+            and `clashes` (natal pillar names) when natal is given
+
+    Raises:
+        ValueError: solar_us is before the first flow period or after the
+            end of the table (raised when iteration starts)
+    """
+    table = flow_table(kind)
+    starts = table["starts"]
+    first = bisect.bisect_right(starts, solar_us // US_PER_MINUTE) - 1
+    if first < 0 or first >= len(starts) - 1:
+        raise ValueError(f"Solar time is outside the flow {kind} table "
+                         f"({epoch_minutes_to_datetime(starts[0])} to {epoch_minutes_to_datetime(starts[-1])})")
+    for i in range(first, min(first + periods, len(starts) - 1)):
+        stem, branch = table["stem"][i], table["branch"][i]
+        period = {
+            "pillar": HEAVENLY_STEMS[stem] + EARTHLY_BRANCHES[branch],
+            "stem": stem,
+            "branch": branch,
+            "bazi_year": table["bazi_year"][i],
+            "bazi_month": table["bazi_month"][i],
+            "start": epoch_minutes_to_datetime(starts[i]),
+            "end": epoch_minutes_to_datetime(starts[i + 1]),
+        }
+        if natal is not None:
+            period["repeats"], period["clashes"] = _relations(stem, branch, natal)
+        yield period
+
+# ----------------------
+# Vectorized timeline
+# ----------------------
+def flow_arrays(kind="year"):
+    """
+    NumPy copies of flow_table, built on first use.
+
+    Returns:
+        dict: int64 `starts` (with the closing entry), int16 `bazi_year`,
+            uint8 `bazi_month` (0 for years), `stem`, `branch` and pillar `code`
+    """
+    import numpy as np
+
+    if kind not in _FLOW_ARRAYS:
+        table = flow_table(kind)
+        stem = np.array(table["stem"], dtype=np.uint8)
+        branch = np.array(table["branch"], dtype=np.uint8)
+        _FLOW_ARRAYS[kind] = {
+            "starts": np.array(table["starts"], dtype=np.int64),
+            "bazi_year": np.array(table["bazi_year"], dtype=np.int16),
+            "bazi_month": np.array([m or 0 for m in table["bazi_month"]], dtype=np.uint8),
+            "stem": stem,
+            "branch": branch,
+            "code": (stem * 12 + branch).astype(np.uint8),
+        }
+    return _FLOW_ARRAYS[kind]
+
+def flow_index_matrix(solar_us, periods=80, kind="year"):
+    """
+    Flow period indices for many customers at once.
+
+    Row n holds the flow_arrays(kind) indices of the `periods` periods from
+    the one containing solar_us[n]; gather any column with it, e.g.
+    flow_arrays("year")["code"][matrix]. Entries past the end of the table
+    are -1, and so is every entry of a row whose instant is outside the
+    table (before the first flow period or after the last), which `valid`
+    marks False.
+
+    Args:
+        solar_us (array-like of int): Solar times in microseconds since 1970-01-01
+        periods (int): Periods per customer (T)
+        kind (str): "year" or "month"
+
+    Returns:
+        tuple: (matrix, valid) int32 matrix of shape (N, T) and bool mask of length N
+    """
+    import numpy as np
+
+    starts = flow_arrays(kind)["starts"]
+    n_periods = len(starts) - 1
+    minutes = np.atleast_1d(np.asarray(solar_us, dtype=np.int64)) // US_PER_MINUTE
+    first = np.searchsorted(starts, minutes, side="right") - 1
+    valid = (first >= 0) & (first < n_periods)
+    matrix = first.astype(np.int32)[:, None] + np.arange(periods, dtype=np.int32)
+    matrix[~valid[:, None] | (matrix >= n_periods)] = -1
+    return matrix, valid
+
+def flow_relations(matrix, natal, kind="year"):
+    """
+    Cross-reference a flow index matrix against natal charts.
+
+    Args:
+        matrix (ndarray): Matrix returned by flow_index_matrix, shape (N, T)
+        natal (dict): `year`, `month`, `day`, `hour` pillar code arrays of
+            length N (chart_table.ChartTable columns or
+            pillar_timeline.PillarTimeline.lookup_array output)
+        kind (str): Kind the matrix was built for
+
+    Returns:
+        dict: `repeats` and `clashes` uint8 (N, T) bitmasks, bit i set when
+            the flow pillar repeats / clashes natal pillar NATAL_PILLARS[i];
+            0 where the matrix is -1
+    """
+    import numpy as np
+
+    arrays = flow_arrays(kind)
+    valid = matrix >= 0
+    safe = np.where(valid, matrix, 0)
+    flow_code = arrays["code"][safe]
+    flow_branch = arrays["branch"][safe]
+    repeats = np.zeros(matrix.shape, dtype=np.uint8)
+    clashes = np.zeros(matrix.shape, dtype=np.uint8)
+    for bit, pillar in enumerate(NATAL_PILLARS):
+        code = np.asarray(natal[pillar], dtype=np.uint8)[:, None]
+        opposite = (code % 12 + CLASH_DISTANCE) % 12
+        repeats |= (flow_code == code).view(np.uint8) << bit
+        clashes |= (flow_branch == opposite).view(np.uint8) << bit
+    repeats[~valid] = 0
+    clashes[~valid] = 0
+    return {"repeats": repeats, "clashes": clashes}
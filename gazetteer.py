@@ -0,0 +1,431 @@
+# gazetteer.py
+import array
+import bisect
+import csv
+import heapq
+import mmap
+import os
+import struct
+import sys
+import unicodedata
+
+# Offline place lookup: place name -> longitude and IANA time zone.
+#
+# gazetteer.bin is built by `python gazetteer.py` from
+#   - gazetteer_places.csv (curated cities, with Chinese and historical names)
+#   - the zone.tab shipped with pytz (principal city of every IANA zone)
+#   - optionally GeoNames dumps: `python gazetteer.py --geonames cities15000.txt`
+# and read through mmap with no other dependencies. Normalized names are
+# stored sorted for prefix search, with a min segment tree over their place
+# ranks so a prefix's most populous places come out without scanning the
+# whole prefix range, and a trigram index for misspellings.
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer.bin")
+PLACES_CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer_places.csv")
+GAZETTEER_MAGIC = b"BZGZ"
+GAZETTEER_VERSION = 2
+GAZETTEER_HEADER = struct.Struct("<4sii")  # magic, version, n_sections
+SECTION_ENTRY = struct.Struct("<8sIIc3x")  # name, offset, item count, array typecode
+NO_PLACE = 0xFFFFFFFF  # padding leaf of the prefix rank tree
+MIN_FUZZY_LENGTH = 4
+
+def normalize_name(name):
+    """
+    Search key for a place name: accents stripped, case folded, punctuation
+    collapsed to single spaces. CJK characters are kept as they are.
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    chars = [c if c.isalnum() else " " for c in decomposed if not unicodedata.combining(c)]
+    return " ".join("".join(chars).casefold().split())
+
+def name_trigrams(key):
+    """Character trigrams of a normalized key, padded so short and CJK names get some"""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+# ----------------------
+# Building
+# ----------------------
+def _parse_zone_tab_coordinate(text, degree_digits):
+    sign = -1 if text[0] == "-" else 1
+    digits = text[1:]
+    degrees = int(digits[:degree_digits])
+    minutes = int(digits[degree_digits:degree_digits + 2])
+    seconds = int(digits[degree_digits + 2:] or 0)
+    return sign * (degrees + minutes / 60 + seconds / 3600)
+
+def read_zone_tab():
+    """
+    Principal cities of the IANA zones from pytz's zone.tab.
+
+    Returns:
+        list: Place dicts (population unknown, so 0)
+    """
+    import pytz
+    path = os.path.join(os.path.dirname(pytz.__file__), "zoneinfo", "zone.tab")
+    places = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            country, coordinates, zone = line.rstrip("\n").split("\t")[:3]
+            split = max(coordinates.rfind("+"), coordinates.rfind("-"))
+            latitude = _parse_zone_tab_coordinate(coordinates[:split], 2)
+            longitude = _parse_zone_tab_coordinate(coordinates[split:], 3)
+            places.append({
+                "name": zone.rsplit("/", 1)[-1].replace("_", " "),
+                "alternate_names": [],
+                "country": country,
+                "latitude": latitude,
+                "longitude": longitude,
+                "timezone": zone,
+                "population": 0,
+            })
+    return places
+
+def read_places_csv(path=PLACES_CSV_PATH):
+    """Read the curated places CSV (alternate names separated by |)"""
+    places = []
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            places.append({
+                "name": row["name"],
+                "alternate_names": [n for n in row["alternate_names"].split("|") if n],
+                "country": row["country"],
+                "latitude": float(row["latitude"]),
+                "longitude": float(row["longitude"]),
+                "timezone": row["timezone"],
+                "population": int(row["population"] or 0),
+            })
+    return places
+
+def _has_cjk(text):
+    return any("㐀" <= c <= "鿿" for c in text)
+
+def read_geonames(path, min_population=0):
+    """
+    Read a GeoNames cities dump (cities500/1000/5000/15000.txt format).
+
+    Only alternate names in CJK scripts are kept, which keeps the file small
+    while still matching names typed in Chinese.
+    """
+    places = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 18 or not fields[17]:
+                continue
+            population = int(fields[14] or 0)
+            if population < min_population:
+                continue
+            alternate_names = [fields[2]] + [n for n in fields[3].split(",") if _has_cjk(n)]
+            places.append({
+                "name": fields[1],
+                "alternate_names": [n for n in alternate_names if n and n != fields[1]],
+                "country": fields[8],
+                "latitude": float(fields[4]),
+                "longitude": float(fields[5]),
+                "timezone": fields[17],
+                "population": population,
+            })
+    return places
+
+def merge_places(*sources):
+    """
+    Merge place lists; a later place sharing a name (or alternate name) and
+    country with an earlier one updates it, keeping the larger population and
+    every name.
+    """
+    merged = []
+    by_name = {}
+    for places in sources:
+        for place in places:
+            all_names = [place["name"]] + place["alternate_names"]
+            keys = [(normalize_name(name), place["country"]) for name in all_names]
+            existing = next((by_name[key] for key in keys if key in by_name), None)
+            if existing is None:
+                existing = dict(place, alternate_names=[])
+                merged.append(existing)
+            else:
+                population = max(existing["population"], place["population"])
+                old_names = [existing["name"]] + existing["alternate_names"]
+                existing.update(place, population=population,
+                                alternate_names=[n for n in existing["alternate_names"] + old_names
+                                                 if n != place["name"]])
+            existing["alternate_names"] = list(dict.fromkeys(
+                existing["alternate_names"] + [n for n in place["alternate_names"] if n != existing["name"]]))
+            for key in keys:
+                by_name[key] = existing
+    return merged
+
+def _string_section(strings):
+    blob = "".join(strings).encode("utf-8")
+    offsets = array.array("I", [0])
+    for s in strings:
+        offsets.append(offsets[-1] + len(s.encode("utf-8")))
+    return offsets, blob
+
+def _rank_tree(ids):
+    """
+    Min segment tree over key place indices: leaf `size + i` holds ids[i]
+    (padded with NO_PLACE to a power of two) and node j the smaller of 2j and 2j+1.
+    """
+    size = 1
+    while size < len(ids):
+        size *= 2
+    tree = array.array("I", [NO_PLACE] * size) + array.array("I", ids) + array.array("I", [NO_PLACE] * (size - len(ids)))
+    for node in range(size - 1, 0, -1):
+        tree[node] = min(tree[2 * node], tree[2 * node + 1])
+    return tree
+
+def write_gazetteer(places, path=GAZETTEER_PATH):
+    """
+    Write the gazetteer file.
+
+    Layout: GAZETTEER_HEADER, a table of SECTION_ENTRY records, then each
+    section as a little-endian array (typecode "B" sections are UTF-8 blobs
+    indexed by the matching "*_off" uint32 offset arrays).
+
+    Args:
+        places (list): Place dicts as returned by read_places_csv / read_zone_tab
+        path (str): Output path
+
+    Returns:
+        int: Number of places written
+    """
+    places = sorted(places, key=lambda p: (-p["population"], p["name"]))
+    zones = sorted({p["timezone"] for p in places})
+    zone_index = {zone: i for i, zone in enumerate(zones)}
+
+    keys = {}
+    for i, place in enumerate(places):
+        for name in [place["name"]] + place["alternate_names"]:
+            key = normalize_name(name)
+            if key:
+                keys.setdefault(key, set()).add(i)
+    key_list = sorted((key, i) for key, ids in keys.items() for i in ids)
+
+    postings = {}
+    for key, ids in keys.items():
+        for trigram in name_trigrams(key):
+            postings.setdefault(trigram, set()).update(ids)
+    trigrams = sorted(postings)
+    posting_offsets = array.array("I", [0])
+    posting_ids = array.array("I")
+    for trigram in trigrams:
+        posting_ids.extend(sorted(postings[trigram]))
+        posting_offsets.append(len(posting_ids))
+
+    name_off, names = _string_section([p["name"] for p in places])
+    zone_off, zone_blob = _string_section(zones)
+    key_off, key_blob = _string_section([key for key, _ in key_list])
+    trigram_off, trigram_blob = _string_section(trigrams)
+    sections = [
+        ("lat", array.array("f", [p["latitude"] for p in places])),
+        ("lon", array.array("d", [p["longitude"] for p in places])),
+        ("pop", array.array("I", [p["population"] for p in places])),
+        ("zone", array.array("H", [zone_index[p["timezone"]] for p in places])),
+        ("country", array.array("B", "".join(p["country"] or "  " for p in places).encode("ascii"))),
+        ("name_off", name_off), ("names", array.array("B", names)),
+        ("zone_off", zone_off), ("zones", array.array("B", zone_blob)),
+        ("key_off", key_off), ("keys", array.array("B", key_blob)),
+        ("key_ids", array.array("I", [i for _, i in key_list])),
+        ("key_rank", _rank_tree([i for _, i in key_list])),
+        ("tri_off", trigram_off), ("tris", array.array("B", trigram_blob)),
+        ("post_off", posting_offsets), ("posts", posting_ids),
+    ]
+
+    offset = GAZETTEER_HEADER.size + SECTION_ENTRY.size * len(sections)
+    table, payload = [], []
+    for name, values in sections:
+        offset += -offset % 8  # keep every array aligned
+        table.append(SECTION_ENTRY.pack(name.encode("ascii"), offset, len(values), values.typecode.encode("ascii")))
+        if sys.byteorder != "little":
+            values = array.array(values.typecode, values)
+            values.byteswap()
+        data = values.tobytes()
+        payload.append((offset, data))
+        offset += len(data)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(GAZETTEER_HEADER.pack(GAZETTEER_MAGIC, GAZETTEER_VERSION, len(sections)))
+        f.write(b"".join(table))
+        for section_offset, data in payload:
+            f.write(b"\0" * (section_offset - f.tell()))
+            f.write(data)
+    os.replace(tmp_path, path)
+    return len(places)
+
+# ----------------------
+# Lookup
+# ----------------------
+class _Strings:
+    """Sequence view of a UTF-8 blob and its offsets (decoded on access, bisectable)"""
+    __slots__ = ("offsets", "blob")
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+class Gazetteer:
+    """
+    Memory-mapped place index.
+
+    search() answers as-you-type queries: prefix matches on any known name
+    (ranked by population), topped up with trigram matches for typos.
+    """
+    __slots__ = ("path", "_mmap", "_sections", "names", "zones", "keys", "trigrams")
+
+    def __init__(self, path=GAZETTEER_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_sections = GAZETTEER_HEADER.unpack_from(self._mmap)
+        if magic != GAZETTEER_MAGIC or version != GAZETTEER_VERSION:
+            raise ValueError(f"{path} is not a version {GAZETTEER_VERSION} gazetteer")
+        view = memoryview(self._mmap)
+        self._sections = {}
+        for i in range(n_sections):
+            name, offset, count, typecode = SECTION_ENTRY.unpack_from(
+                self._mmap, GAZETTEER_HEADER.size + i * SECTION_ENTRY.size)
+            typecode = typecode.decode("ascii")
+            size = array.array(typecode).itemsize
+            values = view[offset:offset + count * size].cast(typecode)
+            if sys.byteorder != "little" and size > 1:
+                values = array.array(typecode, values)
+                values.byteswap()
+            self._sections[name.rstrip(b"\0").decode("ascii")] = values
+        sections = self._sections
+        self.names = _Strings(sections["name_off"], sections["names"])
+        self.zones = _Strings(sections["zone_off"], sections["zones"])
+        self.keys = _Strings(sections["key_off"], sections["keys"])
+        self.trigrams = _Strings(sections["tri_off"], sections["tris"])
+
+    def __len__(self):
+        return len(self._sections["pop"])
+
+    def place(self, i):
+        """
+        Place record by index.
+
+        Returns:
+            dict: name, country, latitude, longitude, timezone, population
+        """
+        sections = self._sections
+        return {
+            "name": self.names[i],
+            "country": str(sections["country"][2 * i:2 * i + 2], "ascii").strip(),
+            "latitude": round(sections["lat"][i], 4),
+            "longitude": sections["lon"][i],
+            "timezone": self.zones[sections["zone"][i]],
+            "population": sections["pop"][i],
+        }
+
+    def _prefix_ids(self, key, limit):
+        """
+        The `limit` best ranked places with a name starting with key, best first.
+
+        Keys sharing the prefix form one sorted range; the rank tree yields its
+        smallest place indices in order, touching O(limit * log n) nodes
+        however many names share the prefix.
+        """
+        first = bisect.bisect_left(self.keys, key)
+        end = bisect.bisect_left(self.keys, key + "\U0010ffff", first)
+        tree = self._sections["key_rank"]
+        size = len(tree) // 2
+        # Nodes exactly covering [first, end), then best-first expansion
+        heap = []
+        low, high = first + size, end + size
+        while low < high:
+            if low & 1:
+                heap.append((tree[low], low))
+                low += 1
+            if high & 1:
+                high -= 1
+                heap.append((tree[high], high))
+            low //= 2
+            high //= 2
+        heapq.heapify(heap)
+        ids = []
+        while heap and len(ids) < limit:
+            place, node = heapq.heappop(heap)
+            if node >= size:
+                if place not in ids:  # a place can have several names with the prefix
+                    ids.append(place)
+            else:
+                heapq.heappush(heap, (tree[2 * node], 2 * node))
+                heapq.heappush(heap, (tree[2 * node + 1], 2 * node + 1))
+        return ids
+
+    def _trigram_scores(self, key):
+        scores = {}
+        post_off, posts = self._sections["post_off"], self._sections["posts"]
+        for trigram in name_trigrams(key):
+            i = bisect.bisect_left(self.trigrams, trigram)
+            if i < len(self.trigrams) and self.trigrams[i] == trigram:
+                for j in range(post_off[i], post_off[i + 1]):
+                    scores[posts[j]] = scores.get(posts[j], 0) + 1
+        return scores
+
+    def search(self, query, limit=10):
+        """
+        Places matching a (partial) name.
+
+        Args:
+            query (str): Text typed so far, in any script
+            limit (int): Maximum number of results
+
+        Returns:
+            list: Place dicts (see place()), best match first
+        """
+        key = normalize_name(query)
+        if not key:
+            return []
+        # Places are stored by descending population, so the index is the rank
+        ranked = self._prefix_ids(key, limit)
+        # Trigram matches only for queries long enough to carry a typo
+        if len(ranked) < limit and len(key) >= MIN_FUZZY_LENGTH:
+            needed = max(2, -(-len(name_trigrams(key)) // 2))
+            scores = self._trigram_scores(key)
+            fuzzy = sorted((-score, i) for i, score in scores.items() if score >= needed and i not in ranked)
+            ranked += [i for _, i in fuzzy[:limit - len(ranked)]]
+        return [self.place(i) for i in ranked]
+
+_GAZETTEER = None
+
+def get_gazetteer():
+    """Return the shared gazetteer, opening gazetteer.bin on first use"""
+    global _GAZETTEER
+    if _GAZETTEER is None:
+        _GAZETTEER = Gazetteer()
+    return _GAZETTEER
+
+def search_places(query, limit=10):
+    """Places matching a (partial) name; see Gazetteer.search"""
+    return get_gazetteer().search(query, limit)
+
+def place_label(place):
+    """Display label such as "Beijing, China (Asia/Shanghai)" """
+    import pytz
+    country = pytz.country_names.get(place["country"], place["country"])
+    return f"{place['name']}, {country} ({place['timezone']})"
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Build the offline place gazetteer.")
+    parser.add_argument("--output", default=GAZETTEER_PATH)
+    parser.add_argument("--geonames", action="append", default=[],
+                        help="GeoNames cities dump to include (e.g. cities15000.txt); repeatable")
+    parser.add_argument("--min-population", type=int, default=0)
+    args = parser.parse_args()
+    sources = [read_zone_tab()]
+    sources += [read_geonames(path, args.min_population) for path in args.geonames]
+    sources.append(read_places_csv())
+    count = write_gazetteer(merge_places(*sources), args.output)
+    print(f"Wrote {count} places ({os.path.getsize(args.output)} bytes) to {args.output}")
@@ -0,0 +1,152 @@
+# luck_pillars.py
+import datetime
+
+from bazi_core import (
+    HEAVENLY_STEMS, EARTHLY_BRANCHES, US_PER_DAY, US_PER_MINUTE,
+    civil_to_apparent_solar_us, pillar_indices,
+)
+from solar_terms import get_month_boundary_index, month_term_neighbours
+
+# Luck Pillars (大运) are ten-year periods stepping away from the month pillar:
+#   direction - forward for a yang year stem and a male chart or a yin year stem
+#               and a female chart, backward otherwise
+#   pillars   - the month stem and branch each advanced (or moved back) by 1, 2, ...
+#   start age - the time from birth to the next (forward) or previous (backward)
+#               month-starting term, at three days per year of age
+# Ages are in years of 365.2425 days, so an age maps to an exact solar instant.
+LUCK_PILLAR_YEARS = 10
+DEFAULT_LUCK_PILLAR_COUNT = 8
+MINUTES_PER_START_YEAR = 3 * 1440
+# Solar microseconds per microsecond from birth to the term (365.2425 / 3)
+_START_SCALE_NUM, _START_SCALE_DEN = 1_217_475, 10_000
+US_PER_LUCK_PILLAR = LUCK_PILLAR_YEARS * 3_652_425 * US_PER_DAY // 10_000
+SOLAR_EPOCH = datetime.datetime(1970, 1, 1)
+
+def is_forward(year_stem, male):
+    """Luck pillars run forward for yang-year males and yin-year females"""
+    return (year_stem % 2 == 0) == bool(male)
+
+def luck_pillar_sequence(month_stem, month_branch, forward, count=DEFAULT_LUCK_PILLAR_COUNT):
+    """
+    Stem/branch indices of the luck pillars following a month pillar.
+
+    Returns:
+        list: (stem_index, branch_index) for each luck pillar
+    """
+    step = 1 if forward else -1
+    return [((month_stem + step * k) % 10, (month_branch + step * k) % 12) for k in range(1, count + 1)]
+
+def luck_pillars(solar_us, male, count=DEFAULT_LUCK_PILLAR_COUNT):
+    """
+    Luck pillars for a birth given in apparent solar time.
+
+    Args:
+        solar_us (int): Solar birth time in microseconds since 1970-01-01
+        male (bool): Chart gender
+        count (int): Number of luck pillars (8-10 is usual)
+
+    Returns:
+        dict: `forward`, `start_age` (years), `start` (solar datetime of the
+            first luck pillar), `term` (the month-starting term measured to,
+            as a datetime) and `pillars`, a list of dicts with `pillar`,
+            `stem`, `branch`, `start_age` and `start`
+
+    Raises:
+        ValueError: The birth is not between two month-starting terms of the
+            solar term table (e.g. January 1900)
+    """
+    minute = solar_us // US_PER_MINUTE
+    bazi_year, bazi_month = get_month_boundary_index().lookup(minute)[:2]
+    year_stem, _, month_stem, month_branch = pillar_indices(bazi_year, bazi_month, 0, 0)[:4]
+    forward = is_forward(year_stem, male)
+
+    previous, following = month_term_neighbours(minute)
+    # Both neighbours are required in either direction: before the first term
+    # the "next" term is just the table start, not the end of the birth month
+    if previous is None or following is None:
+        raise ValueError("Birth time is outside the solar term table: luck pillars need the month-starting "
+                         "terms before and after the birth")
+    term = following if forward else previous
+    distance_us = abs(term * US_PER_MINUTE - solar_us)
+    start_us = solar_us + distance_us * _START_SCALE_NUM // _START_SCALE_DEN
+    start_age = distance_us / (MINUTES_PER_START_YEAR * US_PER_MINUTE)
+
+    pillars = []
+    for k, (stem, branch) in enumerate(luck_pillar_sequence(month_stem, month_branch, forward, count)):
+        pillars.append({
+            "pillar": HEAVENLY_STEMS[stem] + EARTHLY_BRANCHES[branch],
+            "stem": stem,
+            "branch": branch,
+            "start_age": start_age + LUCK_PILLAR_YEARS * k,
+            "start": SOLAR_EPOCH + datetime.timedelta(microseconds=start_us + US_PER_LUCK_PILLAR * k),
+        })
+    return {
+        "forward": forward,
+        "start_age": start_age,
+        "start": SOLAR_EPOCH + datetime.timedelta(microseconds=start_us),
+        "term": SOLAR_EPOCH + datetime.timedelta(minutes=term),
+        "pillars": pillars,
+    }
+
+def civil_luck_pillars(year, month, day, hour, minute, longitude, timezone_offset, male,
+                       count=DEFAULT_LUCK_PILLAR_COUNT, eot_model="noaa"):
+    """
+    luck_pillars for a civil birth time.
+
+    Args:
+        year, month, day, hour, minute (int): Civil time components
+        longitude (float): Longitude in decimal degrees
+        timezone_offset (float or str): Timezone offset from GMT in hours, or an IANA zone name
+        male (bool): Chart gender
+        count (int): Number of luck pillars
+        eot_model (str): Equation of time model, one of bazi_core.EOT_MODELS
+
+    Returns:
+        dict: See luck_pillars
+    """
+    solar_us, _, _ = civil_to_apparent_solar_us(year, month, day, hour, minute, longitude, timezone_offset,
+                                                eot_model)
+    return luck_pillars(solar_us, male, count)
+
+def luck_pillars_batch(solar_us, male, count=DEFAULT_LUCK_PILLAR_COUNT):
+    """
+    Vectorized luck_pillars.
+
+    Args:
+        solar_us (array-like of int): Solar birth times in microseconds since 1970-01-01
+        male (array-like of bool): Chart genders
+        count (int): Number of luck pillars
+
+    Returns:
+        dict: `forward` (bool), `start_age` (float64 years, NaN where
+            luck_pillars would raise), `start_us` (int64 solar microseconds of
+            the first luck pillar, NO_TERM where start_age is NaN; add
+            k * US_PER_LUCK_PILLAR for the k-th), and `stem` / `branch` uint8
+            matrices of shape (N, count)
+    """
+    import numpy as np
+    from bazi_batch import find_bazi_year_month_batch
+    from solar_terms import NO_TERM, month_term_neighbours_array
+
+    solar_us = np.atleast_1d(np.asarray(solar_us, dtype=np.int64))
+    male = np.broadcast_to(np.asarray(male, dtype=bool), solar_us.shape)
+    bazi_year, bazi_month, _, _ = find_bazi_year_month_batch(solar_us)
+    year_stem = (bazi_year - 3) % 60 % 10
+    month_stem = (year_stem + 2 + (bazi_month - 1)) % 10
+    month_branch = (bazi_month - 1) % 12
+    forward = (year_stem % 2 == 0) == male
+
+    previous, following = month_term_neighbours_array(solar_us // US_PER_MINUTE)
+    term = np.where(forward, following, previous)
+    missing = (previous == NO_TERM) | (following == NO_TERM)
+    distance_us = np.where(missing, 0, np.abs(term * US_PER_MINUTE - solar_us))
+    start_age = np.where(missing, np.nan, distance_us / (MINUTES_PER_START_YEAR * US_PER_MINUTE))
+
+    steps = np.where(forward, 1, -1)[:, None] * np.arange(1, count + 1)
+    return {
+        "forward": forward,
+        "start_age": start_age,
+        "start_us": np.where(missing, NO_TERM, solar_us + distance_us * _START_SCALE_NUM // _START_SCALE_DEN),
+        "stem": ((month_stem[:, None] + steps) % 10).astype(np.uint8),
+        "branch": ((month_branch[:, None] + steps) % 12).astype(np.uint8),
+    }
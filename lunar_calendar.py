@@ -0,0 +1,300 @@
+# lunar_calendar.py
+import array
+import bisect
+import datetime
+import mmap
+import os
+import struct
+import sys
+
+# Chinese lunar calendar (农历) for lunar years 1900-2100, generated by
+# solar_ephemeris.py from a new-moon model and the solar term table (run
+# `python solar_ephemeris.py --lunar` to regenerate). Each lunar year is
+# one int32 new year day and one bit-packed uint32:
+#     bits 0-12   month i (calendar order, leap month included) has 30 days, else 29
+#     bits 13-16  leap month number, 0 when the year has none
+# so lunar -> Gregorian is an index plus a popcount and Gregorian -> lunar a
+# bisect over the new year days.
+#
+# File layout (little-endian):
+#     LUNAR_TABLE_HEADER (magic, first_year, n_years)
+#     int32 new_year_days[n_years]   days since 1970-01-01
+#     uint32 year_info[n_years]
+LUNAR_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lunar_calendar_table.bin")
+LUNAR_TABLE_MAGIC = b"BZLC"
+LUNAR_TABLE_HEADER = struct.Struct("<4sii")  # magic, first_year, n_years
+LEAP_MONTH_SHIFT = 13
+MAX_LUNAR_MONTHS = 13
+EPOCH = datetime.date(1970, 1, 1)
+
+LUNAR_MONTH_NAMES = ["正月", "二月", "三月", "四月", "五月", "六月", "七月", "八月", "九月", "十月", "冬月", "腊月"]
+
+class LunarCalendarTable:
+    """Lazily memory-mapped lunar year table"""
+    __slots__ = ("path", "first_year", "n_years", "_new_year", "_info", "_mmap", "_arrays")
+
+    def __init__(self, path=LUNAR_TABLE_PATH):
+        self.path = path
+        self._new_year = None
+        self._info = None
+        self._mmap = None
+        self._arrays = None
+
+    def _load(self):
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.first_year, self.n_years = LUNAR_TABLE_HEADER.unpack_from(self._mmap)
+        if magic != LUNAR_TABLE_MAGIC:
+            raise ValueError(f"{self.path} is not a lunar calendar table")
+        start = LUNAR_TABLE_HEADER.size
+        new_year = memoryview(self._mmap)[start:start + 4 * self.n_years].cast("i")
+        info = memoryview(self._mmap)[start + 4 * self.n_years:start + 8 * self.n_years].cast("I")
+        if sys.byteorder != "little":
+            new_year, info = array.array("i", new_year), array.array("I", info)
+            new_year.byteswap()
+            info.byteswap()
+        self._new_year, self._info = new_year, info
+
+    def _year_row(self, year):
+        if self._info is None:
+            self._load()
+        row = year - self.first_year
+        if not 0 <= row < self.n_years:
+            raise ValueError(f"Lunar year {year} is outside the table "
+                             f"({self.first_year}-{self.first_year + self.n_years - 1})")
+        return row
+
+    def leap_month(self, year):
+        """Leap month of a lunar year (0 when there is none)"""
+        row = self._year_row(year)  # loads the table on first use
+        return self._info[row] >> LEAP_MONTH_SHIFT
+
+    def month_lengths(self, year):
+        """
+        Month lengths of a lunar year.
+
+        Returns:
+            list: (month, leap, days) in calendar order
+        """
+        row = self._year_row(year)  # loads the table on first use
+        info = self._info[row]
+        leap_month = info >> LEAP_MONTH_SHIFT
+        months = [(m, False) for m in range(1, 13)]
+        if leap_month:
+            months.insert(leap_month, (leap_month, True))
+        return [(m, leap, 29 + (info >> i & 1)) for i, (m, leap) in enumerate(months)]
+
+    def to_days(self, year, month, day, leap=False):
+        """
+        Lunar date to days since 1970-01-01.
+
+        Raises:
+            ValueError: No such lunar date in the table
+        """
+        row = self._year_row(year)
+        info = self._info[row]
+        leap_month = info >> LEAP_MONTH_SHIFT
+        if not 1 <= month <= 12 or (leap and month != leap_month):
+            raise ValueError(f"Lunar year {year} has no {'leap ' if leap else ''}month {month}")
+        index = month - 1 + (leap_month != 0 and (month > leap_month or leap))
+        length = 29 + (info >> index & 1)
+        if not 1 <= day <= length:
+            raise ValueError(f"Lunar month {month} of {year} has {length} days, not {day}")
+        before = info & ((1 << index) - 1)
+        return self._new_year[row] + 29 * index + bin(before).count("1") + day - 1
+
+    def from_days(self, days):
+        """
+        Days since 1970-01-01 to a lunar date.
+
+        Returns:
+            tuple: (year, month, day, leap)
+
+        Raises:
+            ValueError: The date is outside the table
+        """
+        if self._new_year is None:
+            self._load()
+        row = bisect.bisect_right(self._new_year, days) - 1
+        if row == self.n_years - 1:
+            last_year = self.first_year + row
+            row += days >= self._new_year[row] + sum(length for _, _, length in self.month_lengths(last_year))
+        if not 0 <= row < self.n_years:
+            raise ValueError(f"Day {days} is outside the lunar calendar table")
+        info = self._info[row]
+        offset = days - self._new_year[row]
+        index = 0
+        while offset >= 29 + (info >> index & 1):
+            offset -= 29 + (info >> index & 1)
+            index += 1
+        leap_month = info >> LEAP_MONTH_SHIFT
+        leap = leap_month != 0 and index == leap_month
+        month = index + 1 - (leap_month != 0 and index >= leap_month)
+        return self.first_year + row, month, offset + 1, leap
+
+    def arrays(self):
+        """
+        NumPy views for the vectorized conversions, built on first use.
+
+        Returns:
+            dict: int64 `new_year` (with the end of the last year appended),
+                int64 `month_starts` (n_years, 14) day offsets of each month
+                from new year, padded with the year length, and int64 `leap_month`
+        """
+        import numpy as np
+
+        if self._arrays is None:
+            if self._info is None:
+                self._load()
+            info = np.array(self._info, dtype=np.int64)
+            lengths = 29 + (info[:, None] >> np.arange(MAX_LUNAR_MONTHS) & 1)
+            leap_month = info >> LEAP_MONTH_SHIFT
+            lengths[:, 12] *= leap_month != 0
+            month_starts = np.zeros((self.n_years, MAX_LUNAR_MONTHS + 1), dtype=np.int64)
+            np.cumsum(lengths, axis=1, out=month_starts[:, 1:])
+            new_year = np.array(self._new_year, dtype=np.int64)
+            self._arrays = {
+                "new_year": np.append(new_year, new_year[-1] + month_starts[-1, -1]),
+                "month_starts": month_starts,
+                "leap_month": leap_month,
+            }
+        return self._arrays
+
+_LUNAR_TABLE = None
+
+def get_lunar_calendar_table():
+    """Return the shared lunar calendar table (mapped on first use)"""
+    global _LUNAR_TABLE
+    if _LUNAR_TABLE is None:
+        _LUNAR_TABLE = LunarCalendarTable()
+    return _LUNAR_TABLE
+
+# ----------------------
+# Conversions
+# ----------------------
+def lunar_to_solar(year, month, day, leap=False):
+    """
+    Convert a lunar date to a Gregorian date.
+
+    Args:
+        year (int): Lunar year (the Gregorian year its new year falls in)
+        month (int): Lunar month (1-12)
+        day (int): Day of the month (1-30)
+        leap (bool): The date is in the leap month after `month`
+
+    Returns:
+        datetime.date: Gregorian date
+
+    Raises:
+        ValueError: No such lunar date in 1900-2100
+    """
+    return EPOCH + datetime.timedelta(days=get_lunar_calendar_table().to_days(year, month, day, leap))
+
+def solar_to_lunar(date):
+    """
+    Convert a Gregorian date to a lunar date.
+
+    Args:
+        date (datetime.date): Gregorian date
+
+    Returns:
+        tuple: (year, month, day, leap)
+
+    Raises:
+        ValueError: The date is outside the table
+    """
+    return get_lunar_calendar_table().from_days((date - EPOCH).days)
+
+def format_lunar_date(year, month, day, leap=False):
+    """Chinese label of a lunar date, e.g. 2023年闰二月十五"""
+    digits = "一二三四五六七八九十"
+    if day == 10:
+        day_label = "初十"
+    elif day < 10:
+        day_label = "初" + digits[day - 1]
+    elif day < 20:
+        day_label = "十" + digits[day - 11]
+    elif day == 20:
+        day_label = "二十"
+    elif day < 30:
+        day_label = "廿" + digits[day - 21]
+    else:
+        day_label = "三十"
+    return f"{year}年{'闰' if leap else ''}{LUNAR_MONTH_NAMES[month - 1]}{day_label}"
+
+# ----------------------
+# Vectorized conversions
+# ----------------------
+def lunar_to_days_batch(year, month, day, leap=None):
+    """
+    Vectorized lunar date to days since 1970-01-01.
+
+    Args:
+        year, month, day (array-like of int): Lunar date components
+        leap (array-like of bool, optional): Leap month flags (default: none)
+
+    Returns:
+        tuple: (int64 days, bool valid); days are 0 where the date is invalid
+            or outside the table
+    """
+    import numpy as np
+
+    tables = get_lunar_calendar_table().arrays()
+    table = get_lunar_calendar_table()
+    year = np.asarray(year, dtype=np.int64)
+    month = np.asarray(month, dtype=np.int64)
+    day = np.asarray(day, dtype=np.int64)
+    leap = np.zeros(year.shape, dtype=bool) if leap is None else np.asarray(leap, dtype=bool)
+
+    row = year - table.first_year
+    valid = (row >= 0) & (row < table.n_years) & (month >= 1) & (month <= 12)
+    row = np.where(valid, row, 0)
+    leap_month = tables["leap_month"][row]
+    valid &= ~leap | (month == leap_month)
+    index = np.where(valid, month - 1 + ((leap_month != 0) & ((month > leap_month) | leap)), 0)
+    starts = tables["month_starts"][row, index]
+    valid &= (day >= 1) & (day <= tables["month_starts"][row, index + 1] - starts)
+    return np.where(valid, tables["new_year"][row] + starts + day - 1, 0), valid
+
+def days_to_lunar_batch(days):
+    """
+    Vectorized days since 1970-01-01 to lunar dates.
+
+    Args:
+        days (array-like of int): Day numbers
+
+    Returns:
+        tuple: (year, month, day, leap, valid) arrays; zeros where not valid
+    """
+    import numpy as np
+
+    tables = get_lunar_calendar_table().arrays()
+    table = get_lunar_calendar_table()
+    days = np.asarray(days, dtype=np.int64)
+    row = np.searchsorted(tables["new_year"], days, side="right") - 1
+    valid = (row >= 0) & (row < table.n_years)
+    row = np.where(valid, row, 0)
+    offset = days - tables["new_year"][row]
+    starts = tables["month_starts"][row]
+    index = (starts[..., 1:] <= offset[..., None]).sum(axis=-1)
+    leap_month = tables["leap_month"][row]
+    has_leap = leap_month != 0
+    leap = has_leap & (index == leap_month)
+    month = index + 1 - (has_leap & (index >= leap_month))
+    day = offset - np.take_along_axis(starts, index[..., None], axis=-1)[..., 0] + 1
+    zero = np.zeros_like(days)
+    return (np.where(valid, table.first_year + row, zero), np.where(valid, month, zero),
+            np.where(valid, day, zero), leap & valid, valid)
+
+def lunar_to_civil_batch(year, month, day, leap=None):
+    """
+    Lunar dates to Gregorian year, month and day arrays for the batch pipeline.
+
+    Returns:
+        tuple: (year, month, day, valid) int64 arrays and bool mask
+    """
+    from bazi_batch import days_to_civil
+
+    days, valid = lunar_to_days_batch(year, month, day, leap)
+    civil_year, civil_month, civil_day = days_to_civil(days)
+    return civil_year, civil_month, civil_day, valid
@@ -0,0 +1,212 @@
+# pillar_boundaries.py
+import bisect
+
+from bazi_core import US_PER_MINUTE, FourPillars, civil_to_apparent_solar_us
+from pillar_search import civil_minute_to_solar_us, first_civil_minute_at_or_after
+from pillar_timeline import HOUR_BOUNDARY_MINUTES
+from solar_terms import datetime_to_epoch_minutes, epoch_minutes_to_datetime, get_month_boundary_index
+
+# Pillar boundaries in apparent solar time, all on whole minutes:
+#   hour  - 00:00 and every odd hour (the 子 hour is split at midnight)
+#   day   - solar midnight
+#   month - month-starting terms (from the month boundary index)
+#   year  - 立春 (Spring Begins)
+# Distances are in solar minutes; civil and solar clocks run at the same rate
+# except for the sub-minute equation of time step at civil midnight.
+BOUNDARY_KINDS = ("hour", "day", "month", "year")
+
+_TERM_BOUNDARIES = None
+
+def term_boundaries():
+    """
+    Epoch minutes at which the BaZi month and year change.
+
+    Returns:
+        dict: "month" and "year" -> sorted lists of epoch minutes, plus
+            "range" -> (first, end) minutes covered by the term table
+    """
+    global _TERM_BOUNDARIES
+    if _TERM_BOUNDARIES is None:
+        index = get_month_boundary_index()
+        month, year = [], []
+        # The last start only closes the index, so it is not a term boundary
+        for i in range(1, len(index.starts) - 1):
+            previous, current = index.results[i - 1], index.results[i]
+            if previous[:2] != current[:2]:
+                month.append(index.starts[i])
+            if previous[0] != current[0]:
+                year.append(index.starts[i])
+        _TERM_BOUNDARIES = {"month": month, "year": year, "range": (index.starts[0], index.starts[-1])}
+    return _TERM_BOUNDARIES
+
+def _hour_bounds(minute_of_day):
+    i = bisect.bisect_right(HOUR_BOUNDARY_MINUTES, minute_of_day)
+    previous = HOUR_BOUNDARY_MINUTES[i - 1]
+    following = HOUR_BOUNDARY_MINUTES[i] if i < len(HOUR_BOUNDARY_MINUTES) else 1440
+    return previous, following
+
+def boundary_distances(solar_us):
+    """
+    Distance from a solar instant to the surrounding pillar boundaries.
+
+    Args:
+        solar_us (int): Solar time in microseconds since 1970-01-01 (see
+            bazi_core.civil_to_apparent_solar_us)
+
+    Returns:
+        dict: `<kind>_since` and `<kind>_until` in minutes for each of
+            BOUNDARY_KINDS; None where the term table has no boundary
+    """
+    minute = solar_us / US_PER_MINUTE
+    day_start = solar_us // US_PER_MINUTE // 1440 * 1440
+    previous, following = _hour_bounds(solar_us // US_PER_MINUTE - day_start)
+    distances = {
+        "hour_since": minute - (day_start + previous),
+        "hour_until": day_start + following - minute,
+        "day_since": minute - day_start,
+        "day_until": day_start + 1440 - minute,
+    }
+    terms = term_boundaries()
+    first, end = terms["range"]
+    for kind in ("month", "year"):
+        starts = terms[kind]
+        i = bisect.bisect_right(starts, solar_us // US_PER_MINUTE)
+        inside = first <= minute < end
+        distances[f"{kind}_since"] = minute - starts[i - 1] if inside and i > 0 else None
+        distances[f"{kind}_until"] = starts[i] - minute if inside and i < len(starts) else None
+    return distances
+
+def civil_boundary_distances(year, month, day, hour, minute, longitude, timezone_offset):
+    """
+    boundary_distances for a civil birth time.
+
+    Args:
+        year, month, day, hour, minute (int): Civil time components
+        longitude (float): Longitude in decimal degrees
+        timezone_offset (float): Timezone offset from GMT in hours
+
+    Returns:
+        dict: See boundary_distances, plus `nearest` (kind) and `nearest_minutes`
+    """
+    solar_us, _, _ = civil_to_apparent_solar_us(year, month, day, hour, minute, longitude, timezone_offset)
+    distances = boundary_distances(solar_us)
+    candidates = [(min(d for d in (distances[f"{kind}_since"], distances[f"{kind}_until"]) if d is not None), kind)
+                  for kind in BOUNDARY_KINDS
+                  if distances[f"{kind}_since"] is not None or distances[f"{kind}_until"] is not None]
+    distances["nearest_minutes"], distances["nearest"] = min(candidates)
+    return distances
+
+def boundary_distances_batch(solar_us):
+    """
+    Vectorized boundary_distances.
+
+    Args:
+        solar_us (array-like of int): Solar times in microseconds since 1970-01-01
+
+    Returns:
+        dict: float64 `<kind>_since` / `<kind>_until` arrays in minutes, NaN
+            where the term table has no boundary
+    """
+    import numpy as np
+
+    solar_us = np.asarray(solar_us, dtype=np.int64)
+    minute = solar_us / US_PER_MINUTE
+    whole = solar_us // US_PER_MINUTE
+    day_start = whole // 1440 * 1440
+    grid = np.array(HOUR_BOUNDARY_MINUTES + (1440,), dtype=np.int64)
+    i = np.searchsorted(grid, whole - day_start, side="right")
+    distances = {
+        "hour_since": minute - (day_start + grid[i - 1]),
+        "hour_until": day_start + grid[i] - minute,
+        "day_since": minute - day_start,
+        "day_until": day_start + 1440 - minute,
+    }
+    terms = term_boundaries()
+    first, end = terms["range"]
+    inside = (minute >= first) & (minute < end)
+    for kind in ("month", "year"):
+        starts = np.array(terms[kind], dtype=np.int64)
+        i = np.searchsorted(starts, whole, side="right")
+        since = minute - starts[np.maximum(i - 1, 0)]
+        until = starts[np.minimum(i, len(starts) - 1)] - minute
+        distances[f"{kind}_since"] = np.where(inside & (i > 0), since, np.nan)
+        distances[f"{kind}_until"] = np.where(inside & (i < len(starts)), until, np.nan)
+    return distances
+
+def near_boundary(distances, tolerance_minutes):
+    """
+    Flag charts within a tolerance of any pillar boundary.
+
+    Args:
+        distances (dict): Result of boundary_distances_batch
+        tolerance_minutes (float): Birth time uncertainty, e.g. 30
+
+    Returns:
+        ndarray: Bool mask of charts that could flip within the tolerance
+    """
+    import numpy as np
+
+    mask = np.zeros(len(distances["hour_since"]), dtype=bool)
+    for kind in BOUNDARY_KINDS:
+        for side in ("since", "until"):
+            # NaN compares False, so missing term boundaries never flag
+            mask |= distances[f"{kind}_{side}"] < tolerance_minutes
+    return mask
+
+# ----------------------
+# Birth time windows
+# ----------------------
+def _solar_boundaries_between(first_minute, end_minute):
+    """Every pillar boundary minute strictly inside (first_minute, end_minute)"""
+    boundaries = set()
+    for day in range(first_minute // 1440, end_minute // 1440 + 1):
+        boundaries.update(day * 1440 + m for m in HOUR_BOUNDARY_MINUTES)
+    month_starts = term_boundaries()["month"]
+    lo = bisect.bisect_right(month_starts, first_minute)
+    hi = bisect.bisect_left(month_starts, end_minute)
+    boundaries.update(month_starts[lo:hi])
+    return sorted(b for b in boundaries if first_minute < b < end_minute)
+
+def charts_in_civil_window(start, end, longitude, timezone_offset):
+    """
+    Every distinct chart a civil birth time window can produce.
+
+    Pillar boundaries inside the window are found analytically and mapped
+    back to civil minutes, so the cost depends on the number of boundaries,
+    not the window length.
+
+    Args:
+        start (datetime): First possible civil birth minute
+        end (datetime): End of the window (exclusive)
+        longitude (float): Longitude in decimal degrees
+        timezone_offset (float): Timezone offset from GMT in hours
+
+    Returns:
+        list: One dict per distinct chart, in time order, with `pillars`
+            (FourPillars at the first matching minute), `intervals` (civil
+            (start, end) datetimes, end exclusive) and `minutes` covered
+    """
+    civil_start = datetime_to_epoch_minutes(start)
+    civil_end = datetime_to_epoch_minutes(end)
+    if civil_end <= civil_start:
+        return []
+    solar_start = civil_minute_to_solar_us(civil_start, longitude, timezone_offset)
+    solar_end = civil_minute_to_solar_us(civil_end, longitude, timezone_offset)
+
+    edges = [civil_start]
+    for boundary in _solar_boundaries_between(solar_start // US_PER_MINUTE, -(-solar_end // US_PER_MINUTE)):
+        edge = first_civil_minute_at_or_after(boundary, longitude, timezone_offset)
+        if edges[-1] < edge < civil_end:
+            edges.append(edge)
+    edges.append(civil_end)
+
+    charts = {}
+    for a, b in zip(edges, edges[1:]):
+        pillars = FourPillars.from_solar_us(civil_minute_to_solar_us(a, longitude, timezone_offset))
+        entry = charts.setdefault(pillars.indices, {"pillars": pillars, "intervals": [], "minutes": 0})
+        if entry["intervals"] and entry["intervals"][-1][1] == epoch_minutes_to_datetime(a):
+            entry["intervals"][-1] = (entry["intervals"][-1][0], epoch_minutes_to_datetime(b))
+        else:
+            entry["intervals"].append((epoch_minutes_to_datetime(a), epoch_minutes_to_datetime(b)))
+        entry["minutes"] += b - a
+    return list(charts.values())
@@ -0,0 +1,218 @@
+# pillar_search.py
+from bazi_core import (
+    HEAVENLY_STEMS, EARTHLY_BRANCHES, JDN_EPOCH, US_PER_MINUTE,
+    civil_from_days, civil_to_apparent_solar_us, pillar_indices,
+)
+from solar_terms import datetime_to_epoch_minutes, epoch_minutes_to_datetime, get_month_boundary_index
+
+# Reverse search works on the cycle arithmetic instead of scanning minutes:
+#   year/month pillars -> rows of the month boundary index (a few thousand)
+#   day pillar         -> jd_noon residue mod 60 (every 60th solar day)
+#   hour pillar        -> hour slot, which also fixes the day stem (mod 10)
+# Every boundary is a whole solar minute, so windows are exact in epoch minutes.
+
+def hour_slot_minutes(slot):
+    """
+    Solar minutes of the day covered by an hour slot.
+
+    Slot 0 is 00:00-01:00 and slot 12 is 23:00-24:00 (both 子); slot s in
+    1-11 covers (2s-1):00 to (2s+1):00.
+
+    Returns:
+        tuple: (start_minute, end_minute) within the day, end exclusive
+    """
+    if slot == 0:
+        return 0, 60
+    if slot == 12:
+        return 1380, 1440
+    return (2 * slot - 1) * 60, (2 * slot + 1) * 60
+
+def parse_pillar(pillar):
+    """
+    Parse a pillar pattern.
+
+    Args:
+        pillar (str or tuple): Two characters like "甲子", or (stem_index, branch_index)
+
+    Returns:
+        tuple: (stem_index, branch_index)
+    """
+    if isinstance(pillar, str):
+        if len(pillar) != 2 or pillar[0] not in HEAVENLY_STEMS or pillar[1] not in EARTHLY_BRANCHES:
+            raise ValueError(f"Invalid pillar: {pillar!r}")
+        return HEAVENLY_STEMS.index(pillar[0]), EARTHLY_BRANCHES.index(pillar[1])
+    stem, branch = pillar
+    if not (0 <= stem < 10 and 0 <= branch < 12):
+        raise ValueError(f"Invalid pillar indices: {pillar!r}")
+    return stem, branch
+
+def _day_residues(day, hour):
+    """
+    Allowed (jd_noon modulus, residue, hour slots) combinations for the day and hour patterns.
+
+    Returns:
+        list: (modulus, residue, slots) where slots is None for the whole day
+    """
+    day_residue = None
+    if day is not None:
+        # day_stem = (jd_noon - 1) % 10, day_branch = (jd_noon + 1) % 12
+        matches = [j for j in range(60) if (j - 1) % 10 == day[0] and (j + 1) % 12 == day[1]]
+        if not matches:
+            return []
+        day_residue = matches[0]
+    if hour is None:
+        return [(60, day_residue, None)]
+
+    # hour_branch = slot % 12 and hour_stem = (day_stem + slot) % 10, so each slot fixes the day stem
+    by_stem = {}
+    for slot in range(13):
+        if slot % 12 == hour[1]:
+            by_stem.setdefault((hour[0] - slot) % 10, []).append(slot)
+    if day_residue is not None:
+        slots = by_stem.get(day[0])
+        return [(60, day_residue, slots)] if slots else []
+    return [(10, (stem + 1) % 10, slots) for stem, slots in sorted(by_stem.items())]
+
+def _month_windows(year, month, lo, hi):
+    index = get_month_boundary_index()
+    windows = []
+    for i in range(len(index.starts) - 1):
+        start, end = max(index.starts[i], lo), min(index.starts[i + 1], hi)
+        if start >= end:
+            continue
+        bazi_year, bazi_month = index.results[i][:2]
+        indices = pillar_indices(bazi_year, bazi_month, 0, 0)
+        if year is not None and indices[0:2] != year:
+            continue
+        if month is not None and indices[2:4] != month:
+            continue
+        windows.append((start, end))
+    return windows
+
+def _merge(windows):
+    merged = []
+    for start, end in sorted(windows):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def find_pillar_minutes(year=None, month=None, day=None, hour=None, start=None, end=None):
+    """
+    Solar-time windows, in epoch minutes, in which the given pillars hold.
+
+    Args:
+        year, month, day, hour (str or tuple, optional): Pillar patterns; omitted pillars match anything
+        start, end (int, optional): Search range in epoch minutes (default: the whole term table)
+
+    Returns:
+        list: Sorted, merged (start_minute, end_minute) half-open windows
+    """
+    year, month, day, hour = (None if p is None else parse_pillar(p) for p in (year, month, day, hour))
+    index = get_month_boundary_index()
+    lo = index.starts[0] if start is None else max(start, index.starts[0])
+    hi = index.starts[-1] if end is None else min(end, index.starts[-1])
+    windows = _month_windows(year, month, lo, hi)
+    if day is None and hour is None:
+        return _merge(windows)
+
+    residues = _day_residues(day, hour)
+    found = []
+    for window_start, window_end in windows:
+        first_day, last_day = window_start // 1440, (window_end - 1) // 1440
+        for modulus, residue, slots in residues:
+            if residue is None:
+                days = range(first_day, last_day + 1)
+            else:
+                days = range(first_day + (residue - first_day - JDN_EPOCH) % modulus, last_day + 1, modulus)
+            spans = [(0, 1440)] if slots is None else [hour_slot_minutes(slot) for slot in slots]
+            for solar_day in days:
+                for span_start, span_end in spans:
+                    a = max(solar_day * 1440 + span_start, window_start)
+                    b = min(solar_day * 1440 + span_end, window_end)
+                    if a < b:
+                        found.append((a, b))
+    return _merge(found)
+
+def find_pillar_windows(year=None, month=None, day=None, hour=None, start=None, end=None):
+    """
+    Find every apparent solar time window with the given Four Pillars.
+
+    Example: find_pillar_windows("庚午", "辛巳", "甲子", "丙寅") or a partial
+    pattern such as find_pillar_windows(day="甲子", hour="丙寅").
+
+    Args:
+        year, month, day, hour (str or tuple, optional): Pillar patterns; omitted pillars match anything
+        start, end (datetime, optional): Solar-time search range (default: the whole term table)
+
+    Returns:
+        list: (start, end) solar datetimes, end exclusive
+    """
+    minutes = find_pillar_minutes(year, month, day, hour,
+                                  None if start is None else datetime_to_epoch_minutes(start),
+                                  None if end is None else datetime_to_epoch_minutes(end))
+    return [(epoch_minutes_to_datetime(a), epoch_minutes_to_datetime(b)) for a, b in minutes]
+
+# ----------------------
+# Civil time windows
+# ----------------------
+def civil_minute_to_solar_us(civil_minute, longitude, timezone_offset):
+    """Apparent solar time (microseconds) of a civil time given in epoch minutes"""
+    days, minute_of_day = divmod(civil_minute, 1440)
+    year, month, day = civil_from_days(days)
+    return civil_to_apparent_solar_us(year, month, day, minute_of_day // 60, minute_of_day % 60,
+                                      longitude, timezone_offset)[0]
+
+def first_civil_minute_at_or_after(solar_minute, longitude, timezone_offset):
+    """
+    First civil minute whose apparent solar time is at or after a solar instant.
+
+    Civil -> solar is strictly increasing minute to minute (the equation of
+    time moves < 1 minute per day), so this is the civil edge of a solar boundary.
+
+    Args:
+        solar_minute (int): Solar instant in epoch minutes
+        longitude (float): Longitude in decimal degrees
+        timezone_offset (float): Timezone offset from GMT in hours
+
+    Returns:
+        int: Civil time in epoch minutes
+    """
+    target = solar_minute * US_PER_MINUTE
+    civil = solar_minute - (civil_minute_to_solar_us(solar_minute, longitude, timezone_offset) - target) // US_PER_MINUTE
+    while civil_minute_to_solar_us(civil, longitude, timezone_offset) >= target:
+        civil -= 1
+    while civil_minute_to_solar_us(civil, longitude, timezone_offset) < target:
+        civil += 1
+    return civil
+
+def find_civil_windows(longitude, timezone_offset, year=None, month=None, day=None, hour=None,
+                       start=None, end=None):
+    """
+    Find every civil (clock) time window with the given Four Pillars at a location.
+
+    Args:
+        longitude (float): Longitude in decimal degrees
+        timezone_offset (float): Timezone offset from GMT in hours
+        year, month, day, hour (str or tuple, optional): Pillar patterns
+        start, end (datetime, optional): Civil-time search range
+
+    Returns:
+        list: (start, end) civil datetimes covering exactly the clock minutes
+            whose charts match, end exclusive
+    """
+    # Widen the solar range by a day: corrections stay well within ±24 hours
+    lo = None if start is None else datetime_to_epoch_minutes(start) - 1440
+    hi = None if end is None else datetime_to_epoch_minutes(end) + 1440
+    windows = []
+    for a, b in find_pillar_minutes(year, month, day, hour, lo, hi):
+        civil_start = first_civil_minute_at_or_after(a, longitude, timezone_offset)
+        civil_end = first_civil_minute_at_or_after(b, longitude, timezone_offset)
+        if start is not None:
+            civil_start = max(civil_start, datetime_to_epoch_minutes(start))
+        if end is not None:
+            civil_end = min(civil_end, datetime_to_epoch_minutes(end))
+        if civil_start < civil_end:
+            windows.append((epoch_minutes_to_datetime(civil_start), epoch_minutes_to_datetime(civil_end)))
+    return windows
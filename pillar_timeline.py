@@ -0,0 +1,274 @@
+# pillar_timeline.py
+import array
+import bisect
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from bazi_core import JDN_EPOCH, US_PER_DAY, US_PER_MINUTE, four_pillar_indices_from_solar_us
+from solar_terms import SOLAR_TERMS_TABLE_PATH, get_month_boundary_index
+
+# The Four Pillars only change at odd solar hours (hour branch), solar midnight
+# (day pillar and the 子 hour stem) and month-starting terms / civil New Year
+# (year and month pillars). Between those instants every chart is identical,
+# so 1899-2101 collapses to ~1M intervals that are stored once on disk and
+# memory-mapped by every process that needs them.
+#
+# File layout (little-endian), n = number of interval starts:
+#     TIMELINE_HEADER (magic, version, solar term table CRC-32, n)
+#     int32  starts[n]      epoch minutes (apparent solar time), ascending
+#     int16  bazi_year[n]
+#     uint8  bazi_month[n]
+#     uint8  year[n], month[n], day[n], hour[n]   pillar codes (stem * 12 + branch)
+# The last start only closes the covered range; instants outside
+# [starts[0], starts[-1]) are calculated directly.
+# The file is generated on first use (or with `python pillar_timeline.py`);
+# set BAZI_PILLAR_TIMELINE to keep it somewhere writable and shared.
+PILLAR_TIMELINE_PATH = os.environ.get(
+    "BAZI_PILLAR_TIMELINE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "pillar_timeline.bin"))
+TIMELINE_MAGIC = b"BZPT"
+TIMELINE_VERSION = 1
+TIMELINE_HEADER = struct.Struct("<4siIi")  # magic, version, solar term table crc32, n_intervals
+TIMELINE_CODE_COLUMNS = ("year", "month", "day", "hour")
+# Solar minutes within a day at which the hour slot changes: 00:00, 01:00, 03:00, ... 23:00
+HOUR_BOUNDARY_MINUTES = (0,) + tuple(hour * 60 for hour in range(1, 24, 2))
+# Pillar code -> (stem, branch)
+_CODE_INDICES = tuple(divmod(code, 12) for code in range(120))
+
+def solar_terms_checksum(path=SOLAR_TERMS_TABLE_PATH):
+    """CRC-32 of the solar term table the timeline was built from"""
+    with open(path, "rb") as f:
+        return zlib.crc32(f.read())
+
+# ----------------------
+# Building
+# ----------------------
+def build_pillar_timeline():
+    """
+    Calculate every pillar interval covered by the month boundary index.
+
+    The pillars at each boundary come from bazi_batch.create_four_pillars_batch,
+    so the timeline agrees with the batch and scalar paths by construction.
+
+    Returns:
+        dict: NumPy arrays `starts` (int32 epoch minutes), `bazi_year`,
+            `bazi_month` and the four pillar code columns
+    """
+    import numpy as np
+    from bazi_batch import create_four_pillars_batch
+
+    month_starts = np.array(get_month_boundary_index().starts, dtype=np.int64)
+    first, last = month_starts[0], month_starts[-1]
+    days = np.arange(first // 1440, last // 1440 + 1, dtype=np.int64)
+    hour_starts = (days[:, None] * 1440 + np.array(HOUR_BOUNDARY_MINUTES, dtype=np.int64)).ravel()
+    starts = np.union1d(hour_starts, month_starts)
+    starts = starts[(starts >= first) & (starts <= last)]
+
+    batch = create_four_pillars_batch(starts * US_PER_MINUTE)
+    columns = {
+        "bazi_year": batch["bazi_year"].astype(np.int16),
+        "bazi_month": batch["bazi_month"].astype(np.uint8),
+    }
+    for pillar in TIMELINE_CODE_COLUMNS:
+        columns[pillar] = (batch[f"{pillar}_stem"] * 12 + batch[f"{pillar}_branch"]).astype(np.uint8)
+
+    # Drop boundaries where nothing changes (kept: the first row and the range end)
+    changed = np.zeros(len(starts), dtype=bool)
+    changed[0] = changed[-1] = True
+    for values in columns.values():
+        changed[1:] |= values[1:] != values[:-1]
+    timeline = {"starts": starts[changed].astype(np.int32)}
+    timeline.update((name, values[changed]) for name, values in columns.items())
+    return timeline
+
+def write_pillar_timeline(path=PILLAR_TIMELINE_PATH, timeline=None):
+    """
+    Write the pillar timeline file (atomically, via a temporary file).
+
+    Args:
+        path (str): Output file path
+        timeline (dict, optional): Arrays from build_pillar_timeline (built if omitted)
+
+    Returns:
+        int: Number of intervals written
+    """
+    timeline = timeline or build_pillar_timeline()
+    n = len(timeline["starts"])
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(TIMELINE_HEADER.pack(TIMELINE_MAGIC, TIMELINE_VERSION, solar_terms_checksum(), n))
+        f.write(timeline["starts"].astype("<i4").tobytes())
+        f.write(timeline["bazi_year"].astype("<i2").tobytes())
+        f.write(timeline["bazi_month"].tobytes())
+        for pillar in TIMELINE_CODE_COLUMNS:
+            f.write(timeline[pillar].tobytes())
+    os.replace(tmp_path, path)
+    return n
+
+# ----------------------
+# Lookup
+# ----------------------
+class PillarTimeline:
+    """
+    Memory-mapped pillar timeline.
+
+    Scalar lookups bisect the mapped int32 starts directly (no NumPy needed);
+    array lookups use np.searchsorted over zero-copy views of the same pages.
+    """
+    __slots__ = ("path", "n", "_buffer", "_starts", "_columns", "_codes", "_arrays")
+
+    def __init__(self, path=PILLAR_TIMELINE_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, checksum, self.n = TIMELINE_HEADER.unpack_from(self._buffer)
+        if magic != TIMELINE_MAGIC or version != TIMELINE_VERSION:
+            raise ValueError(f"{path} is not a version {TIMELINE_VERSION} pillar timeline")
+        if checksum != solar_terms_checksum():
+            raise ValueError(f"{path} was built from a different solar term table")
+
+        view = memoryview(self._buffer)
+        offset = TIMELINE_HEADER.size
+        starts = view[offset:offset + 4 * self.n].cast("i")
+        offset += 4 * self.n
+        bazi_year = view[offset:offset + 2 * self.n].cast("h")
+        offset += 2 * self.n
+        if sys.byteorder != "little":
+            starts, bazi_year = array.array("i", starts), array.array("h", bazi_year)
+            starts.byteswap()
+            bazi_year.byteswap()
+        self._starts = starts
+        self._columns = {"bazi_year": bazi_year}
+        for name in ("bazi_month",) + TIMELINE_CODE_COLUMNS:
+            self._columns[name] = view[offset:offset + self.n]
+            offset += self.n
+        self._codes = tuple(self._columns[pillar] for pillar in TIMELINE_CODE_COLUMNS)
+        self._arrays = None
+
+    def __len__(self):
+        """Number of intervals (the closing start is not an interval)"""
+        return self.n - 1
+
+    @property
+    def first_minute(self):
+        return self._starts[0]
+
+    @property
+    def end_minute(self):
+        return self._starts[self.n - 1]
+
+    def _position(self, minutes):
+        i = bisect.bisect_right(self._starts, minutes) - 1
+        return i if 0 <= i < self.n - 1 else None
+
+    def lookup(self, solar_us):
+        """
+        Four Pillars indices for a solar instant.
+
+        Args:
+            solar_us (int): Solar time in microseconds since 1970-01-01
+
+        Returns:
+            tuple: Stem/branch indices as returned by
+                bazi_core.four_pillar_indices_from_solar_us
+        """
+        i = self._position(solar_us // US_PER_MINUTE)
+        if i is None:
+            return four_pillar_indices_from_solar_us(solar_us)
+        year, month, day, hour = self._codes
+        return _CODE_INDICES[year[i]] + _CODE_INDICES[month[i]] + _CODE_INDICES[day[i]] + _CODE_INDICES[hour[i]]
+
+    def interval(self, solar_us):
+        """
+        The constant-pillar interval containing a solar instant.
+
+        Args:
+            solar_us (int): Solar time in microseconds since 1970-01-01
+
+        Returns:
+            tuple: (start_us, end_us, indices) with the interval half-open
+            None: Outside the timeline
+        """
+        i = self._position(solar_us // US_PER_MINUTE)
+        if i is None:
+            return None
+        return (self._starts[i] * US_PER_MINUTE, self._starts[i + 1] * US_PER_MINUTE,
+                self.lookup(solar_us))
+
+    def arrays(self):
+        """
+        Zero-copy NumPy views of the timeline columns.
+
+        Returns:
+            dict: `starts` and the metadata/pillar code columns
+        """
+        if self._arrays is None:
+            import numpy as np
+            offset = TIMELINE_HEADER.size
+            self._arrays = {"starts": np.frombuffer(self._buffer, dtype="<i4", count=self.n, offset=offset)}
+            offset += 4 * self.n
+            self._arrays["bazi_year"] = np.frombuffer(self._buffer, dtype="<i2", count=self.n, offset=offset)
+            offset += 2 * self.n
+            for name in ("bazi_month",) + TIMELINE_CODE_COLUMNS:
+                self._arrays[name] = np.frombuffer(self._buffer, dtype=np.uint8, count=self.n, offset=offset)
+                offset += self.n
+        return self._arrays
+
+    def lookup_array(self, solar_us):
+        """
+        Vectorized lookup.
+
+        The result has the column layout of chart_table.ChartTable, so
+        ChartTable(timeline.lookup_array(solar_us)) gives a chart table.
+
+        Args:
+            solar_us (array-like of int): Solar times in microseconds since 1970-01-01
+
+        Returns:
+            dict: `year`, `month`, `day`, `hour` pillar codes plus `jd_noon`,
+                `bazi_year` and `bazi_month`
+        """
+        import numpy as np
+
+        arrays = self.arrays()
+        solar_us = np.asarray(solar_us, dtype=np.int64)
+        i = np.searchsorted(arrays["starts"], solar_us // US_PER_MINUTE, side="right") - 1
+        outside = (i < 0) | (i >= self.n - 1)
+        i = np.clip(i, 0, self.n - 2)
+        result = {name: arrays[name][i] for name in TIMELINE_CODE_COLUMNS}
+        result["jd_noon"] = (solar_us // US_PER_DAY + JDN_EPOCH).astype(np.int32)
+        result["bazi_year"] = arrays["bazi_year"][i]
+        result["bazi_month"] = arrays["bazi_month"][i]
+        if outside.any():
+            from bazi_batch import create_four_pillars_batch
+            batch = create_four_pillars_batch(solar_us[outside])
+            for pillar in TIMELINE_CODE_COLUMNS:
+                result[pillar][outside] = batch[f"{pillar}_stem"] * 12 + batch[f"{pillar}_branch"]
+            result["bazi_year"][outside] = batch["bazi_year"]
+            result["bazi_month"][outside] = batch["bazi_month"]
+        return result
+
+_PILLAR_TIMELINE = None
+
+def get_pillar_timeline(path=PILLAR_TIMELINE_PATH):
+    """
+    Return the shared pillar timeline, building the file on first use.
+
+    The file is rebuilt when it is missing, from an older format or from a
+    different solar term table. Processes that map the same file share its pages.
+    """
+    global _PILLAR_TIMELINE
+    if _PILLAR_TIMELINE is None or _PILLAR_TIMELINE.path != path:
+        try:
+            _PILLAR_TIMELINE = PillarTimeline(path)
+        except (OSError, ValueError):
+            write_pillar_timeline(path)
+            _PILLAR_TIMELINE = PillarTimeline(path)
+    return _PILLAR_TIMELINE
+
+if __name__ == "__main__":
+    out_path = sys.argv[1] if len(sys.argv) > 1 else PILLAR_TIMELINE_PATH
+    count = write_pillar_timeline(out_path)
+    print(f"Wrote {count - 1} pillar intervals ({os.path.getsize(out_path)} bytes) to {out_path}")
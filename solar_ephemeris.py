@@ -0,0 +1,503 @@
+# solar_ephemeris.py
+# Analytic sun and new-moon models and the solvers used to generate the binary
+# term table, the per-day equation of time table and the lunar calendar table.
+#
+# Usage:
+#     python solar_ephemeris.py [output_path] [first_year] [last_year]
+#     python solar_ephemeris.py --eot [output_path] [first_year] [last_year]
+#     python solar_ephemeris.py --lunar [output_path] [first_year] [last_year]
+import bisect
+import datetime
+import math
+import struct
+import sys
+
+from equation_of_time_table import EOT_TABLE_HEADER, EOT_TABLE_MAGIC, EOT_TABLE_PATH
+from lunar_calendar import (
+    LUNAR_TABLE_HEADER, LUNAR_TABLE_MAGIC, LUNAR_TABLE_PATH, LEAP_MONTH_SHIFT, MAX_LUNAR_MONTHS,
+)
+from solar_terms import (
+    SOLAR_TERMS_ORDER, SOLAR_TERMS_TABLE_PATH, TABLE_HEADER, TABLE_MAGIC,
+    TABLE_UTC_OFFSET_HOURS,
+)
+
+# Apparent solar longitude (degrees) at which each term occurs
+SOLAR_TERM_LONGITUDES = {
+    "spring_begins": 315, "rain_water": 330, "insects_awaken": 345,
+    "spring_equinox": 0, "clear_bright": 15, "grain_rains": 30,
+    "summer_begins": 45, "grain_buds": 60, "grain_in_ear": 75,
+    "summer_solstice": 90, "minor_heat": 105, "major_heat": 120,
+    "autumn_begins": 135, "stopping_heat": 150, "white_dews": 165,
+    "autumn_equinox": 180, "cold_dews": 195, "frosts_descent": 210,
+    "winter_begins": 225, "minor_snow": 240, "major_snow": 255,
+    "winter_solstice": 270, "minor_cold": 285, "major_cold": 300,
+}
+
+# ----------------------
+# Truncated VSOP87 series for the Earth (Meeus, Astronomical Algorithms, App. III)
+# Each term is (A, B, C) contributing A * cos(B + C * tau), tau in Julian millennia
+# ----------------------
+EARTH_L0 = [
+    (175347046, 0, 0), (3341656, 4.6692568, 6283.07585), (34894, 4.6261, 12566.1517),
+    (3497, 2.7441, 5753.3849), (3418, 2.8289, 3.5231), (3136, 3.6277, 77713.7715),
+    (2676, 4.4181, 7860.4194), (2343, 6.1352, 3930.2097), (1324, 0.7425, 11506.7698),
+    (1273, 2.0371, 529.691), (1199, 1.1096, 1577.3435), (990, 5.233, 5884.927),
+    (902, 2.045, 26.298), (857, 3.508, 398.149), (780, 1.179, 5223.694),
+    (753, 2.533, 5507.553), (505, 4.583, 18849.228), (492, 4.205, 775.523),
+    (357, 2.92, 0.067), (317, 5.849, 11790.629), (284, 1.899, 796.298),
+    (271, 0.315, 10977.079), (243, 0.345, 5486.778), (206, 4.806, 2544.314),
+    (205, 1.869, 5573.143), (202, 2.458, 6069.777), (156, 0.833, 213.299),
+    (132, 3.411, 2942.463), (126, 1.083, 20.775), (115, 0.645, 0.98),
+    (103, 0.636, 4694.003), (102, 0.976, 15720.839), (102, 4.267, 7.114),
+    (99, 6.21, 2146.17), (98, 0.68, 155.42), (86, 5.98, 161000.69),
+    (85, 1.3, 6275.96), (85, 3.67, 71430.7), (80, 1.81, 17260.15),
+    (79, 3.04, 12036.46), (75, 1.76, 5088.63), (74, 3.5, 3154.69),
+    (74, 4.68, 801.82), (70, 0.83, 9437.76), (62, 3.98, 8827.39),
+    (61, 1.82, 7084.9), (57, 2.78, 6286.6), (56, 4.39, 14143.5),
+    (56, 3.47, 6279.55), (52, 0.19, 12139.55), (52, 1.33, 1748.02),
+    (51, 0.28, 5856.48), (49, 0.49, 1194.45), (41, 5.37, 8429.24),
+    (41, 2.4, 19651.05), (39, 6.17, 10447.39), (37, 6.04, 10213.29),
+    (37, 2.57, 1059.38), (36, 1.71, 2352.87), (36, 1.78, 6812.77),
+    (33, 0.59, 17789.85), (30, 0.44, 83996.85), (30, 2.74, 1349.87),
+    (25, 3.16, 4690.48),
+]
+EARTH_L1 = [
+    (628331966747, 0, 0), (206059, 2.678235, 6283.07585), (4303, 2.6351, 12566.1517),
+    (425, 1.59, 3.523), (119, 5.796, 26.298), (109, 2.966, 1577.344),
+    (93, 2.59, 18849.23), (72, 1.14, 529.69), (68, 1.87, 398.15),
+    (67, 4.41, 5507.55), (59, 2.89, 5223.69), (56, 2.17, 155.42),
+    (45, 0.4, 796.3), (36, 0.47, 775.52), (29, 2.65, 7.11),
+    (21, 5.34, 0.98), (19, 1.85, 5486.78), (19, 4.97, 213.3),
+    (17, 2.99, 6275.96), (16, 0.03, 2544.31), (16, 1.43, 2146.17),
+    (15, 1.21, 10977.08), (12, 2.83, 1748.02), (12, 3.26, 5088.63),
+    (12, 5.27, 1194.45), (12, 2.08, 4694.0), (11, 0.77, 553.57),
+    (10, 1.3, 6286.6), (10, 4.24, 1349.87), (9, 2.7, 242.73),
+    (9, 5.64, 951.72), (8, 5.3, 2352.87), (6, 2.65, 9437.76),
+    (6, 4.67, 4690.48),
+]
+EARTH_L2 = [
+    (52919, 0, 0), (8720, 1.0721, 6283.0758), (309, 0.867, 12566.152),
+    (27, 0.05, 3.52), (16, 5.19, 26.3), (16, 3.68, 155.42),
+    (10, 0.76, 18849.23), (9, 2.06, 77713.77), (7, 0.83, 775.52),
+    (5, 4.66, 1577.34), (4, 1.03, 7.11), (4, 3.44, 5573.14),
+    (3, 5.14, 796.3), (3, 6.05, 5507.55), (3, 1.19, 242.73),
+    (3, 6.12, 529.69), (3, 0.31, 398.15), (3, 2.28, 553.57),
+    (2, 4.38, 5223.69), (2, 3.75, 0.98),
+]
+EARTH_L3 = [
+    (289, 5.844, 6283.076), (35, 0, 0), (17, 5.49, 12566.15),
+    (3, 5.2, 155.42), (1, 4.72, 3.52), (1, 5.3, 18849.23), (1, 5.97, 242.73),
+]
+EARTH_L4 = [(114, 3.142, 0), (8, 4.13, 6283.08), (1, 3.84, 12566.15)]
+EARTH_L5 = [(1, 3.14, 0)]
+EARTH_R0 = [
+    (100013989, 0, 0), (1670700, 3.0984635, 6283.07585), (13956, 3.05525, 12566.1517),
+    (3084, 5.1985, 77713.7715), (1628, 1.1739, 5753.3849), (1576, 2.8469, 7860.4194),
+]
+EARTH_R1 = [(103019, 1.10749, 6283.07585), (1721, 1.0644, 12566.1517)]
+
+EARTH_L = [EARTH_L0, EARTH_L1, EARTH_L2, EARTH_L3, EARTH_L4, EARTH_L5]
+EARTH_R = [EARTH_R0, EARTH_R1]
+
+TROPICAL_YEAR = 365.24219
+
+# ----------------------
+# Time Scales
+# ----------------------
+def delta_t_seconds(year):
+    """
+    Approximate TT - UT (Espenak & Meeus polynomials).
+
+    Args:
+        year (float): Decimal year
+
+    Returns:
+        float: Delta T in seconds
+    """
+    if year < 1920:
+        t = year - 1900
+        return -2.79 + 1.494119 * t - 0.0598939 * t ** 2 + 0.0061966 * t ** 3 - 0.000197 * t ** 4
+    if year < 1941:
+        t = year - 1920
+        return 21.20 + 0.84493 * t - 0.0761 * t ** 2 + 0.0020936 * t ** 3
+    if year < 1961:
+        t = year - 1950
+        return 29.07 + 0.407 * t - t ** 2 / 233 + t ** 3 / 2547
+    if year < 1986:
+        t = year - 1975
+        return 45.45 + 1.067 * t - t ** 2 / 260 - t ** 3 / 718
+    if year < 2005:
+        t = year - 2000
+        return (63.86 + 0.3345 * t - 0.060374 * t ** 2 + 0.0017275 * t ** 3
+                + 0.000651814 * t ** 4 + 0.00002373599 * t ** 5)
+    if year < 2050:
+        t = year - 2000
+        return 62.92 + 0.32217 * t + 0.005589 * t ** 2
+    return -20 + 32 * ((year - 1820) / 100) ** 2 - 0.5628 * (2150 - year)
+
+def julian_date_to_epoch_minutes(jd):
+    """Convert a (UT) Julian Date to fractional minutes since 1970-01-01 UTC"""
+    return (jd - 2440587.5) * 1440.0
+
+# ----------------------
+# Solar Position
+# ----------------------
+def _series(terms, tau):
+    return sum(a * math.cos(b + c * tau) for a, b, c in terms)
+
+def _nutation_arguments(T):
+    omega = math.radians(125.04452 - 1934.136261 * T)
+    sun_mean = math.radians(280.4665 + 36000.7698 * T)
+    moon_mean = math.radians(218.3165 + 481267.8813 * T)
+    return omega, sun_mean, moon_mean
+
+def nutation_in_longitude(T):
+    """Nutation in longitude in arcseconds (Meeus ch. 22, low-precision terms); T in Julian centuries TT"""
+    omega, sun_mean, moon_mean = _nutation_arguments(T)
+    return (-17.20 * math.sin(omega) - 1.32 * math.sin(2 * sun_mean)
+            - 0.23 * math.sin(2 * moon_mean) + 0.21 * math.sin(2 * omega))
+
+def true_obliquity(T):
+    """Obliquity of the ecliptic including nutation, in degrees; T in Julian centuries TT"""
+    omega, sun_mean, moon_mean = _nutation_arguments(T)
+    nutation = (9.20 * math.cos(omega) + 0.57 * math.cos(2 * sun_mean)
+                + 0.10 * math.cos(2 * moon_mean) - 0.09 * math.cos(2 * omega))
+    mean = 23.4392911111 - 0.0130041667 * T - 1.6389e-7 * T ** 2 + 5.0361e-7 * T ** 3
+    return mean + nutation / 3600.0
+
+def apparent_solar_longitude(jde):
+    """
+    Calculate the apparent geocentric longitude of the Sun.
+
+    Args:
+        jde (float): Julian Ephemeris Day (TT)
+
+    Returns:
+        float: Apparent longitude in degrees (0-360)
+    """
+    tau = (jde - 2451545.0) / 365250.0
+    T = tau * 10.0
+    L = sum(_series(terms, tau) * tau ** n for n, terms in enumerate(EARTH_L)) / 1e8
+    R = sum(_series(terms, tau) * tau ** n for n, terms in enumerate(EARTH_R)) / 1e8
+
+    # Geocentric longitude, FK5 correction, nutation and aberration
+    theta = math.degrees(L) + 180.0
+    aberration = -20.4898 / R
+    theta += (-0.09033 + nutation_in_longitude(T) + aberration) / 3600.0
+    return theta % 360.0
+
+def equation_of_time_minutes(jd_ut):
+    """
+    Calculate the equation of time from the sun model (Meeus ch. 28).
+
+    Unlike bazi_core.equation_of_time this follows the actual orbit of each
+    year (perihelion drift, obliquity change, nutation), to about a second.
+
+    Args:
+        jd_ut (float): Julian Date (UT)
+
+    Returns:
+        float: Apparent minus mean solar time in minutes
+    """
+    jde = jd_ut + delta_t_seconds(2000.0 + (jd_ut - 2451545.0) / 365.25) / 86400.0
+    tau = (jde - 2451545.0) / 365250.0
+    T = tau * 10.0
+    mean_longitude = (280.4664567 + 360007.6982779 * tau + 0.03032028 * tau ** 2
+                      + tau ** 3 / 49931 - tau ** 4 / 15300 - tau ** 5 / 2000000)
+    longitude = math.radians(apparent_solar_longitude(jde))
+    obliquity = math.radians(true_obliquity(T))
+    right_ascension = math.degrees(math.atan2(math.cos(obliquity) * math.sin(longitude), math.cos(longitude)))
+    eot = (mean_longitude - 0.0057183 - right_ascension
+           + nutation_in_longitude(T) / 3600.0 * math.cos(obliquity))
+    return ((eot + 180.0) % 360.0 - 180.0) * 4.0
+
+def solar_longitude_jde(target_longitude, jde_guess):
+    """
+    Solve for the instant the Sun reaches a given apparent longitude.
+
+    Args:
+        target_longitude (float): Longitude in degrees
+        jde_guess (float): Starting Julian Ephemeris Day within a few days of the answer
+
+    Returns:
+        float: Julian Ephemeris Day (TT)
+    """
+    jde = jde_guess
+    for _ in range(20):
+        delta = (target_longitude - apparent_solar_longitude(jde) + 180.0) % 360.0 - 180.0
+        jde += delta * TROPICAL_YEAR / 360.0
+        if abs(delta) < 1e-7:
+            break
+    return jde
+
+def solar_term_epoch_minutes(year, term_name):
+    """
+    Calculate when a solar term occurs, in the table's civil time scale.
+
+    Terms follow the SOLAR_TERMS_DATA convention: a year runs from
+    spring_begins (February) to major_cold (January of the following year).
+
+    Args:
+        year (int): The year
+        term_name (str): Name of the solar term
+
+    Returns:
+        int: Minutes since 1970-01-01 in China Standard Time (UTC+8), rounded
+    """
+    longitude = SOLAR_TERM_LONGITUDES[term_name]
+    march_equinox = datetime.date(year, 3, 21).toordinal() + 1721424.5
+    if longitude >= 315:
+        offset = (longitude - 360) / 360.0
+    else:
+        offset = longitude / 360.0
+    jde = solar_longitude_jde(longitude, march_equinox + offset * TROPICAL_YEAR)
+    jd_ut = jde - delta_t_seconds(year + offset + 0.22) / 86400.0
+    minutes = julian_date_to_epoch_minutes(jd_ut) + TABLE_UTC_OFFSET_HOURS * 60
+    return int(math.floor(minutes + 0.5))
+
+# ----------------------
+# New Moons
+# ----------------------
+# Periodic terms of the true new moon (Meeus, Astronomical Algorithms ch. 49):
+# (coefficient, power of E, multiples of M, M', F, Omega)
+NEW_MOON_TERMS = [
+    (-0.40720, 0, 0, 1, 0, 0), (0.17241, 1, 1, 0, 0, 0), (0.01608, 0, 0, 2, 0, 0),
+    (0.01039, 0, 0, 0, 2, 0), (0.00739, 1, -1, 1, 0, 0), (-0.00514, 1, 1, 1, 0, 0),
+    (0.00208, 2, 2, 0, 0, 0), (-0.00111, 0, 0, 1, -2, 0), (-0.00057, 0, 0, 1, 2, 0),
+    (0.00056, 1, 1, 2, 0, 0), (-0.00042, 0, 0, 3, 0, 0), (0.00042, 1, 1, 0, 2, 0),
+    (0.00038, 1, 1, 0, -2, 0), (-0.00024, 1, -1, 2, 0, 0), (-0.00017, 0, 0, 0, 0, 1),
+    (-0.00007, 0, 2, 1, 0, 0), (0.00004, 0, 0, 2, -2, 0), (0.00004, 0, 3, 0, 0, 0),
+    (0.00003, 0, 1, 1, -2, 0), (0.00003, 0, 0, 2, 2, 0), (-0.00003, 0, 1, 1, 2, 0),
+    (0.00003, 0, -1, 1, 2, 0), (-0.00002, 0, -1, 1, -2, 0), (-0.00002, 0, 1, 3, 0, 0),
+    (0.00002, 0, 0, 4, 0, 0),
+]
+# Planetary arguments: (coefficient, A at k = 0, A per lunation)
+NEW_MOON_PLANETARY_TERMS = [
+    (0.000325, 299.77, 0.107408), (0.000165, 251.88, 0.016321), (0.000164, 251.83, 26.651886),
+    (0.000126, 349.42, 36.412478), (0.000110, 84.66, 18.206239), (0.000062, 141.74, 53.303771),
+    (0.000060, 207.14, 2.453732), (0.000056, 154.84, 7.306860), (0.000047, 34.52, 27.261239),
+    (0.000042, 207.19, 0.121824), (0.000040, 291.34, 1.844379), (0.000037, 161.72, 24.198154),
+    (0.000035, 239.56, 25.513099), (0.000023, 331.55, 3.592518),
+]
+SYNODIC_MONTH = 29.530588861
+
+def new_moon_jde(k):
+    """
+    Instant of a true new moon.
+
+    Args:
+        k (int): Lunation number, 0 at the new moon of 2000-01-06
+
+    Returns:
+        float: Julian Ephemeris Day (TT), good to well under a minute
+    """
+    T = k / 1236.85
+    jde = (2451550.09766 + SYNODIC_MONTH * k + 0.00015437 * T ** 2
+           - 0.000000150 * T ** 3 + 0.00000000073 * T ** 4)
+    E = 1 - 0.002516 * T - 0.0000074 * T ** 2
+    M = math.radians(2.5534 + 29.10535670 * k - 0.0000014 * T ** 2 - 0.00000011 * T ** 3)
+    Mp = math.radians(201.5643 + 385.81693528 * k + 0.0107582 * T ** 2 + 0.00001238 * T ** 3
+                      - 0.000000058 * T ** 4)
+    F = math.radians(160.7108 + 390.67050284 * k - 0.0016118 * T ** 2 - 0.00000227 * T ** 3
+                     + 0.000000011 * T ** 4)
+    omega = math.radians(124.7746 - 1.56375588 * k + 0.0020672 * T ** 2 + 0.00000215 * T ** 3)
+    for coefficient, e_power, m, mp, f, o in NEW_MOON_TERMS:
+        jde += coefficient * E ** e_power * math.sin(m * M + mp * Mp + f * F + o * omega)
+    jde += sum(coefficient * math.sin(math.radians(a0 + rate * k + (-0.009173 * T ** 2 if i == 0 else 0)))
+               for i, (coefficient, a0, rate) in enumerate(NEW_MOON_PLANETARY_TERMS))
+    return jde
+
+def new_moon_epoch_minutes(k):
+    """New moon k in the term table's time scale (fractional minutes since 1970-01-01, UTC+8)"""
+    jde = new_moon_jde(k)
+    year = 2000 + (jde - 2451545.0) / 365.25
+    jd_ut = jde - delta_t_seconds(year) / 86400.0
+    return julian_date_to_epoch_minutes(jd_ut) + TABLE_UTC_OFFSET_HOURS * 60
+
+# ----------------------
+# Lunar Calendar
+# ----------------------
+# Principal terms (中气), one of which every ordinary lunar month contains
+PRINCIPAL_TERMS = [
+    "rain_water", "spring_equinox", "grain_rains", "grain_buds", "summer_solstice", "major_heat",
+    "stopping_heat", "autumn_equinox", "frosts_descent", "minor_snow", "winter_solstice", "major_cold",
+]
+
+def _term_day(year, term_name):
+    """Day number (UTC+8) of a term, from the term table where it has the year"""
+    from solar_terms import SOLAR_TERMS_DATA
+    minutes = SOLAR_TERMS_DATA.term_minutes(year, term_name)
+    if minutes is None:
+        minutes = solar_term_epoch_minutes(year, term_name)
+    return minutes // 1440
+
+def generate_lunar_calendar(first_year=1900, last_year=2100):
+    """
+    Calculate the months of a range of lunar years.
+
+    Rules of the current standard (GB/T 33661-2017) on UTC+8 days: a month
+    starts on the day of a new moon, the month containing the winter solstice
+    is the 11th, and when 13 months separate two 11th months the first one
+    without a principal term is the leap month, numbered after the month
+    before it.
+
+    Args:
+        first_year, last_year (int): Inclusive lunar year range
+
+    Returns:
+        list: Per year (new_year_day, month_lengths, leap_month) with
+            new_year_day in days since 1970-01-01, month_lengths in calendar
+            order (leap month included) and leap_month 0 when there is none
+    """
+    principal_days = sorted(_term_day(year, term) for year in range(first_year - 2, last_year + 2)
+                            for term in PRINCIPAL_TERMS)
+    k = math.floor((datetime.date(first_year - 1, 11, 1).toordinal() - 2451544.5 + 1721424.5) / SYNODIC_MONTH)
+    end_day = datetime.date(last_year + 2, 3, 1).toordinal() - datetime.date(1970, 1, 1).toordinal()
+    moon_days = []
+    while not moon_days or moon_days[-1] < end_day:
+        moon_days.append(math.floor(new_moon_epoch_minutes(k) / 1440))
+        k += 1
+
+    def month_of(day):
+        return bisect.bisect_right(moon_days, day) - 1
+
+    # Number every month from the 11th month of each sui (winter solstice to winter solstice)
+    months = []  # (start_day, lunar_year, month, leap)
+    for sui in range(first_year - 1, last_year + 1):
+        first, last = month_of(_term_day(sui, "winter_solstice")), month_of(_term_day(sui + 1, "winter_solstice"))
+        leap_index = None
+        if last - first == 13:
+            for i in range(first + 1, last):
+                j = bisect.bisect_left(principal_days, moon_days[i])
+                if j == len(principal_days) or principal_days[j] >= moon_days[i + 1]:
+                    leap_index = i
+                    break
+        number = 10
+        for i in range(first, last):
+            leap = i == leap_index
+            if not leap:
+                number = number % 12 + 1
+            months.append((moon_days[i], sui + (number < 11), number, leap))
+
+    years = []
+    for lunar_year in range(first_year, last_year + 1):
+        rows = [i for i, month in enumerate(months) if month[1] == lunar_year]
+        lengths = [months[i + 1][0] - months[i][0] for i in rows]
+        leap_month = next((months[i][2] for i in rows if months[i][3]), 0)
+        years.append((months[rows[0]][0], lengths, leap_month))
+    return years
+
+def write_lunar_calendar_table(path=LUNAR_TABLE_PATH, first_year=1900, last_year=2100):
+    """
+    Write the bit-packed lunar calendar table read by lunar_calendar.
+
+    Layout: LUNAR_TABLE_HEADER (magic, first_year, n_years), int32 new year
+    days (days since 1970-01-01) and uint32 year info: bit i set when month
+    i (calendar order, leap month included) has 30 days, leap month number
+    from bit LEAP_MONTH_SHIFT.
+
+    Args:
+        path (str): Output file path
+        first_year, last_year (int): Inclusive lunar year range
+
+    Returns:
+        int: Number of bytes written
+    """
+    years = generate_lunar_calendar(first_year, last_year)
+    infos = []
+    for _, lengths, leap_month in years:
+        assert len(lengths) <= MAX_LUNAR_MONTHS and set(lengths) <= {29, 30}
+        bits = sum(1 << i for i, length in enumerate(lengths) if length == 30)
+        infos.append(bits | leap_month << LEAP_MONTH_SHIFT)
+    payload = LUNAR_TABLE_HEADER.pack(LUNAR_TABLE_MAGIC, first_year, len(years))
+    payload += struct.pack(f"<{len(years)}i", *(new_year for new_year, _, _ in years))
+    payload += struct.pack(f"<{len(years)}I", *infos)
+    with open(path, "wb") as f:
+        f.write(payload)
+    return len(payload)
+
+# ----------------------
+# Table Generation
+# ----------------------
+def generate_solar_term_table(first_year=1900, last_year=2100):
+    """
+    Calculate all solar terms for a range of years.
+
+    Args:
+        first_year, last_year (int): Inclusive year range
+
+    Returns:
+        list: One list of epoch minutes per year, in SOLAR_TERMS_ORDER
+    """
+    return [[solar_term_epoch_minutes(year, term) for term in SOLAR_TERMS_ORDER]
+            for year in range(first_year, last_year + 1)]
+
+def write_solar_term_table(path=SOLAR_TERMS_TABLE_PATH, first_year=1900, last_year=2100):
+    """
+    Write the solar term table as a fixed-width little-endian int32 file.
+
+    Layout: TABLE_HEADER (magic, first_year, n_years, n_terms) followed by
+    n_years * n_terms minute values in SOLAR_TERMS_ORDER.
+
+    Args:
+        path (str): Output file path
+        first_year, last_year (int): Inclusive year range
+
+    Returns:
+        int: Number of bytes written
+    """
+    rows = generate_solar_term_table(first_year, last_year)
+    values = [minutes for row in rows for minutes in row]
+    payload = TABLE_HEADER.pack(TABLE_MAGIC, first_year, len(rows), len(SOLAR_TERMS_ORDER))
+    payload += struct.pack(f"<{len(values)}i", *values)
+    with open(path, "wb") as f:
+        f.write(payload)
+    return len(payload)
+
+def write_equation_of_time_table(path=EOT_TABLE_PATH, first_year=1900, last_year=2100):
+    """
+    Write the per-day equation of time table read by equation_of_time_table.
+
+    One float32 sample at 00:00 UT for every day from 1 January of
+    first_year to 1 January after last_year (the closing sample lets the
+    last day interpolate).
+
+    Args:
+        path (str): Output file path
+        first_year, last_year (int): Inclusive year range
+
+    Returns:
+        int: Number of bytes written
+    """
+    first_day = datetime.date(first_year, 1, 1).toordinal() - datetime.date(1970, 1, 1).toordinal()
+    end_day = datetime.date(last_year + 1, 1, 1).toordinal() - datetime.date(1970, 1, 1).toordinal()
+    values = [equation_of_time_minutes(day + 2440587.5) for day in range(first_day, end_day + 1)]
+    payload = EOT_TABLE_HEADER.pack(EOT_TABLE_MAGIC, first_day, len(values))
+    payload += struct.pack(f"<{len(values)}f", *values)
+    with open(path, "wb") as f:
+        f.write(payload)
+    return len(payload)
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "--lunar":
+        args = args[1:]
+        out_path = args[0] if args else LUNAR_TABLE_PATH
+        first = int(args[1]) if len(args) > 1 else 1900
+        last = int(args[2]) if len(args) > 2 else 2100
+        size = write_lunar_calendar_table(out_path, first, last)
+        print(f"Wrote {last - first + 1} lunar years ({size} bytes) to {out_path}")
+        sys.exit()
+    if args and args[0] == "--eot":
+        args = args[1:]
+        out_path = args[0] if args else EOT_TABLE_PATH
+        first = int(args[1]) if len(args) > 1 else 1900
+        last = int(args[2]) if len(args) > 2 else 2100
+        size = write_equation_of_time_table(out_path, first, last)
+        print(f"Wrote the {first}-{last} equation of time table ({size} bytes) to {out_path}")
+        sys.exit()
+    out_path = args[0] if args else SOLAR_TERMS_TABLE_PATH
+    first = int(args[1]) if len(args) > 1 else 1900
+    last = int(args[2]) if len(args) > 2 else 2100
+    size = write_solar_term_table(out_path, first, last)
+    print(f"Wrote {last - first + 1} years of solar terms ({size} bytes) to {out_path}")
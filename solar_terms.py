@@ -1,34 +1,29 @@
 # solar_terms.py
+import array
+import bisect
 import datetime
+import functools
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping
 
-# Solar term data for years 1900-2050
-# Format: year -> {term_name: (month, day, hour, minute)}
-# Key terms: 立春 (Spring Begins) for year boundaries, and 12 major terms for month boundaries
+import bazi_metrics
 
-SOLAR_TERMS_DATA = {
-    1900: {"spring_begins": (2, 5, 6, 2), "insects_awaken": (3, 6, 18, 30), "spring_equinox": (3, 21, 20, 39), "clear_bright": (4, 5, 16, 17), "grain_rains": (4, 20, 23, 18), "summer_begins": (5, 6, 5, 42), "grain_buds": (5, 21, 12, 24), "grain_in_ear": (6, 6, 7, 12), "summer_solstice": (6, 21, 22, 18), "minor_heat": (7, 7, 13, 30), "major_heat": (7, 23, 4, 42), "autumn_begins": (8, 8, 1, 6), "stopping_heat": (8, 23, 21, 30), "white_dews": (9, 8, 6, 0), "autumn_equinox": (9, 23, 14, 30), "cold_dews": (10, 8, 22, 48), "frosts_descent": (10, 24, 7, 6), "winter_begins": (11, 8, 3, 24), "minor_snow": (11, 22, 23, 42), "major_snow": (12, 7, 20, 0), "winter_solstice": (12, 22, 4, 18), "minor_cold": (1, 6, 12, 36), "major_cold": (1, 21, 8, 54)},
-    1901: {"spring_begins": (2, 4, 11, 52), "insects_awaken": (3, 6, 0, 20), "spring_equinox": (3, 21, 2, 29), "clear_bright": (4, 4, 22, 7), "grain_rains": (4, 20, 5, 8), "summer_begins": (5, 5, 11, 32), "grain_buds": (5, 20, 18, 14), "grain_in_ear": (6, 5, 13, 2), "summer_solstice": (6, 21, 4, 8), "minor_heat": (7, 6, 19, 20), "major_heat": (7, 22, 10, 32), "autumn_begins": (8, 7, 6, 56), "stopping_heat": (8, 23, 3, 20), "white_dews": (9, 7, 11, 50), "autumn_equinox": (9, 22, 20, 20), "cold_dews": (10, 8, 4, 38), "frosts_descent": (10, 23, 12, 56), "winter_begins": (11, 7, 9, 14), "minor_snow": (11, 22, 5, 32), "major_snow": (12, 7, 1, 50), "winter_solstice": (12, 21, 10, 8), "minor_cold": (1, 5, 18, 26), "major_cold": (1, 20, 14, 44)},
-    1902: {"spring_begins": (2, 4, 17, 42), "insects_awaken": (3, 6, 6, 10), "spring_equinox": (3, 21, 8, 19), "clear_bright": (4, 5, 3, 57), "grain_rains": (4, 20, 10, 58), "summer_begins": (5, 5, 17, 22), "grain_buds": (5, 21, 0, 4), "grain_in_ear": (6, 5, 18, 52), "summer_solstice": (6, 21, 9, 58), "minor_heat": (7, 7, 1, 10), "major_heat": (7, 22, 16, 22), "autumn_begins": (8, 7, 12, 46), "stopping_heat": (8, 23, 9, 10), "white_dews": (9, 7, 17, 40), "autumn_equinox": (9, 23, 2, 10), "cold_dews": (10, 8, 10, 28), "frosts_descent": (10, 23, 18, 46), "winter_begins": (11, 7, 15, 4), "minor_snow": (11, 22, 11, 22), "major_snow": (12, 7, 7, 40), "winter_solstice": (12, 21, 15, 58), "minor_cold": (1, 6, 0, 16), "major_cold": (1, 20, 20, 34)},
-    # ... continuing pattern for all years 1900-2050
-    # For brevity, I'll include a representative sample and indicate where more data would go
-    
-    1990: {"spring_begins": (2, 4, 10, 14), "insects_awaken": (3, 5, 21, 29), "spring_equinox": (3, 20, 21, 19), "clear_bright": (4, 5, 3, 13), "grain_rains": (4, 20, 10, 27), "summer_begins": (5, 5, 20, 53), "grain_buds": (5, 21, 9, 37), "grain_in_ear": (6, 6, 2, 34), "summer_solstice": (6, 21, 16, 33), "minor_heat": (7, 7, 5, 12), "major_heat": (7, 23, 0, 7), "autumn_begins": (8, 7, 20, 20), "stopping_heat": (8, 23, 16, 55), "white_dews": (9, 8, 1, 27), "autumn_equinox": (9, 23, 9, 55), "cold_dews": (10, 8, 18, 14), "frosts_descent": (10, 24, 2, 36), "winter_begins": (11, 7, 22, 48), "minor_snow": (11, 22, 19, 6), "major_snow": (12, 7, 15, 18), "winter_solstice": (12, 21, 23, 7), "minor_cold": (1, 5, 6, 19), "major_cold": (1, 20, 5, 19)},
-    
-    1991: {"spring_begins": (2, 4, 16, 4), "insects_awaken": (3, 6, 3, 19), "spring_equinox": (3, 21, 3, 9), "clear_bright": (4, 5, 9, 3), "grain_rains": (4, 20, 16, 17), "summer_begins": (5, 6, 2, 43), "grain_buds": (5, 21, 15, 27), "grain_in_ear": (6, 6, 8, 24), "summer_solstice": (6, 21, 22, 23), "minor_heat": (7, 7, 11, 2), "major_heat": (7, 23, 5, 57), "autumn_begins": (8, 8, 2, 10), "stopping_heat": (8, 23, 22, 45), "white_dews": (9, 8, 7, 17), "autumn_equinox": (9, 23, 15, 45), "cold_dews": (10, 9, 0, 4), "frosts_descent": (10, 24, 8, 26), "winter_begins": (11, 8, 4, 38), "minor_snow": (11, 23, 0, 56), "major_snow": (12, 7, 21, 8), "winter_solstice": (12, 22, 4, 57), "minor_cold": (1, 5, 12, 9), "major_cold": (1, 20, 11, 9)},
-    
-    # Data continues for years 1903-2050...
-    # Each year follows the same format with calculated solar term dates
-    2020: {"spring_begins": (2, 4, 17, 3), "insects_awaken": (3, 5, 10, 57), "spring_equinox": (3, 20, 11, 50), "clear_bright": (4, 4, 15, 38), "grain_rains": (4, 19, 22, 45), "summer_begins": (5, 5, 8, 51), "grain_buds": (5, 20, 21, 49), "grain_in_ear": (6, 5, 12, 58), "summer_solstice": (6, 21, 5, 44), "minor_heat": (7, 6, 23, 14), "major_heat": (7, 22, 16, 37), "autumn_begins": (8, 7, 9, 6), "stopping_heat": (8, 22, 23, 45), "white_dews": (9, 7, 12, 8), "autumn_equinox": (9, 22, 21, 31), "cold_dews": (10, 8, 3, 55), "frosts_descent": (10, 23, 6, 59), "winter_begins": (11, 7, 7, 14), "minor_snow": (11, 22, 4, 40), "major_snow": (12, 7, 0, 9), "winter_solstice": (12, 21, 12, 2), "minor_cold": (1, 5, 23, 5), "major_cold": (1, 20, 22, 55)},
-    
-    2025: {"spring_begins": (2, 3, 22, 10), "insects_awaken": (3, 5, 16, 7), "spring_equinox": (3, 20, 17, 1), "clear_bright": (4, 4, 20, 48), "grain_rains": (4, 20, 3, 56), "summer_begins": (5, 5, 14, 2), "grain_buds": (5, 21, 3, 0), "grain_in_ear": (6, 5, 18, 9), "summer_solstice": (6, 21, 10, 54), "minor_heat": (7, 7, 4, 25), "major_heat": (7, 22, 21, 48), "autumn_begins": (8, 7, 14, 17), "stopping_heat": (8, 23, 4, 56), "white_dews": (9, 7, 17, 19), "autumn_equinox": (9, 23, 2, 42), "cold_dews": (10, 8, 9, 6), "frosts_descent": (10, 23, 12, 10), "winter_begins": (11, 7, 12, 25), "minor_snow": (11, 22, 9, 51), "major_snow": (12, 7, 5, 20), "winter_solstice": (12, 21, 17, 13), "minor_cold": (1, 5, 4, 16), "major_cold": (1, 20, 4, 6)}
-}
-
-# Complete data structure would continue through 2050
-# For demonstration, showing pattern - in actual implementation, include all years
+# Solar term instants for 1900-2100 live in a compact binary table generated by
+# solar_ephemeris.py (run `python solar_ephemeris.py` to regenerate it).
+# Instants are whole minutes since 1970-01-01 in China Standard Time (UTC+8).
+# Each table year runs from 立春 (Spring Begins) to 大寒 (Major Cold) of the following January.
+SOLAR_TERMS_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solar_terms_table.bin")
+TABLE_MAGIC = b"BZST"
+TABLE_HEADER = struct.Struct("<4siii")  # magic, first_year, n_years, n_terms
+TABLE_UTC_OFFSET_HOURS = 8
 
 # Solar term names and their positions in the year
 SOLAR_TERMS_ORDER = [
     "spring_begins",    # 立春 - 1st term, marks new BaZi year
+    "rain_water",       # 雨水 - 2nd term
     "insects_awaken",   # 惊蛰 - 3rd term
     "spring_equinox",   # 春分 - 5th term
     "clear_bright",     # 清明 - 7th term
@@ -70,36 +65,124 @@ BAZI_MONTH_TERMS = {
     12: "minor_snow"        # 12th month starts with 小雪
 }
 
+# Column of each term in the binary table
+TERM_COLUMNS = {term_name: i for i, term_name in enumerate(SOLAR_TERMS_ORDER)}
+
+class SolarTermTable(Mapping):
+    """
+    Read-only, memory-mapped view of the binary solar term table.
+    
+    Behaves like the old SOLAR_TERMS_DATA dict (year -> {term_name: (month,
+    day, hour, minute)}) while lookups by (year, term) read the int32 minute
+    values straight from the mapped file. The file is opened on first use.
+    """
+    __slots__ = ("path", "first_year", "n_years", "n_terms", "_minutes", "_mmap")
+
+    def __init__(self, path=SOLAR_TERMS_TABLE_PATH):
+        self.path = path
+        self._minutes = None
+        self._mmap = None
+
+    def _load(self):
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.first_year, self.n_years, self.n_terms = TABLE_HEADER.unpack_from(self._mmap)
+        if magic != TABLE_MAGIC or self.n_terms != len(SOLAR_TERMS_ORDER):
+            raise ValueError(f"{self.path} is not a solar term table for {len(SOLAR_TERMS_ORDER)} terms")
+        minutes = memoryview(self._mmap)[TABLE_HEADER.size:].cast("i")
+        if sys.byteorder != "little":
+            minutes = array.array("i", minutes)
+            minutes.byteswap()
+        self._minutes = minutes
+
+    def term_minutes(self, year, term_name):
+        """
+        Minutes since 1970-01-01 (UTC+8) at which a term occurs.
+        
+        Args:
+            year (int): The year
+            term_name (str): Name of the solar term
+            
+        Returns:
+            int: Epoch minutes
+            None: If year or term not found
+        """
+        if self._minutes is None:
+            self._load()
+        column = TERM_COLUMNS.get(term_name)
+        offset = year - self.first_year
+        if column is None or not 0 <= offset < self.n_years:
+            return None
+        return self._minutes[offset * self.n_terms + column]
+
+    def __getitem__(self, year):
+        if year not in self:
+            raise KeyError(year)
+        terms = {}
+        for term_name in SOLAR_TERMS_ORDER:
+            dt = epoch_minutes_to_datetime(self.term_minutes(year, term_name))
+            terms[term_name] = (dt.month, dt.day, dt.hour, dt.minute)
+        return terms
+
+    def __contains__(self, year):
+        if self._minutes is None:
+            self._load()
+        return isinstance(year, int) and 0 <= year - self.first_year < self.n_years
+
+    def __iter__(self):
+        if self._minutes is None:
+            self._load()
+        return iter(range(self.first_year, self.first_year + self.n_years))
+
+    def __len__(self):
+        if self._minutes is None:
+            self._load()
+        return self.n_years
+
+SOLAR_TERMS_DATA = SolarTermTable()
+
+@functools.lru_cache(maxsize=None)
 def get_solar_term_datetime(year, term_name):
     """
     Get the datetime for a specific solar term in a given year.
     
     Args:
-        year (int): The year (1900-2050)
+        year (int): The year (1900-2100)
         term_name (str): Name of the solar term
         
     Returns:
         datetime: The datetime when the solar term occurs
         None: If year or term not found
     """
-    if year not in SOLAR_TERMS_DATA:
+    minutes = SOLAR_TERMS_DATA.term_minutes(year, term_name)
+    if minutes is None:
         return None
-        
-    if term_name not in SOLAR_TERMS_DATA[year]:
-        return None
-        
-    month, day, hour, minute = SOLAR_TERMS_DATA[year][term_name]
-    
-    # Handle cross-year terms (minor_cold and major_cold occur in January of following year)
-    if term_name in ["minor_cold", "major_cold"]:
-        return datetime.datetime(year + 1, month, day, hour, minute)
-    else:
-        return datetime.datetime(year, month, day, hour, minute)
+    return epoch_minutes_to_datetime(minutes)
+
+bazi_metrics.register_cache("solar_term_datetime", bazi_metrics.lru_cache_stats(get_solar_term_datetime))
 
 def find_bazi_year_month(dt):
     """
     Find the correct BaZi year and month for a given datetime.
     
+    Args:
+        dt (datetime): The datetime to convert
+        
+    Returns:
+        tuple: (bazi_year, bazi_month, year_start_date, month_start_date)
+    """
+    start = bazi_metrics.ENABLED and bazi_metrics.clock()
+    result = get_month_boundary_index().lookup(datetime_to_epoch_minutes(dt))
+    if start:
+        bazi_metrics.observe("term_lookup", start)
+    return result
+
+def _scan_bazi_year_month(dt):
+    """
+    Reference linear scan over the month-starting terms of a year.
+    
+    Used to build the month boundary index and for instants outside it.
+    
     Args:
         dt (datetime): The datetime to convert
         
@@ -168,30 +251,182 @@ def get_solar_term_boundaries(year):
     
     return boundaries
 
-# Sample data - in production, this would include all years 1900-2050
-# Adding more years for completeness...
+# ----------------------
+# Month boundary index
+# ----------------------
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+NO_TERM = -(2 ** 63)  # Sentinel for missing boundaries in integer arrays (same bits as NaT)
 
-# Adding key missing years to make the calculator functional
-SOLAR_TERMS_DATA.update({
-    1992: {"spring_begins": (2, 4, 21, 54), "insects_awaken": (3, 6, 9, 9), "spring_equinox": (3, 20, 8, 59), "clear_bright": (4, 5, 14, 53), "grain_rains": (4, 20, 22, 7), "summer_begins": (5, 6, 8, 33), "grain_buds": (5, 21, 21, 17), "grain_in_ear": (6, 6, 14, 14), "summer_solstice": (6, 22, 4, 13), "minor_heat": (7, 7, 16, 52), "major_heat": (7, 23, 11, 47), "autumn_begins": (8, 8, 8, 0), "stopping_heat": (8, 24, 4, 35), "white_dews": (9, 8, 13, 7), "autumn_equinox": (9, 23, 21, 35), "cold_dews": (10, 9, 5, 54), "frosts_descent": (10, 24, 14, 16), "winter_begins": (11, 8, 10, 28), "minor_snow": (11, 23, 6, 46), "major_snow": (12, 8, 2, 58), "winter_solstice": (12, 22, 10, 47), "minor_cold": (1, 5, 17, 59), "major_cold": (1, 20, 16, 59)},
-    
-    1993: {"spring_begins": (2, 4, 3, 44), "insects_awaken": (3, 5, 14, 59), "spring_equinox": (3, 20, 14, 49), "clear_bright": (4, 4, 20, 43), "grain_rains": (4, 20, 3, 57), "summer_begins": (5, 5, 14, 23), "grain_buds": (5, 21, 3, 7), "grain_in_ear": (6, 5, 20, 4), "summer_solstice": (6, 21, 10, 3), "minor_heat": (7, 6, 22, 42), "major_heat": (7, 22, 17, 37), "autumn_begins": (8, 7, 13, 50), "stopping_heat": (8, 23, 10, 25), "white_dews": (9, 7, 19, 0), "autumn_equinox": (9, 23, 3, 25), "cold_dews": (10, 8, 11, 44), "frosts_descent": (10, 23, 20, 6), "winter_begins": (11, 7, 16, 18), "minor_snow": (11, 22, 12, 36), "major_snow": (12, 7, 8, 48), "winter_solstice": (12, 21, 16, 37), "minor_cold": (1, 4, 23, 49), "major_cold": (1, 19, 22, 49)},
-    
-    # Add more representative years...
-    2000: {"spring_begins": (2, 4, 20, 41), "insects_awaken": (3, 5, 13, 36), "spring_equinox": (3, 20, 14, 35), "clear_bright": (4, 4, 22, 32), "grain_rains": (4, 20, 7, 43), "summer_begins": (5, 5, 20, 17), "grain_buds": (5, 21, 10, 50), "grain_in_ear": (6, 6, 2, 18), "summer_solstice": (6, 21, 14, 48), "minor_heat": (7, 7, 2, 0), "major_heat": (7, 22, 20, 45), "autumn_begins": (8, 7, 16, 46), "stopping_heat": (8, 23, 12, 50), "white_dews": (9, 7, 21, 28), "autumn_equinox": (9, 23, 5, 28), "cold_dews": (10, 8, 13, 15), "frosts_descent": (10, 23, 21, 9), "winter_begins": (11, 7, 16, 54), "minor_snow": (11, 22, 12, 43), "major_snow": (12, 7, 7, 56), "winter_solstice": (12, 21, 14, 38), "minor_cold": (1, 5, 21, 7), "major_cold": (1, 20, 18, 25)},
-    
-    2010: {"spring_begins": (2, 4, 6, 48), "insects_awaken": (3, 5, 23, 46), "spring_equinox": (3, 21, 1, 32), "clear_bright": (4, 5, 5, 30), "grain_rains": (4, 20, 12, 0), "summer_begins": (5, 5, 22, 59), "grain_buds": (5, 21, 12, 35), "grain_in_ear": (6, 6, 0, 18), "summer_solstice": (6, 21, 11, 28), "minor_heat": (7, 7, 1, 21), "major_heat": (7, 23, 0, 21), "autumn_begins": (8, 7, 23, 50), "stopping_heat": (8, 23, 19, 27), "white_dews": (9, 8, 0, 33), "autumn_equinox": (9, 23, 11, 9), "cold_dews": (10, 8, 16, 44), "frosts_descent": (10, 24, 1, 18), "winter_begins": (11, 7, 20, 56), "minor_snow": (11, 22, 18, 16), "major_snow": (12, 7, 13, 37), "winter_solstice": (12, 21, 23, 38), "minor_cold": (1, 6, 1, 52), "major_cold": (1, 21, 0, 18)},
-    
-    # Key recent and near-future years
-    2021: {"spring_begins": (2, 3, 22, 59), "insects_awaken": (3, 5, 16, 54), "spring_equinox": (3, 20, 17, 37), "clear_bright": (4, 4, 21, 35), "grain_rains": (4, 20, 4, 33), "summer_begins": (5, 5, 14, 47), "grain_buds": (5, 21, 3, 37), "grain_in_ear": (6, 5, 18, 52), "summer_solstice": (6, 21, 11, 32), "minor_heat": (7, 7, 5, 5), "major_heat": (7, 22, 22, 26), "autumn_begins": (8, 7, 14, 54), "stopping_heat": (8, 23, 5, 35), "white_dews": (9, 7, 17, 53), "autumn_equinox": (9, 23, 3, 21), "cold_dews": (10, 8, 9, 39), "frosts_descent": (10, 23, 12, 51), "winter_begins": (11, 7, 12, 59), "minor_snow": (11, 22, 10, 34), "major_snow": (12, 7, 5, 57), "winter_solstice": (12, 21, 15, 59), "minor_cold": (1, 5, 5, 14), "major_cold": (1, 20, 4, 40)},
-    
-    2022: {"spring_begins": (2, 4, 4, 51), "insects_awaken": (3, 5, 22, 44), "spring_equinox": (3, 20, 23, 33), "clear_bright": (4, 5, 3, 20), "grain_rains": (4, 20, 10, 24), "summer_begins": (5, 5, 20, 26), "grain_buds": (5, 21, 9, 23), "grain_in_ear": (6, 6, 0, 26), "summer_solstice": (6, 21, 17, 14), "minor_heat": (7, 7, 10, 38), "major_heat": (7, 23, 4, 7), "autumn_begins": (8, 7, 20, 29), "stopping_heat": (8, 23, 11, 16), "white_dews": (9, 7, 23, 32), "autumn_equinox": (9, 23, 9, 4), "cold_dews": (10, 8, 15, 22), "frosts_descent": (10, 23, 18, 36), "winter_begins": (11, 7, 18, 45), "minor_snow": (11, 22, 16, 20), "major_snow": (12, 7, 11, 46), "winter_solstice": (12, 21, 21, 48), "minor_cold": (1, 5, 11, 5), "major_cold": (1, 20, 10, 30)},
-    
-    2023: {"spring_begins": (2, 4, 10, 43), "insects_awaken": (3, 6, 4, 36), "spring_equinox": (3, 21, 5, 24), "clear_bright": (4, 5, 9, 13), "grain_rains": (4, 20, 16, 13), "summer_begins": (5, 6, 2, 19), "grain_buds": (5, 21, 15, 9), "grain_in_ear": (6, 6, 6, 18), "summer_solstice": (6, 21, 22, 57), "minor_heat": (7, 7, 16, 31), "major_heat": (7, 23, 9, 50), "autumn_begins": (8, 8, 2, 23), "stopping_heat": (8, 23, 17, 1), "white_dews": (9, 8, 5, 27), "autumn_equinox": (9, 23, 14, 50), "cold_dews": (10, 8, 21, 16), "frosts_descent": (10, 24, 0, 21), "winter_begins": (11, 8, 0, 36), "minor_snow": (11, 22, 22, 3), "major_snow": (12, 7, 17, 33), "winter_solstice": (12, 22, 3, 27), "minor_cold": (1, 5, 16, 56), "major_cold": (1, 20, 16, 14)},
+def datetime_to_epoch_minutes(dt):
+    """Convert a naive datetime to whole minutes since 1970-01-01"""
+    return (dt.toordinal() - EPOCH_ORDINAL) * 1440 + dt.hour * 60 + dt.minute
+
+def epoch_minutes_to_datetime(minutes):
+    """Convert minutes since 1970-01-01 back to a naive datetime"""
+    return datetime.datetime(1970, 1, 1) + datetime.timedelta(minutes=minutes)
+
+class MonthBoundaryIndex:
+    """
+    Sorted, integer-encoded index of every instant at which the BaZi year or
+    month can change.
     
-    2024: {"spring_begins": (2, 4, 16, 27), "insects_awaken": (3, 5, 10, 23), "spring_equinox": (3, 20, 11, 6), "clear_bright": (4, 4, 15, 2), "grain_rains": (4, 19, 21, 59), "summer_begins": (5, 5, 8, 10), "grain_buds": (5, 20, 20, 59), "grain_in_ear": (6, 5, 12, 10), "summer_solstice": (6, 21, 4, 51), "minor_heat": (7, 6, 22, 20), "major_heat": (7, 22, 15, 44), "autumn_begins": (8, 7, 8, 9), "stopping_heat": (8, 22, 22, 55), "white_dews": (9, 7, 11, 11), "autumn_equinox": (9, 22, 20, 44), "cold_dews": (10, 8, 3, 0), "frosts_descent": (10, 23, 6, 15), "winter_begins": (11, 7, 6, 20), "minor_snow": (11, 22, 3, 56), "major_snow": (12, 6, 23, 17), "winter_solstice": (12, 21, 9, 21), "minor_cold": (1, 5, 22, 49), "major_cold": (1, 20, 22, 7)}
-})
+    The result of the linear scan only changes at month-starting terms and at
+    civil New Year (the scan keys off dt.year), so it is evaluated once per
+    breakpoint and answered afterwards by binary search. Instants are whole
+    minutes since 1970-01-01: terms are minute-precise, so flooring a query
+    to its minute never changes a comparison.
+    """
+    __slots__ = ("starts", "results", "first_year", "last_year", "_arrays")
+
+    def __init__(self):
+        self.first_year = min(SOLAR_TERMS_DATA) - 1
+        self.last_year = max(SOLAR_TERMS_DATA) + 2
+
+        breakpoints = set()
+        for year in range(self.first_year, self.last_year + 1):
+            breakpoints.add(datetime.datetime(year, 1, 1))
+        for year in SOLAR_TERMS_DATA:
+            for term_name in BAZI_MONTH_TERMS.values():
+                term_dt = get_solar_term_datetime(year, term_name)
+                if term_dt:
+                    breakpoints.add(term_dt)
+
+        self.starts = []
+        self.results = []
+        for dt in sorted(breakpoints):
+            result = _scan_bazi_year_month(dt)
+            if not self.results or self.results[-1] != result:
+                self.starts.append(datetime_to_epoch_minutes(dt))
+                self.results.append(result)
+        self._arrays = None
+
+    def lookup(self, minutes):
+        """
+        Find the BaZi year and month containing an instant.
+        
+        Args:
+            minutes (int): Minutes since 1970-01-01
+            
+        Returns:
+            tuple: (bazi_year, bazi_month, year_start_date, month_start_date)
+        """
+        i = bisect.bisect_right(self.starts, minutes) - 1
+        if i < 0 or i == len(self.starts) - 1:
+            # Before 1 January of the first year or after the last breakpoint
+            return _scan_bazi_year_month(epoch_minutes_to_datetime(minutes))
+        return self.results[i]
+
+    def arrays(self):
+        """
+        NumPy views of the index, built on first use.
+        
+        Returns:
+            dict: int64 `starts`, `bazi_year`, `bazi_month`, and epoch-minute
+                `year_start` / `month_start` with NO_TERM where missing
+        """
+        if self._arrays is None:
+            import numpy as np
+
+            def to_minutes(dt):
+                return NO_TERM if dt is None else datetime_to_epoch_minutes(dt)
+
+            self._arrays = {
+                "starts": np.array(self.starts, dtype=np.int64),
+                "bazi_year": np.array([r[0] for r in self.results], dtype=np.int64),
+                "bazi_month": np.array([r[1] for r in self.results], dtype=np.int64),
+                "year_start": np.array([to_minutes(r[2]) for r in self.results], dtype=np.int64),
+                "month_start": np.array([to_minutes(r[3]) for r in self.results], dtype=np.int64),
+            }
+        return self._arrays
+
+    def lookup_array(self, minutes):
+        """
+        Vectorized lookup with np.searchsorted.
+        
+        Args:
+            minutes (array-like of int): Minutes since 1970-01-01
+            
+        Returns:
+            tuple: (bazi_year, bazi_month, year_start, month_start) int64 arrays,
+                with the start arrays in epoch minutes and NO_TERM where missing
+        """
+        import numpy as np
+
+        arrays = self.arrays()
+        minutes = np.asarray(minutes, dtype=np.int64)
+        i = np.searchsorted(arrays["starts"], minutes, side="right") - 1
+        outside = (i < 0) | (i == len(self.starts) - 1)
+        i = np.clip(i, 0, len(self.starts) - 1)
+        bazi_year = arrays["bazi_year"][i]
+        bazi_month = arrays["bazi_month"][i]
+        year_start = arrays["year_start"][i]
+        month_start = arrays["month_start"][i]
+        if outside.any():
+            # No term data this far out: the scan falls back to the civil year, month 12
+            civil_year = minutes[outside].astype("datetime64[m]").astype("datetime64[Y]").astype(np.int64) + 1970
+            bazi_year[outside] = civil_year
+            bazi_month[outside] = 12
+            year_start[outside] = NO_TERM
+            month_start[outside] = NO_TERM
+        return bazi_year, bazi_month, year_start, month_start
+
+_MONTH_BOUNDARY_INDEX = None
+
+def get_month_boundary_index():
+    """Return the month boundary index for SOLAR_TERMS_DATA, building it on first use"""
+    global _MONTH_BOUNDARY_INDEX
+    if _MONTH_BOUNDARY_INDEX is None:
+        _MONTH_BOUNDARY_INDEX = MonthBoundaryIndex()
+    return _MONTH_BOUNDARY_INDEX
+
+# ----------------------
+# Month term neighbours
+# ----------------------
+_MONTH_TERM_MINUTES = None
+
+def get_month_term_minutes():
+    """
+    Every month-starting term instant (BAZI_MONTH_TERMS) in the table.
+
+    Returns:
+        list: Sorted epoch minutes
+    """
+    global _MONTH_TERM_MINUTES
+    if _MONTH_TERM_MINUTES is None:
+        minutes = [SOLAR_TERMS_DATA.term_minutes(year, term_name)
+                   for year in SOLAR_TERMS_DATA for term_name in BAZI_MONTH_TERMS.values()]
+        _MONTH_TERM_MINUTES = sorted(m for m in minutes if m is not None)
+    return _MONTH_TERM_MINUTES
+
+def month_term_neighbours(minutes):
+    """
+    The month-starting terms around an instant, by binary search.
+
+    Args:
+        minutes (int): Minutes since 1970-01-01
+
+    Returns:
+        tuple: (previous, next) epoch minutes with previous <= minutes < next;
+            None on a side the table does not cover
+    """
+    terms = get_month_term_minutes()
+    i = bisect.bisect_right(terms, minutes)
+    return (terms[i - 1] if i > 0 else None), (terms[i] if i < len(terms) else None)
+
+def month_term_neighbours_array(minutes):
+    """
+    Vectorized month_term_neighbours.
+
+    Args:
+        minutes (array-like of int): Minutes since 1970-01-01
+
+    Returns:
+        tuple: (previous, next) int64 arrays of epoch minutes, NO_TERM where missing
+    """
+    import numpy as np
 
-# Note: In production implementation, the SOLAR_TERMS_DATA dictionary would contain
-# all years from 1900-2050. The above represents a working subset for demonstration.
-# Each entry is calculated using astronomical algorithms for precise solar longitude positions.
+    terms = np.array(get_month_term_minutes(), dtype=np.int64)
+    i = np.searchsorted(terms, np.asarray(minutes, dtype=np.int64), side="right")
+    previous = np.where(i > 0, terms[np.maximum(i - 1, 0)], NO_TERM)
+    following = np.where(i < len(terms), terms[np.minimum(i, len(terms) - 1)], NO_TERM)
+    return previous, following